@@ -0,0 +1,279 @@
+"""
+Scaling benchmark for the analytics entry points: generate_pdf_report,
+check_rank_changes (day-over-day and week-over-week), db_summary, the
+PRICE_DAILY_STATS load and the raw-history metrics path, run against a
+synthetic history (benchmarks/generate_prices.py).
+
+Each case runs in a fresh process, so every measurement starts cold:
+  seconds      wall time (without tracing)
+  rss_mb       peak resident memory of the process (and its report workers)
+  base_mb      resident memory after the imports, before the case ran
+  py_mb        peak Python/numpy/pandas allocations (tracemalloc, separate run)
+
+Results are appended to data/benchmarks/analytics.jsonl and compared with
+the last run of the same size; --check exits non-zero when a case got
+slower or bigger than --threshold times that run.
+
+    python benchmarks/bench_analytics.py --scale small
+    python benchmarks/bench_analytics.py --products 10000 --days 1095 --sellers 20 --check
+    PRICE_STORE=mysql python benchmarks/bench_analytics.py --use-store   # existing data, no generation
+
+The generated SQLite store is kept in the temp folder (named after the
+size and seed) and reused by later runs of the same size.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import resource
+import subprocess
+import contextlib
+import multiprocessing
+import datetime as dt
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, "..")
+sys.path.insert(0, os.path.join(ROOT, "etl"))
+sys.path.insert(0, ROOT)
+
+HISTORY_FILE = os.path.join(ROOT, "data", "benchmarks", "analytics.jsonl")
+
+# products, days, sellers
+SCALES = {
+    "small": (500, 90, 10),
+    "medium": (2000, 365, 20),
+    "large": (10000, 1095, 20),     # ~90M rows; generating it into SQLite takes a while
+}
+
+CASES = ["load_daily_stats", "generate_pdf_report", "check_rank_changes", "check_rank_changes_wow",
+         "db_summary", "product_date_metrics"]
+
+
+# CASES (run in the child process)
+
+def case_load_daily_stats(store, options):
+    store.load_daily_stats()
+
+
+def case_generate_pdf_report(store, options):
+    # Same data path as visualization_email.main(), on the first N products
+    # (pages are rendered cold: the page cache is a fresh folder)
+    import pandas as pd
+    from visualization_email import generate_pdf_report
+    metrics = store.load_daily_stats()
+    products = sorted(metrics["Product"].unique())[:options["pdf_products"]]
+    metrics = metrics[metrics["Product"].isin(products)].copy()
+    metrics["Date"] = pd.to_datetime(metrics["Date"])
+    generate_pdf_report(None, metrics)
+
+
+def case_check_rank_changes(store, options):
+    from visualization_email import check_rank_changes
+    check_rank_changes(store=store)
+
+
+def case_check_rank_changes_wow(store, options):
+    from visualization_email import check_rank_changes
+    check_rank_changes(store=store, compare_to=7)
+
+
+def case_db_summary(store, options):
+    from run_all_etl import db_summary
+    db_summary(store.latest_stats_date(), store)
+
+
+def case_product_date_metrics(store, options):
+    # The raw-history path (no PRICE_DAILY_STATS): all of PRICE, then metrics
+    import pandas as pd
+    from price_metrics import product_date_metrics
+    df = store.load_prices()
+    df["Date"] = pd.to_datetime(df["Date"])
+    product_date_metrics(df)
+
+
+def _reset_peak_rss():
+    # A spawned child starts with the peak RSS of the process it was forked
+    # from; on Linux writing 5 to clear_refs resets the high-water mark
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _rss_mb():
+    # Peak RSS in MB (VmHWM, else ru_maxrss); report workers count through RUSAGE_CHILDREN
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    try:
+        with open("/proc/self/status") as f:
+            peak = next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+    except (OSError, StopIteration):
+        pass
+    return max(peak, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) / 1024
+
+
+def run_case(case, options, trace, results):
+    import tracemalloc
+    from price_store import get_store
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        import visualization_email  # noqa: F401  (import cost is not part of the case)
+        import run_all_etl  # noqa: F401
+        import report_pages  # noqa: F401  (imported by generate_pdf_report on first use)
+
+    store = get_store()
+    workdir = tempfile.mkdtemp(prefix="bench_analytics_")
+    os.environ["PRICE_REPORT_CACHE_DIR"] = os.path.join(workdir, "report_cache")
+    os.chdir(workdir)   # generate_pdf_report writes reports/ into the working folder
+
+    _reset_peak_rss()
+    base = _rss_mb()
+    if trace:
+        tracemalloc.start()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        started = time.perf_counter()
+        globals()[f"case_{case}"](store, options)
+        seconds = time.perf_counter() - started
+
+    result = {"seconds": round(seconds, 3), "rss_mb": round(_rss_mb(), 1), "base_mb": round(base, 1)}
+    if trace:
+        result = {"py_mb": round(tracemalloc.get_traced_memory()[1] / 2**20, 1)}
+        tracemalloc.stop()
+    shutil.rmtree(workdir, ignore_errors=True)
+    results.put(result)
+
+
+def measure(case, options, trace):
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    child = ctx.Process(target=run_case, args=(case, options, trace, results))
+    child.start()
+    child.join()
+    if child.exitcode != 0:
+        return {"error": f"exit code {child.exitcode}"}
+    return results.get()
+
+
+def generate_store(products, days, sellers, seed):
+    from generate_prices import generate, write_store
+    write_store(generate(products, days, sellers, seed))
+
+
+# HISTORY
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def previous_run(path, size):
+    if not os.path.exists(path):
+        return None
+    last = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if record["size"] == size:
+                last = record
+    return last
+
+
+def append_run(path, record):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--products", type=int, default=None, help="overrides --scale")
+    parser.add_argument("--days", type=int, default=None, help="overrides --scale")
+    parser.add_argument("--sellers", type=int, default=None, help="overrides --scale")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--use-store", action="store_true",
+                        help="benchmark the configured price store as it is (no synthetic data)")
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=CASES)
+    parser.add_argument("--pdf-products", type=int, default=20, help="products in the PDF report case")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="skip the tracemalloc runs")
+    parser.add_argument("--history", default=HISTORY_FILE, help="JSON-lines file of past results")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="slower/bigger than this x the last run of the same size = regression")
+    parser.add_argument("--check", action="store_true", help="exit non-zero on a regression")
+    args = parser.parse_args()
+
+    products, days, sellers = SCALES[args.scale]
+    products, days, sellers = args.products or products, args.days or days, args.sellers or sellers
+
+    if not args.use_store:
+        # Children inherit the environment, so they open the same scratch store
+        path = os.path.join(tempfile.gettempdir(), f"price_bench_{products}x{days}x{sellers}_s{args.seed}.sqlite")
+        os.environ["PRICE_STORE"] = "sqlite"
+        os.environ["PRICE_STORE_PATH"] = path
+        if not os.path.exists(path):
+            # In a child process too, so this process stays small
+            started = time.perf_counter()
+            print(f"Generating {products} products x {days} days x {sellers} sellers into {path} ...")
+            generator = multiprocessing.get_context("spawn").Process(
+                target=generate_store, args=(products, days, sellers, args.seed))
+            generator.start()
+            generator.join()
+            if generator.exitcode != 0:
+                sys.exit(f"[FAIL] data generation failed (exit code {generator.exitcode})")
+            print(f"  done in {time.perf_counter() - started:.1f}s")
+
+    from price_store import get_store, PRICE_TABLE, STATS_TABLE
+    store = get_store()
+    rows = store.query(f"SELECT COUNT(*) FROM {PRICE_TABLE}")[0][0]
+    stats_rows = store.query(f"SELECT COUNT(*) FROM {STATS_TABLE}")[0][0]
+    size = {"products": products, "days": days, "sellers": sellers, "seed": args.seed, "rows": rows} \
+        if not args.use_store else {"store": store.name, "rows": rows}
+    print(f"store {store.name}: {rows} PRICE rows, {stats_rows} daily stats rows\n")
+
+    options = {"pdf_products": args.pdf_products}
+    results = {}
+    for case in args.cases:
+        results[case] = measure(case, options, trace=False)
+        if not args.no_tracemalloc and "error" not in results[case]:
+            results[case].update(measure(case, options, trace=True))
+
+    before = previous_run(args.history, size)
+    regressions = []
+    print(f"{'case':24} {'seconds':>9} {'rss MB':>8} {'base MB':>8} {'py MB':>8} {'vs last':>9}")
+    for case, r in results.items():
+        if "error" in r:
+            print(f"{case:24} FAILED ({r['error']})")
+            continue
+        change = ""
+        old = (before or {}).get("results", {}).get(case)
+        if old and "error" not in old:
+            ratios = {k: r[k] / old[k] for k in ("seconds", "rss_mb", "py_mb") if old.get(k) and k in r}
+            change = f"{ratios.get('seconds', 1):.2f}x"
+            worse = [k for k, ratio in ratios.items() if ratio > args.threshold]
+            if worse:
+                regressions.append((case, worse))
+                change += " !"
+        print(f"{case:24} {r['seconds']:9.2f} {r['rss_mb']:8.1f} {r['base_mb']:8.1f} "
+              f"{r.get('py_mb', float('nan')):8.1f} {change:>9}")
+
+    append_run(args.history, {
+        "time": dt.datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.node(),
+        "size": size,
+        "results": results,
+    })
+    print(f"\nresults appended to {args.history}"
+          + (f" (compared with the run of {before['time']}, commit {before['commit']})" if before else ""))
+
+    for case, worse in regressions:
+        print(f"[WARN] {case}: {', '.join(worse)} above {args.threshold}x the last run")
+    if args.check and regressions:
+        sys.exit(1)
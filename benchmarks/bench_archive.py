@@ -0,0 +1,69 @@
+"""
+Benchmark: loading the report's price history from the database vs from
+the Parquet archive (etl/price_archive.py). Uses whatever store and archive
+the environment points at, so export first:
+
+    python etl/price_archive.py export
+    PRICE_STORE=sqlite PRICE_ARCHIVE_DIR=/tmp/archive python benchmarks/bench_archive.py
+
+Also checks that both give the same rows and the same product x date
+metrics (exits non-zero if not).
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "etl"))
+from price_store import get_store  # noqa: E402
+from price_archive import load_archive, archive_dir  # noqa: E402
+from price_metrics import product_date_metrics  # noqa: E402
+
+import pandas as pd  # noqa: E402
+
+
+def timed(label, func, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        seconds = time.perf_counter() - started
+        best = seconds if best is None else min(best, seconds)
+    print(f"{label:42} {len(result):10} rows {best:8.2f}s")
+    return result, best
+
+
+def load_store(store):
+    df = store.load_prices()
+    df["Date"] = pd.to_datetime(df["Date"])
+    df["Price"] = df["Price"].astype(float)
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3, help="runs per variant (best is shown)")
+    args = parser.parse_args()
+
+    store = get_store()
+    print(f"store {store.name}, archive {archive_dir()}\n")
+
+    db, db_seconds = timed("database: PRICE, all columns", lambda: load_store(store), args.repeat)
+    arch, arch_seconds = timed("archive: 4 columns, memory-mapped",
+                               lambda: load_archive(["Product", "Date", "Seller", "Price"]), args.repeat)
+    timed("archive: Product/Date/Price only", lambda: load_archive(["Product", "Date", "Price"]), args.repeat)
+    last = arch["Date"].max() - pd.Timedelta(days=30)
+    timed("archive: last 30 days (partition pruning)", lambda: load_archive(start=last), args.repeat)
+    print(f"\narchive load is {db_seconds / arch_seconds:.1f}x faster than the database")
+
+    # Same history, same metrics
+    keys = ["Product", "Date", "Seller"]
+    a, b = (df[["Product", "Date", "Seller", "Price"]].astype({"Date": "datetime64[ns]"})
+            .sort_values(keys).reset_index(drop=True) for df in (db, arch))
+    rows_equal = len(a) == len(b) and a[keys].equals(b[keys]) and (a["Price"] - b["Price"]).abs().max() < 0.005
+    ma, mb = product_date_metrics(a), product_date_metrics(b)
+    metrics_equal = ma[keys[:2]].equals(mb[keys[:2]]) and ((ma.drop(columns=keys[:2]) - mb.drop(columns=keys[:2]))
+                                                            .abs().fillna(0).max().max() < 1e-6)
+    print(f"rows equal: {rows_equal}, metrics equal: {metrics_equal}")
+    if not (rows_equal and metrics_equal):
+        sys.exit("[FAIL] archive and database disagree (run etl/price_archive.py export)")
@@ -0,0 +1,145 @@
+"""
+Replay benchmark for the price extractors over the recorded page corpus.
+
+Record pages first (online, once):
+    PRICE_RECORD_PAGES=1 python etl/run_all_etl.py
+
+Then replay offline, as often as needed:
+    python benchmarks/bench_extractors.py                    # compare with baseline
+    python benchmarks/bench_extractors.py --update-baseline  # accept current numbers
+
+Reports pages/sec, p50/p99 parse latency and extraction success rate per
+extractor branch, and exits non-zero if throughput dropped more than
+--threshold below the stored baseline.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "etl"))
+import page_recorder  # noqa: E402
+from Amazon_ETL import parse_amazon_price  # noqa: E402
+from Ebay_ETL import parse_ebay_price  # noqa: E402
+from Idealo_ETL import parse_idealo_prices  # noqa: E402
+
+BASELINE_FILE = os.path.join(HERE, "extractor_baseline.json")
+DEFAULT_THRESHOLD = 0.20    # fail when pages/sec drops more than 20%
+
+
+# The branch a page exercises, so e.g. eBay listing and item pages are
+# measured separately. Based on the markers each extractor looks for.
+def branch_for(source, html):
+    if source == "ebay":
+        return "ebay/listing" if "s-item" in html else "ebay/item"
+    if source == "amazon":
+        return "amazon/whole+fraction" if "a-price-whole" in html else "amazon/offscreen"
+    return "idealo/offers"
+
+
+def extract(source, html):
+    """Runs the extractor; returns True when it found a price."""
+    if source == "amazon":
+        return parse_amazon_price(html) is not None
+    if source == "ebay":
+        return parse_ebay_price(html) is not None
+    return bool(parse_idealo_prices(html)[1])
+
+
+def load_corpus(version=None):
+    folder = page_recorder.corpus_path(version)
+    manifest = page_recorder.load_manifest(version)
+    pages = []
+    for rel, meta in sorted(manifest["pages"].items()):
+        with open(os.path.join(folder, rel), encoding="utf-8") as f:
+            html = f.read()
+        pages.append((meta["source"], branch_for(meta["source"], html), html))
+    return manifest["version"], pages
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def run(pages, repeat):
+    results = {}
+    for source, branch, html in pages:
+        r = results.setdefault(branch, {"latencies": [], "ok": 0, "pages": 0})
+        for _ in range(repeat):
+            started = time.perf_counter()
+            ok = extract(source, html)
+            r["latencies"].append(time.perf_counter() - started)
+        r["ok"] += ok
+        r["pages"] += 1
+
+    summary = {}
+    for branch, r in sorted(results.items()):
+        lat = r["latencies"]
+        summary[branch] = {
+            "pages": r["pages"],
+            "pages_per_sec": len(lat) / sum(lat),
+            "p50_ms": percentile(lat, 50) * 1000,
+            "p99_ms": percentile(lat, 99) * 1000,
+            "mean_ms": statistics.mean(lat) * 1000,
+            "success_rate": r["ok"] / r["pages"],
+        }
+    return summary
+
+
+def print_summary(summary, baseline):
+    print(f"{'branch':24} {'pages':>6} {'pages/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'success':>8} {'vs base':>8}")
+    for branch, s in summary.items():
+        base = baseline.get(branch, {}).get("pages_per_sec")
+        change = f"{(s['pages_per_sec'] / base - 1) * 100:+.0f}%" if base else "n/a"
+        print(f"{branch:24} {s['pages']:6} {s['pages_per_sec']:9.1f} {s['p50_ms']:8.2f} "
+              f"{s['p99_ms']:8.2f} {s['success_rate']:8.0%} {change:>8}")
+
+
+def regressions(summary, baseline, threshold):
+    failed = []
+    for branch, s in summary.items():
+        base = baseline.get(branch, {}).get("pages_per_sec")
+        if base and s["pages_per_sec"] < base * (1 - threshold):
+            failed.append(branch)
+    return failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--version", default=None, help="corpus version (default: PRICE_CORPUS_VERSION or v1)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    version, pages = load_corpus(args.version)
+    if not pages:
+        sys.exit(f"Corpus {version} is empty; record pages with PRICE_RECORD_PAGES=1 first")
+
+    baseline = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE, encoding="utf-8") as f:
+            baseline = json.load(f).get(version, {})
+
+    summary = run(pages, args.repeat)
+    print(f"corpus {version}: {len(pages)} pages x {args.repeat} runs")
+    print_summary(summary, baseline)
+
+    if args.update_baseline:
+        stored = {}
+        if os.path.exists(BASELINE_FILE):
+            with open(BASELINE_FILE, encoding="utf-8") as f:
+                stored = json.load(f)
+        stored[version] = summary
+        with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+            json.dump(stored, f, indent=2, sort_keys=True)
+        print(f"[OK] Baseline for {version} written to {BASELINE_FILE}")
+        sys.exit(0)
+
+    failed = regressions(summary, baseline, args.threshold)
+    if failed:
+        sys.exit(f"[FAIL] Throughput regressed more than {args.threshold:.0%} for: {', '.join(failed)}")
@@ -0,0 +1,74 @@
+"""
+Microbenchmark for the HTML parser backends (see etl/html_parse.py).
+
+Runs every extractor over saved pages with each backend, reports parse
+time per page and checks that every backend returns exactly what the
+original full "html.parser" tree returns.
+
+Pages are read from <pages>/<source>/*.html, source = amazon | ebay | idealo:
+
+    python benchmarks/bench_html_parse.py --pages benchmarks/corpus --repeat 5
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "etl"))
+from html_parse import BACKENDS  # noqa: E402
+from Amazon_ETL import parse_amazon_price  # noqa: E402
+from Ebay_ETL import parse_ebay_price  # noqa: E402
+from Idealo_ETL import parse_idealo_prices  # noqa: E402
+
+EXTRACTORS = {
+    "amazon": parse_amazon_price,
+    "ebay": parse_ebay_price,
+    "idealo": parse_idealo_prices,
+}
+REFERENCE_BACKEND = "html.parser"
+
+
+def load_pages(folder):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(folder, "**", "*.html"), recursive=True)):
+        source = os.path.basename(os.path.dirname(path)).lower()
+        if source in EXTRACTORS:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                pages.append((source, path, f.read()))
+    return pages
+
+
+def run(pages, repeat):
+    reference = {path: EXTRACTORS[source](html, REFERENCE_BACKEND) for source, path, html in pages}
+    mismatches = 0
+
+    print(f"{'backend':22} {'pages':>6} {'ms/page':>9} {'speedup':>8} {'mismatch':>9}")
+    baseline = None
+    for backend in BACKENDS:
+        bad = 0
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for source, path, html in pages:
+                if EXTRACTORS[source](html, backend) != reference[path]:
+                    bad += 1
+        ms = (time.perf_counter() - started) * 1000 / (repeat * len(pages))
+        baseline = baseline or ms
+        print(f"{backend:22} {len(pages):6} {ms:9.2f} {baseline / ms:7.1f}x {bad // repeat:9}")
+        mismatches += bad
+
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus"))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages)
+    if not pages:
+        sys.exit(f"No pages found under {args.pages}/<amazon|ebay|idealo>/*.html")
+
+    if run(pages, args.repeat):
+        sys.exit("[FAIL] Some backends do not match the html.parser reference")
@@ -0,0 +1,87 @@
+"""
+Benchmark: product x date metrics, legacy groupby().apply(lambda ...) (the
+old generate_pdf_report code) vs the vectorized product_date_metrics().
+
+Synthetic data: products x dates x sellers rows. The legacy path is far too
+slow for millions of rows, so it runs on a product sample and is scaled up.
+
+    python benchmarks/bench_metrics.py --products 5000 --dates 60 --sellers 8
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "etl"))
+from price_metrics import product_date_metrics, OUR_SELLER  # noqa: E402
+
+
+def synthetic_prices(products, dates, sellers, seed=42):
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Product {i}" for i in range(products)])
+    days = pd.date_range("2024-01-01", periods=dates, freq="D")
+    seller_names = np.array([OUR_SELLER] + [f"Seller {i}" for i in range(1, sellers)])
+
+    n = products * dates * sellers
+    base = rng.uniform(50, 1500, products)
+    return pd.DataFrame({
+        "Product": np.repeat(names, dates * sellers),
+        "Date": np.tile(np.repeat(days, sellers), products),
+        "Seller": np.tile(seller_names, products * dates),
+        "Price": np.round(np.repeat(base, dates * sellers) * rng.uniform(0.8, 1.2, n), 2),
+    })
+
+
+def legacy_metrics(df):
+    # Verbatim copy of the old per-group lambda from generate_pdf_report
+    return (
+        df.groupby(["Product", "Date"], as_index=False)
+        .apply(lambda x: pd.Series({
+            "min_price": x["Price"].min(),
+            "avg_price": x["Price"].mean(),
+            "our_price": x.loc[x["Seller"] == "Our company", "Price"].values[0]
+            if len(x.loc[x["Seller"] == "Our company", "Price"].values) > 0
+            else None,
+            "our_rank": int(
+                x.sort_values("Price")["Seller"]
+                .tolist()
+                .index("Our company") + 1
+            ) if "Our company" in x["Seller"].values else None
+        }))
+        .reset_index(drop=True)
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--dates", type=int, default=60)
+    parser.add_argument("--sellers", type=int, default=8)
+    parser.add_argument("--legacy-products", type=int, default=50,
+                        help="products the legacy path runs on (result is scaled up)")
+    args = parser.parse_args()
+
+    df = synthetic_prices(args.products, args.dates, args.sellers)
+    print(f"{len(df):,} rows, {args.products * args.dates:,} product x date groups")
+
+    started = time.perf_counter()
+    fast = product_date_metrics(df)
+    fast_s = time.perf_counter() - started
+    print(f"vectorized:            {fast_s:8.2f}s")
+
+    sample = df[df["Product"].isin(df["Product"].unique()[:args.legacy_products])]
+    started = time.perf_counter()
+    slow = legacy_metrics(sample)
+    slow_s = (time.perf_counter() - started) * args.products / args.legacy_products
+    print(f"legacy (extrapolated): {slow_s:8.2f}s  ({args.legacy_products} products measured)")
+    print(f"speedup: {slow_s / fast_s:.0f}x")
+
+    # Same numbers on the sample (random prices have no ties, so ranks agree)
+    check = fast[fast["Product"].isin(slow["Product"])].reset_index(drop=True)
+    slow = slow.sort_values(["Product", "Date"]).reset_index(drop=True)
+    for col in ["min_price", "avg_price", "our_price", "our_rank"]:
+        if not np.allclose(check[col].astype(float), slow[col].astype(float)):
+            sys.exit(f"[FAIL] {col} differs from the legacy computation")
+    print("[OK] vectorized metrics match the legacy computation")
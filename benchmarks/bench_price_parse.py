@@ -0,0 +1,119 @@
+"""
+Benchmark + round-trip check for price_parse.py.
+
+Generates raw price strings the way shops print them (EU / US separators,
+currency symbols and codes, no-break spaces, shipping text, junk) from
+known amounts, then:
+  - checks that the scalar and the memoized column parser give back exactly the
+    amount every string was made from (exits non-zero on any mismatch),
+  - times the legacy eBay parser (parse_price_eur), the scalar parser and
+    the memoized column parser.
+
+    python benchmarks/bench_price_parse.py --rows 2000000 --distinct 50000
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "etl"))
+from price_parse import parse_cents, parse_cents_memoized, shipping_cents  # noqa: E402
+
+
+def legacy_parse_price_eur(text):
+    # Copy of the old Ebay_ETL.parse_price_eur
+    if not text:
+        return None
+    t = " ".join(str(text).replace("\xa0", " ").strip().split())
+    m = re.search(r"(\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2})|\d+[.,]\d{2})", t)
+    if not m:
+        return None
+    num = m.group(0)
+    if "." in num and "," in num:
+        num = num.replace(".", "").replace(",", ".")
+    elif "," in num:
+        num = num.replace(",", ".")
+    try:
+        return float(num)
+    except ValueError:
+        return None
+
+
+# RAW STRING GENERATOR
+
+def group(n, sep):
+    s = str(n)
+    parts = []
+    while len(s) > 3:
+        parts.insert(0, s[-3:])
+        s = s[:-3]
+    return sep.join([s] + parts)
+
+
+NBSP = "\u00a0"
+
+FORMATS = [
+    lambda e, c: f"{group(e, '.')},{c:02d} €",          # 1.299,99 €
+    lambda e, c: f"EUR {group(e, '.')},{c:02d}",         # EUR 1.299,99
+    lambda e, c: f"{group(e, NBSP)},{c:02d}{NBSP}€",     # 1 299,99 € (no-break spaces)
+    lambda e, c: f"${group(e, ',')}.{c:02d}",            # $1,299.99
+    lambda e, c: f"USD {e}.{c:02d}",                     # USD 1299.99
+    lambda e, c: f"+EUR {e},{c:02d} Versand",            # eBay shipping line
+    lambda e, c: f"{e},{c:02d}",                         # 1299,99
+]
+JUNK = ["", "Preis auf Anfrage", "n/a", "—"]
+
+
+def make_strings(rows, distinct, seed=42):
+    """Returns (raw strings, expected cents or -1 for junk)."""
+    rng = np.random.default_rng(seed)
+    cents = rng.integers(1, 500_000_00, distinct)
+    fmt = rng.integers(0, len(FORMATS), distinct)
+    pool = [FORMATS[f](int(c) // 100, int(c) % 100) for c, f in zip(cents, fmt)]
+    expected = list(cents)
+
+    pool += JUNK
+    expected += [-1] * len(JUNK)
+
+    pick = rng.integers(0, len(pool), rows)
+    return np.array(pool, dtype=object)[pick], np.array(expected)[pick]
+
+
+def timed(label, func, n):
+    started = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - started
+    print(f"{label:34} {n:10} strings {seconds:8.2f}s {n / seconds / 1e6:8.2f} M strings/sec")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--distinct", type=int, default=50_000, help="distinct price strings")
+    parser.add_argument("--scalar-sample", type=int, default=200_000,
+                        help="strings run through the scalar/legacy parsers (they are slow)")
+    args = parser.parse_args()
+
+    raw, expected = make_strings(args.rows, args.distinct)
+    sample = raw[:args.scalar_sample]
+
+    timed("legacy parse_price_eur (float)", lambda: [legacy_parse_price_eur(s) for s in sample], len(sample))
+    scalar = timed("parse_cents (scalar)", lambda: [parse_cents(s) for s in sample], len(sample))
+    column = timed("parse_cents_memoized (column)", lambda: parse_cents_memoized(raw), len(raw))
+    unique_raw, _ = make_strings(len(sample), len(sample), seed=7)
+    timed("parse_cents_memoized (all distinct)", lambda: parse_cents_memoized(unique_raw), len(unique_raw))
+
+    # Round trip: every string parses back to the amount it was made from
+    column_bad = int((column.to_numpy(dtype="float64", na_value=-1) != expected).sum())
+    scalar_bad = sum(
+        (got is None) != (exp == -1) or (got is not None and got != exp)
+        for got, exp in zip(scalar, expected[:len(sample)])
+    )
+    ship_bad = sum(shipping_cents(s) != (0 if e == -1 else e) for s, e in zip(sample[:10000], expected[:10000]))
+
+    print(f"\nround trip mismatches: column {column_bad}, scalar {scalar_bad}, shipping {ship_bad}")
+    if column_bad or scalar_bad or ship_bad:
+        sys.exit("[FAIL] parsers disagree with the generated amounts")
@@ -0,0 +1,73 @@
+"""
+Benchmark: per-row INSERT + commit (old insert_price path) vs PriceWriter
+batched upserts. Runs against a scratch table (PRICE_BENCH) with the PRICE
+schema that is dropped at the end, so the real data is never touched.
+
+    python benchmarks/bench_price_writer.py --rows 2000
+    PRICE_STORE=sqlite python benchmarks/bench_price_writer.py
+"""
+import os
+import sys
+import time
+import argparse
+import datetime as dt
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "etl"))
+from price_store import get_store  # noqa: E402
+from price_writer import BATCH_SIZE  # noqa: E402
+
+BENCH_TABLE = "PRICE_BENCH"
+
+store = get_store()
+
+
+def make_rows(n):
+    today = dt.date.today()
+    return [(f"Bench product {i}", today, f"Seller {i % 20}", round(100 + i * 0.37, 2)) for i in range(n)]
+
+
+def reset_table():
+    store.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+    store.create_schema(table=BENCH_TABLE)
+
+
+def per_row(rows):
+    # Same pattern as the old Amazon insert_price(): connect, insert, commit, close
+    for row in rows:
+        conn = store.connect()
+        cur = conn.cursor()
+        store.upsert(cur, [row], BENCH_TABLE)
+        conn.commit()
+        conn.close()
+
+
+def buffered(rows, batch_size):
+    writer = store.writer(batch_size=batch_size, table=BENCH_TABLE)
+    writer.add_many(rows)
+    writer.close()
+
+
+def timed(label, func, *args):
+    reset_table()
+    started = time.perf_counter()
+    func(*args)
+    seconds = time.perf_counter() - started
+    n = len(args[0])
+    print(f"{label:28} {n:8} rows {seconds:8.2f}s {n / seconds:10.0f} rows/sec")
+    return seconds
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    print(f"store: {store.name}")
+    try:
+        slow = timed("per-row connect/commit", per_row, rows)
+        fast = timed(f"PriceWriter (batch {args.batch_size})", buffered, rows, args.batch_size)
+        print(f"speedup: {slow / fast:.1f}x")
+    finally:
+        store.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
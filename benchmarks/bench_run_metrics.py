@@ -0,0 +1,84 @@
+"""
+Benchmark + check for run_metrics.py.
+
+  - overhead of run_metrics.timer() / count() per call with metrics off
+    and on, next to an empty `with` block as the baseline,
+  - quantiles of the reservoir sample against the exact quantiles of the
+    same observations (exits non-zero if p50/p95/p99 are off by more than
+    --tolerance).
+
+    python benchmarks/bench_run_metrics.py --calls 1000000
+"""
+import os
+import sys
+import time
+import argparse
+from contextlib import nullcontext
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "etl"))
+import run_metrics  # noqa: E402
+
+
+def per_call(label, func, calls):
+    started = time.perf_counter()
+    func(calls)
+    ns = (time.perf_counter() - started) / calls * 1e9
+    print(f"{label:38} {ns:8.0f} ns/call")
+    return ns
+
+
+def empty_with(calls):
+    ctx = nullcontext()
+    for _ in range(calls):
+        with ctx:
+            pass
+
+
+def timed_block(calls):
+    for _ in range(calls):
+        with run_metrics.timer("fetch", "bench"):
+            pass
+
+
+def counted(calls):
+    for _ in range(calls):
+        run_metrics.count("requests", source="bench")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    parser.add_argument("--observations", type=int, default=1_000_000,
+                        help="latencies fed to one timer for the quantile check")
+    parser.add_argument("--tolerance", type=float, default=0.05, help="max relative quantile error")
+    args = parser.parse_args()
+
+    per_call("baseline: empty with-block", empty_with, args.calls)
+    os.environ["PRICE_METRICS"] = "0"
+    per_call("metrics off: timer()", timed_block, args.calls)
+    per_call("metrics off: count()", counted, args.calls)
+    os.environ["PRICE_METRICS"] = "1"
+    per_call("metrics on: timer()", timed_block, args.calls)
+    per_call("metrics on: count()", counted, args.calls)
+
+    # Long-tailed latencies, as page loads are
+    rng = np.random.default_rng(1)
+    latencies = rng.lognormal(mean=-1.0, sigma=0.8, size=args.observations)
+    run_metrics.REGISTRY.reset()
+    for seconds in latencies:
+        run_metrics.observe("page_load", float(seconds), "bench")
+    summary = run_metrics.REGISTRY.snapshot()["timers"][0]
+
+    print(f"\n{'':6} {'exact':>9} {'sampled':>9} {'error':>7}")
+    worst = 0.0
+    for level in run_metrics.QUANTILES:
+        exact = float(np.quantile(latencies, level))
+        sampled = summary[f"p{int(level * 100)}"]
+        error = abs(sampled - exact) / exact
+        worst = max(worst, error)
+        print(f"p{int(level * 100):<5} {exact:9.4f} {sampled:9.4f} {100 * error:6.1f}%")
+    print(f"count {summary['count']} (exact sum {latencies.sum():.1f}, recorded {summary['sum']:.1f})")
+
+    if worst > args.tolerance or summary["count"] != args.observations:
+        sys.exit("[FAIL] sampled quantiles are off")
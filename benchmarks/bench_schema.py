@@ -0,0 +1,169 @@
+"""
+Benchmark: PRICE schema v1 (string keys) vs v2 (PRODUCT / SELLER dimensions,
+integer-keyed, date-clustered PRICE_FACT). Loads the same synthetic history
+into two scratch databases and reports table/index size and the latency of
+the queries the pipeline runs.
+
+    python benchmarks/bench_schema.py --products 2000 --days 60
+    PRICE_STORE=mysql python benchmarks/bench_schema.py   # needs CREATE DATABASE rights
+
+SQLite scratch files go to the temp folder; on MySQL the scratch databases
+are price_bench_v1 / price_bench_v2. Both are dropped at the end.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import datetime as dt
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "etl"))
+from price_store import (  # noqa: E402
+    DB_CONFIG, MySQLPriceStore, SQLitePriceStore, PRICE_TABLE, OUR_SELLER,
+)
+
+SELLERS = [OUR_SELLER, "Amazon", "Ebay", "Idealo", "Marketplace A", "Marketplace B"]
+
+
+def make_stores(backend):
+    if backend == "sqlite":
+        folder = tempfile.mkdtemp(prefix="price_bench_")
+        return {v: SQLitePriceStore(os.path.join(folder, f"{v}.sqlite"), schema=v) for v in ("v1", "v2")}
+
+    import mysql.connector
+    admin = {k: v for k, v in DB_CONFIG.items() if k != "database"}
+    with mysql.connector.connect(**admin) as conn, conn.cursor() as cur:
+        for v in ("v1", "v2"):
+            cur.execute(f"DROP DATABASE IF EXISTS price_bench_{v}")
+            cur.execute(f"CREATE DATABASE price_bench_{v}")
+    return {v: MySQLPriceStore({**DB_CONFIG, "database": f"price_bench_{v}"}, schema=v) for v in ("v1", "v2")}
+
+
+def drop_stores(stores):
+    for store in stores.values():
+        if isinstance(store, SQLitePriceStore):
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(store.path + suffix):
+                    os.remove(store.path + suffix)
+        else:
+            store.execute(f"DROP DATABASE IF EXISTS {store.config['database']}")
+
+
+def make_rows(products, days, sellers_per_product):
+    rng = random.Random(42)
+    first = dt.date.today() - dt.timedelta(days=days - 1)
+    rows = []
+    for d in range(days):
+        day = first + dt.timedelta(days=d)
+        for p in range(products):
+            base = 50 + (p % 500)
+            for seller in SELLERS[:sellers_per_product]:
+                rows.append((f"Benchmark product {p:06d} with a realistic long name", day, seller,
+                             round(base * rng.uniform(0.9, 1.2), 2)))
+    return rows
+
+
+def load(store, rows, batch_size=5000):
+    store.create_schema()
+    conn = store.connect()
+    try:
+        cur = conn.cursor()
+        for i in range(0, len(rows), batch_size):
+            store.upsert(cur, rows[i:i + batch_size])
+            conn.commit()
+        cur.close()
+    finally:
+        conn.close()
+
+
+# SIZE
+
+def sizes(store):
+    """(data bytes, index bytes) of the price tables."""
+    if isinstance(store, SQLitePriceStore):
+        # dbstat: one row per b-tree page; WITHOUT ROWID tables store their
+        # rows in the primary key b-tree, which counts as data here
+        rows = store.query("""
+            SELECT m.type, SUM(s.pgsize)
+            FROM dbstat s JOIN sqlite_master m ON m.name = s.name
+            WHERE m.tbl_name IN ('PRICE', 'PRICE_FACT', 'PRODUCT', 'SELLER')
+            GROUP BY m.type
+        """)
+        by_type = dict(rows)
+        return by_type.get("table", 0), by_type.get("index", 0)
+
+    tables = ("PRICE", "PRICE_FACT", "PRODUCT", "SELLER")
+    for table in tables:
+        if store.object_type(table) == "table":
+            store.query(f"ANALYZE TABLE {table}")
+    rows = store.query(f"""
+        SELECT SUM(DATA_LENGTH), SUM(INDEX_LENGTH) FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_TYPE = 'BASE TABLE'
+          AND TABLE_NAME IN ({', '.join(['%s'] * len(tables))})
+    """, tables)
+    return int(rows[0][0] or 0), int(rows[0][1] or 0)
+
+
+# QUERY LATENCY
+
+# The access patterns of the pipeline, all through the PRICE view on v2
+QUERIES = {
+    "db_summary (offers per seller on a date)":
+        lambda store, day, product: store.seller_counts(day),
+    "product history (report)":
+        lambda store, day, product: store.query(
+            f"SELECT Date, Seller, Price FROM {PRICE_TABLE} WHERE Product = %s ORDER BY Date", (product,)),
+    "one day of prices":
+        lambda store, day, product: store.query(
+            f"SELECT Product, Seller, Price FROM {PRICE_TABLE} WHERE Date = %s", (day,)),
+    "daily stats for a date (backfill)":
+        lambda store, day, product: store.query(store._stats_select(), (OUR_SELLER, day)),
+}
+
+
+def latency(store, func, day, product, repeat):
+    func(store, day, product)   # warm-up
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(store, day, product)
+        runs.append(time.perf_counter() - started)
+    return statistics.median(runs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--sellers", type=int, default=4, help="offers per product and day")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    backend = os.environ.get("PRICE_STORE", "sqlite").lower()
+    rows = make_rows(args.products, args.days, args.sellers)
+    stores = make_stores(backend)
+    print(f"{backend}: {len(rows)} rows ({args.products} products x {args.days} days x {args.sellers} offers)")
+
+    try:
+        for version, store in stores.items():
+            started = time.perf_counter()
+            load(store, rows)
+            print(f"[OK] Loaded schema {version} in {time.perf_counter() - started:.1f}s")
+
+        day = str(rows[len(rows) // 2][1])
+        product = rows[len(rows) // 2][0]
+
+        print(f"\n{'':42} {'v1':>12} {'v2':>12} {'v2/v1':>7}")
+        measured = {v: sizes(s) for v, s in stores.items()}
+        for i, label in enumerate(["data size", "index size"]):
+            v1, v2 = measured["v1"][i], measured["v2"][i]
+            print(f"{label:42} {v1 / 1e6:10.1f}MB {v2 / 1e6:10.1f}MB {v2 / v1 if v1 else 0:7.2f}")
+
+        for label, func in QUERIES.items():
+            v1 = latency(stores["v1"], func, day, product, args.repeat)
+            v2 = latency(stores["v2"], func, day, product, args.repeat)
+            print(f"{label:42} {v1 * 1000:10.2f}ms {v2 * 1000:10.2f}ms {v2 / v1:7.2f}")
+    finally:
+        drop_stores(stores)
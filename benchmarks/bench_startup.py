@@ -0,0 +1,178 @@
+"""
+Startup time of the command line entry points (price_collect.py and its
+commands, and the old per-script entry points), with a regression guard.
+
+For every case:
+  ms           median wall time of --repeat fresh interpreters
+  import_ms    import time reported by `python -X importtime`
+  modules      number of modules imported
+  heavy        heavy third-party packages that got imported
+
+A case fails when it imports a heavy package it must not (e.g.
+`price_collect.py --help` importing pandas), and --check also fails when
+a case got slower than --threshold times the last recorded run. Results
+are appended to data/benchmarks/startup.jsonl.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --check --repeat 9
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import datetime as dt
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, "..")
+ETL = os.path.join(ROOT, "etl")
+CLI = os.path.join(ROOT, "price_collect.py")
+
+HISTORY_FILE = os.path.join(ROOT, "data", "benchmarks", "startup.jsonl")
+
+HEAVY = ["pandas", "numpy", "matplotlib", "pypdf", "selenium", "mysql", "pyarrow", "bs4", "lxml", "requests"]
+ALL = set(HEAVY)
+PANDAS = {"pandas", "numpy", "pyarrow"}    # pandas imports pyarrow itself when it is installed
+
+# name -> (python arguments, heavy packages it must not import)
+CASES = {
+    "price_collect --help": ([CLI, "--help"], ALL),
+    "scrape --help": ([CLI, "scrape", "--help"], ALL),
+    "load --help": ([CLI, "load", "--help"], ALL - PANDAS),
+    "report --help": ([CLI, "report", "--help"], ALL),
+    "alert --help": ([CLI, "alert", "--help"], ALL),
+    "schema --help": ([CLI, "schema", "--help"], ALL),
+    # Old entry points (imported, not run); the scrapers need their libraries
+    "import run_all_etl": (["-c", "import run_all_etl"], ALL),
+    "import SQL_database": (["-c", "import SQL_database"], ALL),
+    "import export_schema": (["-c", "import export_schema"], ALL),
+    "import visualization_email": (["-c", "import visualization_email"], ALL),
+    "import Amazon_ETL": (["-c", "import Amazon_ETL"], set()),
+    "import Ebay_ETL": (["-c", "import Ebay_ETL"], set()),
+    "import Idealo_ETL": (["-c", "import Idealo_ETL"], set()),
+}
+
+
+def environment():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([ETL, ROOT] + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else []))
+    return env
+
+
+def run(args, env, importtime=False):
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + args
+    started = time.perf_counter()
+    done = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True)
+    seconds = time.perf_counter() - started
+    if done.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{done.stderr[-2000:]}")
+    return seconds, done.stderr
+
+
+def parse_importtime(stderr):
+    """(total import seconds, imported module names) from -X importtime output."""
+    total, modules = 0, []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.append(name.strip())
+        if not name[1:].startswith(" "):     # top level: no indentation
+            total += int(cumulative)
+    return total / 1e6, modules
+
+
+def measure(args, repeat, env):
+    run(args, env)      # warm the bytecode / file system caches
+    wall = [run(args, env)[0] for _ in range(repeat)]
+    import_seconds, modules = parse_importtime(run(args, env, importtime=True)[1])
+    heavy = sorted({name.split(".")[0] for name in modules} & ALL)
+    return {
+        "ms": round(1000 * statistics.median(wall), 1),
+        "import_ms": round(1000 * import_seconds, 1),
+        "modules": len(modules),
+        "heavy": heavy,
+    }
+
+
+# HISTORY
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def previous_run(path):
+    if not os.path.exists(path):
+        return None
+    last = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            last = json.loads(line)
+    return last
+
+
+def append_run(path, record):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per case (median)")
+    parser.add_argument("--history", default=HISTORY_FILE, help="JSON-lines file of past results")
+    parser.add_argument("--threshold", type=float, default=1.5,
+                        help="slower than this x the last run = regression (startup times are noisy)")
+    parser.add_argument("--check", action="store_true", help="also exit non-zero on a timing regression")
+    args = parser.parse_args()
+
+    env = environment()
+    baseline = measure(["-c", "pass"], args.repeat, env)["ms"]
+    print(f"bare interpreter: {baseline:.1f} ms\n")
+
+    before = previous_run(args.history)
+    results, failures, regressions = {}, [], []
+    print(f"{'case':28} {'ms':>8} {'import ms':>10} {'modules':>8} {'vs last':>8}  heavy imports")
+    for case in args.cases:
+        argv, forbidden = CASES[case]
+        r = results[case] = measure(argv, args.repeat, env)
+
+        change = ""
+        old = (before or {}).get("results", {}).get(case)
+        if old:
+            ratio = r["ms"] / old["ms"]
+            change = f"{ratio:.2f}x"
+            if ratio > args.threshold:
+                regressions.append(case)
+                change += " !"
+        unwanted = sorted(set(r["heavy"]) & forbidden)
+        if unwanted:
+            failures.append((case, unwanted))
+        print(f"{case:28} {r['ms']:8.1f} {r['import_ms']:10.1f} {r['modules']:8} {change:>8}  "
+              f"{', '.join(r['heavy']) or '-'}")
+
+    append_run(args.history, {
+        "time": dt.datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.node(),
+        "bare_ms": baseline,
+        "results": results,
+    })
+    print(f"\nresults appended to {args.history}"
+          + (f" (compared with the run of {before['time']}, commit {before['commit']})" if before else ""))
+
+    for case in regressions:
+        print(f"[WARN] {case}: above {args.threshold}x the startup time of the last run")
+    for case, unwanted in failures:
+        print(f"[FAIL] {case} imports {', '.join(unwanted)}")
+    if failures or (args.check and regressions):
+        sys.exit(1)
@@ -0,0 +1,181 @@
+"""
+Deterministic synthetic PRICE history for scaling tests.
+
+Every product has a base price and a random set of sellers ("Our company"
+always, plus Amazon, Ebay, Idealo and generic shops). Each offer follows
+its own random walk in log space, with:
+  - promotions: a few windows of 2-10 days at 10-35% off,
+  - seller churn: shops start listing a product late or drop it early,
+  - missing days: single failed scrapes plus days a whole source was down.
+The same --seed gives the same rows (each product has its own random
+stream), whatever the chunk size or output.
+
+    python benchmarks/generate_prices.py --products 10000 --days 1095 --sellers 20 --out store
+    python benchmarks/generate_prices.py --products 500 --days 90 --out /tmp/prices.csv
+    python benchmarks/generate_prices.py --products 500 --days 90 --out archive   # needs pyarrow
+
+--out store writes into the configured price store (PRICE_STORE /
+PRICE_STORE_PATH) through the same staging table + set-based merge as
+import_csv.py, then refreshes PRICE_DAILY_STATS.
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "etl"))
+from price_store import get_store, OUR_SELLER  # noqa: E402
+
+START_DATE = "2023-01-01"
+CHUNK_PRODUCTS = 200            # products per DataFrame chunk
+NAMED_SELLERS = ["Amazon", "Ebay", "Idealo"]
+
+LISTED = 0.6                    # chance a shop lists a given product at all
+LATE_START = 0.4                # ... starts listing it after the first day
+EARLY_STOP = 0.3                # ... stops before the last day
+STEP_SIGMA = 0.02               # daily log-price step when a price changes
+PROMOS_PER_YEAR = 4
+SCRAPE_MISS = 0.03              # single missing (product, seller, day) rows
+OUTAGE_DAYS = 0.01              # days a whole seller is missing
+
+
+def seller_names(sellers):
+    shops = [f"Shop {i:02d}" for i in range(1, max(0, sellers - 1 - len(NAMED_SELLERS)) + 1)]
+    return np.array(([OUR_SELLER] + NAMED_SELLERS + shops)[:max(1, sellers)])
+
+
+def outages(days, n_sellers, seed):
+    """(seller x day) mask of days a whole seller was down, shared by all products."""
+    down = np.random.default_rng([seed, 1 << 31]).random((n_sellers, days)) < OUTAGE_DAYS
+    down[0] = False
+    return down
+
+
+def product_prices(index, days, n_sellers, seed, down):
+    """(seller index, day index, price) arrays for product `index`."""
+    rng = np.random.default_rng([seed, index])
+
+    # Which sellers list the product, and from/until which day
+    listed = rng.random(n_sellers) < LISTED
+    listed[0] = True                                    # our company
+    first = np.where(rng.random(n_sellers) < LATE_START, rng.integers(0, days, n_sellers), 0)
+    last = np.where(rng.random(n_sellers) < EARLY_STOP, rng.integers(0, days, n_sellers) + 1, days)
+    first[0], last[0] = 0, days
+    day = np.arange(days)
+    present = listed[:, None] & (day >= first[:, None]) & (day < last[:, None])
+
+    # Random walk per offer: each seller changes its price on some days
+    base = np.exp(rng.normal(np.log(250), 0.9))
+    offset = rng.normal(0, 0.06, n_sellers)
+    change_rate = rng.uniform(0.02, 0.3, n_sellers)
+    changes = rng.random((n_sellers, days)) < change_rate[:, None]
+    steps = np.where(changes, rng.normal(0, STEP_SIGMA, (n_sellers, days)), 0.0)
+    log_price = np.log(base) + offset[:, None] + np.cumsum(steps, axis=1)
+
+    # Promotions: a discount over a few consecutive days
+    promo = np.zeros((n_sellers, days))
+    n_promos = rng.poisson(PROMOS_PER_YEAR * days / 365, n_sellers)
+    for s in np.nonzero(n_promos)[0]:
+        for _ in range(n_promos[s]):
+            begin = rng.integers(0, days)
+            promo[s, begin:begin + rng.integers(2, 11)] = rng.uniform(0.10, 0.35)
+    price = np.maximum(np.round(np.exp(log_price) * (1 - promo), 2), 1.0)
+
+    # Failed scrapes and whole-source outages (our own price is never missing)
+    missing = (rng.random((n_sellers, days)) < SCRAPE_MISS) | down
+    missing[0] = False
+    seller, when = np.nonzero(present & ~missing)
+    return seller, when, price[seller, when]
+
+
+def generate(products, days, sellers, seed=42, start=START_DATE, chunk_products=CHUNK_PRODUCTS):
+    """Yields Product, Date (ISO string), Seller, Price DataFrames, `chunk_products` products each."""
+    names = seller_names(sellers)
+    dates = pd.date_range(start, periods=days, freq="D").strftime("%Y-%m-%d").to_numpy()
+    down = outages(days, len(names), seed)
+
+    for chunk_start in range(0, products, chunk_products):
+        parts = []
+        for index in range(chunk_start, min(products, chunk_start + chunk_products)):
+            seller, when, price = product_prices(index, days, len(names), seed, down)
+            parts.append((index, seller, when, price))
+
+        sizes = [len(p[1]) for p in parts]
+        yield pd.DataFrame({
+            "Product": np.repeat([f"Synthetic product {p[0]:05d}" for p in parts], sizes),
+            "Date": dates[np.concatenate([p[2] for p in parts])],
+            "Seller": names[np.concatenate([p[1] for p in parts])],
+            "Price": np.concatenate([p[3] for p in parts]),
+        })
+
+
+# OUTPUTS
+
+def write_store(chunks, store=None):
+    """Staging table + set-based merge (see import_csv.py), then PRICE_DAILY_STATS for the date range."""
+    store = store or get_store()
+    store.create_schema()
+    key_order = ["Date", "Product", "Seller"] if store.schema == "v2" else ["Product", "Date", "Seller"]
+    rows = 0
+    dates = set()
+    conn = store.bulk_connect()
+    try:
+        cur = conn.cursor()
+        store.create_staging(cur)
+        for df in chunks:
+            df = df.sort_values(key_order)
+            df["Price"] = df["Price"].map("{:.2f}".format)
+            store.load_staging(cur, list(df.itertuples(index=False, name=None)))
+            store.merge_staging(cur)
+            conn.commit()
+            rows += len(df)
+            dates.update(df["Date"].unique())
+        cur.close()
+    finally:
+        conn.close()
+    store.backfill_daily_stats(dates)
+    return rows
+
+
+def write_csv(chunks, path):
+    rows = 0
+    for i, df in enumerate(chunks):
+        df.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False, float_format="%.2f")
+        rows += len(df)
+    return rows
+
+
+def write_archive(chunks, folder=None):
+    import price_archive
+    rows = sum(price_archive.append_rows(df, folder) for df in chunks)
+    price_archive.compact(folder=folder)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic PRICE history.")
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--sellers", type=int, default=20, help="seller pool, incl. our company")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--start", default=START_DATE, help="first date (YYYY-MM-DD)")
+    parser.add_argument("--out", default="store",
+                        help="'store' (configured price store), 'archive' (Parquet archive) or a .csv path")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    chunks = generate(args.products, args.days, args.sellers, args.seed, args.start)
+    if args.out == "store":
+        rows = write_store(chunks)
+        target = get_store().name
+    elif args.out == "archive":
+        rows = write_archive(chunks)
+        target = "archive"
+    else:
+        rows = write_csv(chunks, args.out)
+        target = args.out
+    seconds = time.perf_counter() - started
+    print(f"[OK] {rows} rows ({args.products} products x {args.days} days x {args.sellers} sellers) "
+          f"written to {target} in {seconds:.1f}s ({rows / seconds if seconds else 0:.0f} rows/sec)")
@@ -1,41 +1,28 @@
-import requests
-import pandas as pd
-import mysql.connector
-import os
-from bs4 import BeautifulSoup
 from datetime import date
+import http_client
+from html_parse import NodeFilter, make_soup
+from price_store import get_store
+from catalog import load_catalog
+from price_parse import parse_price, price_from_parts
+from resume import Checkpoint, OK, EMPTY
+import scheduler
+import run_metrics
 
 
 
-# DATABASE CONNECTION
+# LOAD PRODUCTS FROM THE CATALOG
 
-# Creates and returns a new connection to the MySQL database.
-# It uses the database credentials and connects specifically to the 'prices_db' database.
-# Every time it is called, a fresh connection is created.
-def get_db():
-    return mysql.connector.connect(
-        host="localhost",
-        user="etl_user",
-        password="your_pass",
-        database="price_collection"
-    )
-
-
-
-# LOAD PRODUCTS FROM EXCEL
-
-# This function reads the Excel file that contains the list of products
-# and their corresponding Amazon URLs.
-# The file is stored in the 'data' folder.
-def load_products():
-    return pd.read_excel("products.xlsx")
+# This function returns the list of products and their corresponding
+# Amazon URLs from the shared product catalog (see catalog.py).
+def load_products(path=None):
+    return load_catalog(path, required=("product", "amazon_url"))
 
 
 
 # AMAZON PRICE SCRAPER
 
 # Takes an Amazon product URL and returns the current price
-# as a numeric value (float). If the price cannot be extracted, it returns None.
+# as a Decimal (see price_parse.py). If the price cannot be extracted, it returns None.
 
 def scrape_amazon_price(url):
 
@@ -46,11 +33,37 @@ def scrape_amazon_price(url):
         "Accept-Language": "de-DE,de;q=0.9,en-US;q=0.8,en;q=0.7"
     }
 
-    # Send an HTTP GET request to the Amazon product page
-    response = requests.get(url, headers=headers)
+    # Send an HTTP GET request to the Amazon product page.
+    # The shared client reuses keep-alive connections and enforces
+    # connect/read timeouts, so one slow page cannot hang the whole run.
+    # Timeouts, refused connections and HTTP errors raise (the caller logs
+    # them), so a blocked or error page is never parsed as "no price".
+    run_metrics.count("requests", source="amazon")
+    with run_metrics.timer("fetch", "amazon"):
+        response = http_client.get(url, headers=headers, source="amazon")
+        response.raise_for_status()
+
+    with run_metrics.timer("parse", "amazon"):
+        price = parse_amazon_price(response.text)
+
+    # Only a page with a price goes into the (opt-in) response cache
+    if price is not None:
+        http_client.keep(response)
+    return price
+
+
+
+# AMAZON PRICE EXTRACTION
+
+# Only the price nodes are parsed out of the page (see html_parse.py).
+# "a-price" is kept as a whole so ".a-price .a-offscreen" still matches.
+AMAZON_NODES = NodeFilter(classes={"a-price", "a-price-whole", "a-price-fraction"})
+
+
+def parse_amazon_price(html, backend=None):
 
     # Parse the returned HTML into a BeautifulSoup object
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = make_soup(html, AMAZON_NODES, backend)
 
     # Try to extract the price using Amazon's main price structure
     price_tag = soup.find("span", {"class": "a-price-whole"})
@@ -58,71 +71,84 @@ def scrape_amazon_price(url):
 
     # If the main price format exists, combine whole and fractional parts
     if price_tag:
-        whole = price_tag.text.replace(".", "").replace(",", "").strip()
-        frac = frac_tag.text if frac_tag else "00"
-        return float(f"{whole}.{frac}")
+        return price_from_parts(price_tag.text, frac_tag.text if frac_tag else None)
 
     # Fallback method: extract the full price from the offscreen element
     price = soup.select_one(".a-price .a-offscreen")
     if price:
-        return float(price.text.replace("€","").replace(".","").replace(",","."))
+        return parse_price(price.text)
 
     # If no price could be found, return None
     return None
 
 
 
-# INSERT PRICE INTO DATABASE
-
-# Inserts a price record into the PRICE table.
-# If a record for the same product, date, and seller already exists,
-# the price is updated instead of creating a duplicate entry.
-
-def insert_price(product, seller, price):
-    conn = get_db()
-    cursor = conn.cursor()
-
-    query = """
-    INSERT INTO PRICE (Product, Date, Seller, Price)
-    VALUES (%s, %s, %s, %s)
-    ON DUPLICATE KEY UPDATE Price = VALUES(Price);
-    """
-
-    # Execute the SQL query with the provided values
-    cursor.execute(query, (product, date.today(), seller, price))
-
-    # Commit the transaction to save changes in the database
-    conn.commit()
-
-    # Close the database connection
-    conn.close()
-
-
-
 # RUN AMAZON PRICE COLLECTION
 
 # This function runs the full Amazon price collection pipeline:
-# 1. Load products from Excel
+# 1. Load products from the catalog
 # 2. Scrape prices from Amazon
 # 3. Save the results into the database
-
-def run_amazon_today():
-    df = load_products()
-
-    # Loop through each product in the Excel file
-    for _, row in df.iterrows():
-        product = row["Product name"]
-        url = row["Amazon URL"]
-
-        # Scrape the Amazon price for the current product
-        price = scrape_amazon_price(url)
-
-        # If a price was successfully retrieved, store it in the database
-        if price is not None:
-            print(f"{product} | Amazon price: {price} €")
-            insert_price(product, "Amazon", price)
+#
+# Rows are buffered by PriceWriter and upserted in batches over one
+# connection: if a record for the same product, date, and seller already
+# exists, the price is updated instead of creating a duplicate entry.
+#
+# Finished products go to today's checkpoint (see resume.py); with
+# resume=True (or PRICE_RESUME=1) products already collected are skipped.
+# A scheduler.SchedulePlan (or PRICE_SCHEDULE=1) picks which products to
+# fetch, in which order, and stops the loop when its budget is used up.
+
+def run_amazon_today(products_xlsx=None, store=None, resume=None, plan=None):
+    df = load_products(products_xlsx)
+    today = date.today()
+    store = store or get_store()
+    plan = scheduler.plan_for("amazon", store, plan)
+    http_client.reset_stats("amazon")     # the HTTP report below covers this run only
+
+    urls = {}
+    for product, url in zip(df["product"], df["amazon_url"]):
+        if url:
+            urls[product] = url
         else:
-            print(f"{product} | Failed to get price")
+            print(f"[WARN] Missing Amazon URL for {product}")
+
+    with Checkpoint("amazon", today) as checkpoint, store.writer(source="amazon") as writer:
+        todo, restored = checkpoint.plan(urls, "Amazon", store, resume)
+        for product, seller, price in restored:
+            writer.add(product, today, seller, price)
+        if plan is not None:
+            todo = plan.order(todo)
+
+        # Loop through each product still to collect
+        for product in todo:
+            if plan is not None and not plan.allow(product):
+                break
+
+            # Scrape the Amazon price for the current product. A failed
+            # request is not checkpointed, so a resumed run retries it.
+            try:
+                price = scrape_amazon_price(urls[product])
+            except Exception as e:
+                print(f"[WARN] Amazon scrape failed for {product}: {e}")
+                run_metrics.count("scrape_errors", source="amazon")
+                continue
+
+            # If a price was successfully retrieved, store it in the database
+            if price is not None:
+                print(f"{product} | Amazon price: {price} €")
+                writer.add(product, today, "Amazon", price)
+                checkpoint.mark(product, OK, [("Amazon", price)])
+                run_metrics.count("offers", source="amazon")
+            else:
+                print(f"{product} | Failed to get price")
+                checkpoint.mark(product, EMPTY)
+
+    # Connection reuse report for this run
+    http_client.report("HTTP Amazon", source="amazon")
+    if plan is not None:
+        plan.record_skipped(today)
+        plan.report()
 
 
 
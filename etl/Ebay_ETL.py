@@ -1,11 +1,17 @@
-import re
 import os
+import re
 import time
 import datetime as dt
-import requests
 import pandas as pd
-from bs4 import BeautifulSoup
-import mysql.connector
+from async_fetch import fetch_all
+import http_client
+from html_parse import NodeFilter, make_soup
+from price_store import get_store
+from catalog import load_catalog
+from price_parse import parse_price, shipping_price, parse_cents_memoized, cents_to_float
+from resume import Checkpoint, OK, EMPTY
+import scheduler
+import run_metrics
 
 # CONFIG
 HEADERS = { # makes the request look like a normal browser so eBay doesn’t block us.
@@ -16,19 +22,27 @@ HEADERS = { # makes the request look like a normal browser so eBay doesn’t blo
     "Accept-Language": "de-DE,de;q=0.9,en;q=0.8",
 }
 
-DB_CONFIG = { # credentials for MySQL.
-    "host": "localhost",
-    "user": "etl_user",
-    "password": "your_pass",     # <-- change before use
-    "port": 3306,
-    "database": "price_collection", #change according to the database name u have
-}
+# DB credentials/backend live in price_store.py (DB_CONFIG, PRICE_STORE env var).
 #  PRICE_TABLE, SELLER_EBAY: standardizes seller name.
 PRICE_TABLE = "PRICE"
 SELLER_EBAY = "Ebay"
+SELLER_EBAY_ITEM = "eBay_itm_"  # multi-offer mode: one seller per listing item, "eBay_itm_<item id>"
+ITEM_ID_RE = re.compile(r"/itm/(?:[^/?#]+/)?(\d+)")
+
+# Multi-offer mode stores every offer of a listing page instead of the
+# first one only (env: PRICE_MULTI_OFFER=1)
+MULTI_OFFER = False
 
 REQUEST_DELAY_SECONDS = 2.0 # delay so you don’t get rate-limited.
 
+# Async fetch mode: N requests in flight, limited per host by a token bucket
+# instead of a fixed sleep after every request. Off by default, so existing
+# callers keep the sequential pacing (env: PRICE_EBAY_ASYNC=1).
+EBAY_ASYNC = False
+EBAY_MAX_CONCURRENCY = 8
+EBAY_RATE_PER_SEC = 2.0
+EBAY_BURST = 2
+
 # HELPERS
 def normalize_text(s: str) -> str: # Cleans strings: removes weird spaces and extra whitespace.
     if s is None:
@@ -36,82 +50,107 @@ def normalize_text(s: str) -> str: # Cleans strings: removes weird spaces and ex
     return " ".join(str(s).replace("\xa0", " ").strip().split())
 
 
-def parse_price_eur(text: str): # Handles European formatting, because it's better to save decimal values in the Database
+# EBAY SCRAPE
+# Only these nodes are parsed out of the page (see html_parse.py):
+# the listing items plus every root used by the item-page selectors below.
+EBAY_NODES = NodeFilter(
+    ids={"prcIsum", "mm-saleDscPrc", "fshippingCost", "shSummary"},
+    classes={"s-item", "x-price-primary", "ux-labels-values__values-content"},
+    attrs={"data-testid": {"x-price-primary", "ux-textual-display", "ux-labels-values__shipping"}},
+)
+
+
+def scrape_ebay_price(url: str): # This is the core scraping function. It returns one final price (price + shipping).
     """
-    Parses:
-      - '1.299,99 €'  -> 1299.99
-      - '899,99 €'    -> 899.99
-      - '899.99 €'    -> 899.99
-      - 'EUR 2.049,00'-> 2049.00
+    Returns ONE price for the URL:
+    - If listing page: take the first valid item's (price + shipping)
+    - If item page: take that item's (price + shipping)
     """
-    if not text:
-        return None
+    r = fetch_page(url)
+    with run_metrics.timer("parse", "ebay"):
+        price = parse_ebay_price(r.text)
+    if price is not None:
+        http_client.keep(r)     # only pages with a price are cached
+    return price
 
-    t = normalize_text(text)
 
-    m = re.search(r"(\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2})|\d+[.,]\d{2})", t)
-    if not m:
-        return None
+def scrape_ebay_offers(url: str): # Multi-offer mode: every offer from the same single page fetch.
+    r = fetch_page(url)
+    with run_metrics.timer("parse", "ebay"):
+        offers = parse_ebay_offers(r.text, url)
+    if offers:
+        http_client.keep(r)
+    return offers
 
-    num = m.group(0)
 
-    if "." in num and "," in num:
-        num = num.replace(".", "").replace(",", ".")
-    elif "," in num:
-        num = num.replace(",", ".")
+def fetch_page(url: str): # GET + status check, timed per request (see run_metrics.py).
+    run_metrics.count("requests", source="ebay")
+    with run_metrics.timer("fetch", "ebay"):
+        r = http_client.get(url, headers=HEADERS, source="ebay")
+        r.raise_for_status()
+    return r
 
-    try:
-        return float(num)
-    except ValueError:
-        return None
 
+def parse_ebay_price(html: str, backend=None): # Extraction part of scrape_ebay_price, works on already fetched HTML.
+    soup = make_soup(html, EBAY_NODES, backend)
 
-def shipping_cost(text: str) -> float: #to make sure we also include the shipping price
-    """
-    eBay DE examples:
-      'Kostenloser Versand' -> 0
-      '+EUR 4,99 Versand'   -> 4.99
-    If unknown -> 0
-    """
-    if not text:
-        return 0.0
+    # ---------- CASE 1: LISTING PAGE ----------
+    items = soup.select("li.s-item") # If it finds multiple items, it loops until it finds the first valid price and returns it.
+    if items:
+        for item in items:
+            price = listing_item_price(item)
+            if price is not None:
+                return price
 
-    low = text.lower()
-    if "kostenlos" in low or "gratis" in low:
-        return 0.0
+        return None
 
-    p = parse_price_eur(text)
-    return p if p is not None else 0.0
+    # ---------- CASE 2: ITEM PAGE ----------
+    return item_page_price(soup)
 
-# EBAY SCRAPE
-def scrape_ebay_price(url: str): # This is the core scraping function. It returns one final price (price + shipping).
+
+def parse_ebay_offers(html: str, url=None, backend=None):
     """
-    Returns ONE price for the URL:
-    - If listing page: take the first valid item's (price + shipping)
-    - If item page: take that item's (price + shipping)
+    Returns EVERY offer on the page as (seller, price + shipping):
+    - If listing page: one offer per valid item, seller "eBay_itm_<item id>"
+    - If item page: that item's offer (item id taken from `url`)
     """
-    r = requests.get(url, headers=HEADERS, timeout=25)
-    r.raise_for_status()
-    soup = BeautifulSoup(r.text, "html.parser")
+    soup = make_soup(html, EBAY_NODES, backend)
 
-    # ---------- CASE 1: LISTING PAGE ----------
-    items = soup.select("li.s-item") # If it finds multiple items, it loops until it finds the first valid price and returns it.
+    items = soup.select("li.s-item")
     if items:
+        offers = {}
         for item in items:
-            price_el = item.select_one(".s-item__price")
-            ship_el = item.select_one(".s-item__shipping, .s-item__logisticsCost")
+            price = listing_item_price(item)
+            link = item.select_one("a.s-item__link, a[href*='/itm/']")
+            seller = item_seller(link.get("href") if link else None)
+            if price is not None and seller and seller not in offers:   # sponsored items repeat
+                offers[seller] = price
+        return list(offers.items())
+
+    price = item_page_price(soup)
+    return [] if price is None else [(item_seller(url) or SELLER_EBAY, price)]
 
-            price = parse_price_eur(price_el.get_text(" ", strip=True) if price_el else "")
-            if price is None:
-                continue
 
-            ship = shipping_cost(ship_el.get_text(" ", strip=True) if ship_el else "")
-            return round(price + ship, 2)
+def item_seller(href):
+    """'https://www.ebay.de/itm/204961449144?...' -> 'eBay_itm_204961449144' (None if no item id)."""
+    m = ITEM_ID_RE.search(href or "")
+    return f"{SELLER_EBAY_ITEM}{m.group(1)}" if m else None
 
+
+def listing_item_price(item): # One li.s-item of a listing page: price + shipping, None if it has no valid price.
+    price_el = item.select_one(".s-item__price")
+    ship_el = item.select_one(".s-item__shipping, .s-item__logisticsCost")
+
+    price = parse_price(price_el.get_text(" ", strip=True) if price_el else "")
+    if price is None:
         return None
 
-    # ---------- CASE 2: ITEM PAGE ----------
-    price_candidates = [ # If no listing items, it assumes it’s an individual product page and tries multiple selectors to locate the price and shipping.
+    ship = shipping_price(ship_el.get_text(" ", strip=True) if ship_el else "")
+    return round(price + ship, 2)
+
+
+def item_page_price(soup): # If no listing items, it assumes it’s an individual product page and tries multiple selectors to locate the price and shipping.
+    price_candidates = [
         "#prcIsum",
         "#mm-saleDscPrc",
         ".x-price-primary span",
@@ -126,7 +165,7 @@ def scrape_ebay_price(url: str): # This is the core scraping function. It return
             price_text = el.get_text(" ", strip=True)
             break
 
-    price = parse_price_eur(price_text)
+    price = parse_price(price_text)
     if price is None:
         return None
 
@@ -145,57 +184,22 @@ def scrape_ebay_price(url: str): # This is the core scraping function. It return
             if "versand" in ship_text.lower() or "kostenlos" in ship_text.lower():
                 break
 
-    ship = shipping_cost(ship_text)
+    ship = shipping_price(ship_text)
     return round(price + ship, 2)
 
-# LOAD PRODUCTS FROM EXCEL
+# LOAD PRODUCTS FROM THE CATALOG
 
-def load_products(path="products.xlsx"): #diff. options for the header selection given incase something in future changes
+def load_products(path=None):
     """
-    Reads products.xlsx and returns list of dicts:
+    Reads the product catalog (see catalog.py) and returns list of dicts:
     {product, ebay_url}
-
-    Needs headers like:
-      Product name, Ebay URL
     """
-    df = pd.read_excel(path).fillna("")
-    norm = {c.strip().lower(): c for c in df.columns}
-
-    def col(*candidates):
-        for cand in candidates:
-            key = cand.strip().lower()
-            if key in norm:
-                return norm[key]
-        return None
-
-    product_col = col("product name", "product", "product name", "name")
-    ebay_col = col("ebay url", "ebay", "eBay URL", "Ebay URL")
-
-    if not product_col or not ebay_col:
-        raise ValueError(
-            f"Missing required columns.\n"
-            f"Found columns: {list(df.columns)}\n"
-            f"Need: Product name, Ebay URL"
-        )
-
-    products = []
-    for _, row in df.iterrows():
-        product = normalize_text(row[product_col])
-        ebay_url = normalize_text(row[ebay_col])
-
-        if not product:
-            continue
-
-        products.append({
-            "product": product,
-            "ebay_url": ebay_url
-        })
-
-    return products
+    df = load_catalog(path, required=("product", "ebay_url"))
+    return [{"product": p, "ebay_url": u} for p, u in zip(df["product"], df["ebay_url"])]
 
 # DB INSERT
 
-def insert_prices_df_to_mysql(df: pd.DataFrame):
+def insert_prices_df(df: pd.DataFrame, store=None):
     required = {"Product", "Date", "Seller", "Price"}
     missing = required - set(df.columns)
     if missing:
@@ -206,70 +210,139 @@ def insert_prices_df_to_mysql(df: pd.DataFrame):
     df["Seller"] = df["Seller"].astype(str).map(normalize_text)
     df["Date"] = df["Date"].astype(str).map(normalize_text)
 
-    df["Price"] = (
-        df["Price"]
-        .astype(str)
-        .str.replace("€", "", regex=False)
-        .str.replace("\xa0", " ", regex=False)
-        .str.replace(" ", "", regex=False)
-        .str.replace(",", ".", regex=False)
-        .astype(float)
-        .round(2)
-    )
-# Takes the DataFrame and inserts into MySQL
+    # Same parsing rules as the scrapers, one pass over the whole column
+    df["Price"] = cents_to_float(parse_cents_memoized(df["Price"].astype(str)))
+    bad = df["Price"].isna()
+    if bad.any():
+        print(f"[WARN] Skipping {int(bad.sum())} row(s) without a valid price")
+        df = df[~bad]
+# Takes the DataFrame and inserts into the price store
     # If the row exists (same Product, Date, Seller), it updates the price
     # Otherwise inserts a new row
     df = df.drop_duplicates(subset=["Product", "Date", "Seller"], keep="last")
 
-    sql = f"""
-    INSERT INTO {PRICE_TABLE} (Product, Date, Seller, Price) 
-    VALUES (%s, %s, %s, %s)
-    ON DUPLICATE KEY UPDATE Price = VALUES(Price);
-    """
+    data = df[["Product", "Date", "Seller", "Price"]].itertuples(index=False, name=None)
+
+    # Multi-row upsert batches over one connection (see price_writer.py)
+    store = store or get_store()
+    with store.writer(table=PRICE_TABLE, source="ebay") as writer:
+        writer.add_many(data)
 
-    conn = mysql.connector.connect(**DB_CONFIG)
-    cur = conn.cursor()
 
-    data = list(df[["Product", "Date", "Seller", "Price"]].itertuples(index=False, name=None))
-    cur.executemany(sql, data)
-    conn.commit()
+# EBAY ETL : This is the “main run” function
+
+def collect_rows(product, offers, error, today, checkpoint=None):
+    """Logs the outcome for one product and returns its PRICE rows, one per (seller, price) offer."""
+    if error is not None:
+        print(f"[WARN] Ebay scrape failed for {product}: {error}")
+        return []
+
+    if not offers:
+        print(f"[WARN] No Ebay price for {product}")
+        if checkpoint is not None:
+            checkpoint.mark(product, EMPTY)
+        return []
+
+    if len(offers) == 1:
+        print(f"[OK] Ebay price for {product}: {offers[0][1]}")
+    else:
+        print(f"[OK] {len(offers)} Ebay offers for {product}, lowest {min(p for _, p in offers)}")
+    if checkpoint is not None:
+        checkpoint.mark(product, OK, offers)
+    run_metrics.count("offers", len(offers), source="ebay")
+    return [
+        {"Product": product, "Date": today, "Seller": seller, "Price": price}
+        for seller, price in offers
+    ]
 
-    print(f"[DB] Inserted/updated {len(data)} rows into {DB_CONFIG['database']}.{PRICE_TABLE}")
 
-    cur.close()
-    conn.close()
+def single_offer(url): # Default mode: the first valid offer only, stored as seller "Ebay".
+    price = scrape_ebay_price(url)
+    return [] if price is None else [(SELLER_EBAY, price)]
 
-# EBAY ETL : This is the “main run” function
 
-def run_ebay_etl(products_xlsx="products.xlsx", save_csv=True, write_db=True):
+def run_ebay_etl(products_xlsx=None, save_csv=True, write_db=True,
+                 use_async=None, max_concurrency=EBAY_MAX_CONCURRENCY,
+                 rate_per_sec=EBAY_RATE_PER_SEC, store=None, resume=None, plan=None,
+                 multi_offer=None):
     today = dt.date.today().isoformat()
+    if multi_offer is None:
+        multi_offer = MULTI_OFFER or os.environ.get("PRICE_MULTI_OFFER", "0") == "1"
+    if use_async is None:
+        use_async = EBAY_ASYNC or os.environ.get("PRICE_EBAY_ASYNC", "0") == "1"
+    scrape = scrape_ebay_offers if multi_offer else single_offer
     products = load_products(products_xlsx)
-
+    if write_db:
+        store = store or get_store()
+    # Which products to fetch and the time/request budget (see scheduler.py);
+    # the schedule is built from PRICE, so a run without a store has none
+    if store is not None:
+        plan = scheduler.plan_for("ebay", store, plan)
+    http_client.reset_stats("ebay")       # the HTTP report below covers this run only
+
+    started = time.perf_counter()
     rows = []
 
     for p in products:
-        if p["ebay_url"]:
-            try:
-                price = scrape_ebay_price(p["ebay_url"])
-                if price is not None:
-                    rows.append({
-                        "Product": p["product"],
-                        "Date": today,
-                        "Seller": SELLER_EBAY,
-                        "Price": price
-                    })
-                    print(f"[OK] Ebay price for {p['product']}: {price}")
-                else:
-                    print(f"[WARN] No Ebay price for {p['product']}")
-            except Exception as e:
-                print(f"[WARN] Ebay scrape failed for {p['product']}: {e}")
-        else:
+        if not p["ebay_url"]:
             print(f"[WARN] Missing Ebay URL for {p['product']}")
 
-        time.sleep(REQUEST_DELAY_SECONDS)
+    # Rows are only written at the end, so the checkpoint (see resume.py)
+    # keeps the scraped prices in case the run dies before that
+    with Checkpoint("ebay", today) as checkpoint:
+        urls = {p["product"]: p["ebay_url"] for p in products if p["ebay_url"]}
+        todo, restored = checkpoint.plan(urls, (SELLER_EBAY, SELLER_EBAY_ITEM), store, resume)
+        rows += [{"Product": p, "Date": today, "Seller": seller, "Price": price}
+                 for p, seller, price in restored]
+        if plan is not None:
+            todo = plan.order(todo)
+        with_url = [{"product": p, "ebay_url": urls[p]} for p in todo]
+
+        if use_async:
+            # Fetch concurrently, then log/collect in catalog order so the
+            # DataFrame is identical to the sequential run.
+            results = fetch_all(
+                [p["ebay_url"] for p in with_url],
+                scrape,
+                rate_per_sec=rate_per_sec,
+                max_concurrency=max_concurrency,
+                burst=EBAY_BURST,
+                allow=(lambda i: plan.allow(with_url[i]["product"])) if plan is not None else None,
+                skipped=scheduler.BudgetExhausted(),
+            )
+            for p, (offers, error) in zip(with_url, results):
+                if isinstance(error, scheduler.BudgetExhausted):
+                    continue
+                rows += collect_rows(p["product"], offers, error, today, checkpoint)
+        else:
+            for i, p in enumerate(with_url):
+                if plan is not None and not plan.allow(p["product"]):
+                    break
+                offers, error = [], None
+                try:
+                    offers = scrape(p["ebay_url"])
+                except Exception as e:
+                    error = e
+
+                rows += collect_rows(p["product"], offers, error, today, checkpoint)
+
+                if i < len(with_url) - 1:
+                    time.sleep(REQUEST_DELAY_SECONDS)
+
+    elapsed = time.perf_counter() - started
+    pages = len(with_url) if plan is None else len(plan.fetched)
+    rate = pages / elapsed if elapsed > 0 else 0.0
+    print(f"[RUN] Ebay fetched {pages} pages in {elapsed:.1f}s ({rate:.2f} pages/sec), "
+          f"{len(rows) - len(restored)} offers ({(len(rows) - len(restored)) / max(pages, 1):.1f} rows/page)")
+    http_client.report("HTTP Ebay", source="ebay")
+    if plan is not None:
+        plan.record_skipped(today)
+        plan.report()
 
     df = pd.DataFrame(rows, columns=["Product", "Date", "Seller", "Price"])
     df = df.drop_duplicates(subset=["Product", "Seller", "Date"], keep="last")
+    # The scrapers return Decimal prices; callers and the CSV get floats as before
+    df["Price"] = cents_to_float((df["Price"] * 100).astype("Int64"))
 
     if save_csv:
         os.makedirs("data", exist_ok=True)
@@ -278,13 +351,13 @@ def run_ebay_etl(products_xlsx="products.xlsx", save_csv=True, write_db=True):
         print(f"[CSV] Saved {len(df)} rows to {out_csv}")
 
     if write_db and not df.empty:
-        insert_prices_df_to_mysql(df)
+        insert_prices_df(df, store)
 
     return df
 
 
 if __name__ == "__main__":
-    run_ebay_etl(products_xlsx="products.xlsx", save_csv=False, write_db=True) # save csv = False because we don't need csv for now
+    run_ebay_etl(save_csv=False, write_db=True) # save csv = False because we don't need csv for now
     # since we are already saving it in database and if needed we can export csv from our database
 
 
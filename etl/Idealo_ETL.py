@@ -1,117 +1,240 @@
+import os
 import time
 from datetime import date
-import pandas as pd # pandas reads products.xlsx.
-from bs4 import BeautifulSoup #BeautifulSoup parses the HTML Selenium loads.
-from selenium import webdriver # selenium opens Idealo pages (because they’re dynamic).
-from selenium.webdriver.chrome.options import Options
-import mysql.connector
-
-def get_db(): # Every time you call get_db(), it creates a new connection to MySQL.
-    return mysql.connector.connect(
-        host="localhost",
-        user="etl_user",
-        password="your_pass",  # change here
-        database="price_collection"  # change to whatever database name u have
-    )
-
-
-def scrape_idealo(product_name, url):
+from concurrent.futures import ThreadPoolExecutor
+from selenium.webdriver.common.by import By # selenium opens Idealo pages (because they’re dynamic).
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from browser_pool import BrowserPool
+import page_recorder
+from price_store import get_store
+from catalog import load_catalog # products + Idealo URLs from products.xlsx (or CSV/Parquet)
+from price_parse import parse_price, shipping_price
+from resume import Checkpoint, OK, EMPTY
+import scheduler
+import run_metrics
+from html_parse import NodeFilter, make_soup # BeautifulSoup (lxml) parses the HTML Selenium loads.
+
+IDEALO_WORKERS = 3          # parallel browser workers (one Chrome each)
+OFFER_SELECTOR = "[data-product-id]"
+OFFER_WAIT_SECONDS = 15     # max wait for the offer list to appear
+IDEALO_NODES = NodeFilter(attrs={"data-product-id": None})   # only offer subtrees are parsed
+IDEALO_SELLER = "Idealo"    # one price per product (the first offer)
+IDEALO_SHOP_PREFIX = "Idealo_"  # multi-offer mode: one seller per shop, "Idealo_<shop name>"
+MULTI_OFFER = False         # store every offer of the page (env: PRICE_MULTI_OFFER=1)
+
+def load_idealo_page(driver, url):
     """
-    Scrape idealo.de using Selenium and insert prices into MySQL as 'Idealo'.
+    Loads url and waits until the offer elements are in the DOM instead of
+    sleeping a fixed time. Returns (page_source, seconds, timed_out);
+    timed_out: no offer showed up in time (slow page, bot wall or really
+    no offers - the caller cannot tell, so it must not treat it as empty).
     """
-    conn = get_db() # Prepares the DB cursor to run SQL. today is used so rows get stored for the correct day.
-    cursor = conn.cursor()
-    today = date.today()
-
-    # Selenium headless browser setup : Creates a headless Chrome browser (runs invisibly), loads pages like a real user.
-    options = Options()
-    options.headless = True
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--window-size=1920,1080")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    driver = webdriver.Chrome(options=options)
+    started = time.perf_counter()
+    driver.get(url)
+    timed_out = False
+    try:
+        WebDriverWait(driver, OFFER_WAIT_SECONDS).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, OFFER_SELECTOR))
+        )
+    except TimeoutException:
+        timed_out = True    # the browser is fine, so it goes back to the pool
+
+    html = driver.page_source
+    seconds = time.perf_counter() - started
+    page_recorder.record_page(url, html, "idealo")   # no-op unless record mode is on
+    return html, seconds, timed_out
+
+
+def parse_idealo_prices(html, backend=None):
+    """
+    Returns (number of offer items, prices of the offers in page order).
+    Offers without a parsable price are skipped.
+    """
+    soup = make_soup(html, IDEALO_NODES, backend)
+
+    # Scrape offer items
+    items = soup.select(OFFER_SELECTOR)
+    prices = []
+
+    for item in items:
+        price_tag = item.select_one('div.text-base.font-medium.text-orange-500')
+
+        if price_tag:
+            price = parse_price(price_tag.text)
+            if price is not None:
+                prices.append(price)
+
+    return len(items), prices
+
+
+def offer_shop(item):
+    """
+    Seller name of one offer item from its shop attribute, else the logo alt
+    text; None when neither names the shop (such offers are skipped: a
+    name made up from the position would be a different seller every day).
+    """
+    tag = item if item.has_attr("data-shop-name") else item.select_one("[data-shop-name]")
+    name = tag["data-shop-name"] if tag is not None else ""
+    if not name:
+        logo = item.select_one("img[alt]")
+        name = logo["alt"] if logo is not None else ""
+    name = " ".join(name.split())
+    return f"{IDEALO_SHOP_PREFIX}{name}" if name else None
+
+
+def parse_idealo_offers(html, backend=None):
+    """
+    Returns (number of offer items, [(seller, price + shipping)]) for EVERY
+    offer on the page, one per shop (the cheapest if a shop lists twice).
+    Offers without a price or a shop name are skipped.
+    """
+    soup = make_soup(html, IDEALO_NODES, backend)
+
+    items = soup.select(OFFER_SELECTOR)
+    offers = {}
+
+    for item in items:
+        seller = offer_shop(item)
+        if seller is None:
+            continue
+
+        price_tag = item.select_one('div.text-base.font-medium.text-orange-500')
+        price = parse_price(price_tag.text) if price_tag else None
+        if price is None:
+            continue
+
+        # "+ 4,99 € Versand" / "inkl. Versand" / "Versandkostenfrei"; texts
+        # without an amount (e.g. "Versand in 1-2 Tagen") count as free
+        ship_text = item.find(string=lambda t: t and "versand" in t.lower())
+        ship_text = ship_text.parent.get_text(" ", strip=True) if ship_text else ""
+        total = price + (shipping_price(ship_text) if "€" in ship_text else 0)
+
+        if seller not in offers or total < offers[seller]:
+            offers[seller] = total
+
+    return len(items), list(offers.items())
+
+
+def scrape_idealo(product_name, url, pool=None, timings=None, writer=None, checkpoint=None,
+                  multi_offer=False):
+    """
+    Scrape idealo.de using Selenium and insert prices into the price store as 'Idealo'
+    (with multi_offer=True: every offer, one seller per shop, see parse_idealo_offers).
+    Uses a driver from `pool` (a one-browser pool is created if none is given)
+    and buffers rows in `writer` (flushed by the caller that owns it).
+    Finished products are marked in `checkpoint` (see resume.py), failed loads are not.
+    """
+    today = date.today() # today is used so rows get stored for the correct day.
+
+    own_writer = writer is None
+    if own_writer:
+        writer = get_store().writer(source="idealo")
+
+    # Headless Chrome comes from a pool of long-lived browsers (see browser_pool.py)
+    own_pool = pool is None
+    if own_pool:
+        pool = BrowserPool(1)
 
     price_list = []
 
     try:
-        driver.get(url)
-        time.sleep(5)  # wait for page to load
-
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-
-        # Scrape offer items
-        items = soup.select('[data-product-id]')
-        print(f"Found {len(items)} items for {product_name}")
-
-        for item in items:
-            price_tag = item.select_one('div.text-base.font-medium.text-orange-500')
-
-            if price_tag:
-                price_text = (
-                    price_tag.text.strip()
-                    .replace("€", "")
-                    .replace("\xa0", "")
-                    .replace(".", "")
-                    .replace(",", ".")
-                )
-                try:
-                    price_val = float(price_text)
-                except ValueError:
-                    continue
-
-                seller_name = "Idealo"  # standard seller name
-
-                # Print price in terminal (so it looks like Amazon/eBay logs)
-                print(f"[OK] {product_name} | Idealo price: {price_val} €")
-
-                # Avoid duplicates
-                cursor.execute(
-                    "SELECT 1 FROM PRICE WHERE Product=%s AND Seller=%s AND Date=%s",
-                    (product_name, seller_name, today)
-                )
-                if not cursor.fetchone():
-                    cursor.execute(
-                        "INSERT INTO PRICE (Product, Date, Seller, Price) VALUES (%s,%s,%s,%s)",
-                        (product_name, today, seller_name, price_val)
-                    )
-                    conn.commit()
-                    price_list.append((seller_name, price_val))
-                    print(f"[DB] Inserted Idealo price for {product_name}")
-                else:
-                    print(f"[DB] Idealo row already exists for today ({product_name})")
-
-                break  # stop after first valid price (optional, but cleaner for 1 price/day)
+        run_metrics.count("requests", source="idealo")
+        with pool.driver() as driver:
+            html, seconds, timed_out = load_idealo_page(driver, url)
+
+        print(f"[TIME] Idealo page load for {product_name}: {seconds:.2f}s")
+        if timings is not None:
+            timings.append(seconds)
+        run_metrics.observe("page_load", seconds, "idealo")
+
+        with run_metrics.timer("parse", "idealo"):
+            if multi_offer:
+                n_items, offers = parse_idealo_offers(html)
+            else:
+                n_items, prices = parse_idealo_prices(html)
+                # stop after first valid price (optional, but cleaner for 1 price/day)
+                offers = [(IDEALO_SELLER, price) for price in prices[:1]]
+        print(f"Found {n_items} items for {product_name}")
+
+        for seller_name, price_val in offers:
+            # Print price in terminal (so it looks like Amazon/eBay logs)
+            print(f"[OK] {product_name} | {seller_name} price: {price_val} €")
+
+            # Buffered upsert: no SELECT round trip, one row per product/date/seller
+            writer.add(product_name, today, seller_name, price_val)
+            price_list.append((seller_name, price_val))
 
         print(f"Scraped {len(price_list)} Idealo offers for {product_name}")
+        run_metrics.count("offers", len(price_list), source="idealo")
+        if timed_out and not price_list:
+            # A fetch error, not an empty page: not marked, so --resume retries it
+            print(f"[WARN] Idealo page for {product_name} timed out without offers")
+            run_metrics.count("scrape_errors", source="idealo")
+        elif checkpoint is not None:
+            checkpoint.mark(product_name, OK if price_list else EMPTY, price_list)
 
     except Exception as e:
         print(f"Failed fetch for {product_name}: {e}")
+        run_metrics.count("scrape_errors", source="idealo")
 
     finally:
-        driver.quit()
-        cursor.close()
-        conn.close()
+        if own_pool:
+            pool.close()
+        if own_writer:
+            writer.close()
 
     return price_list
 
 
-if __name__ == "__main__":
-    # Read Excel and normalize column names
-    df = pd.read_excel("products.xlsx")
-    df.columns = df.columns.str.strip().str.replace(" ", "_").str.lower()
+def run_idealo_today(products_xlsx=None, workers=IDEALO_WORKERS, store=None, resume=None, plan=None,
+                     multi_offer=None):
+    # Product names and Idealo URLs from the shared catalog
+    df = load_catalog(products_xlsx, required=("product", "idealo_url"))
+    if multi_offer is None:
+        multi_offer = MULTI_OFFER or os.environ.get("PRICE_MULTI_OFFER", "0") == "1"
 
-    for _, row in df.iterrows():
-        product_name = row["product_name"]
-        url = row["idealo_url"]
+    urls = {p: url for p, url in zip(df["product"], df["idealo_url"]) if url}
+    timings = []
 
+    def job(product_name):
+        if plan is not None and not plan.allow(product_name):
+            return []
         print(f"\n Scraping Idealo for: {product_name}")
-        scrape_idealo(product_name, url)
-
-        # Our company insertion is intentionally removed/commented out.
-        # Our company can be inserted by a separate script or by Amazon ETL.
-
-    print("\n Idealo scraping completed.")
+        return scrape_idealo(product_name, urls[product_name], pool, timings, writer, checkpoint, multi_offer)
+
+    # Our company insertion is intentionally removed/commented out.
+    # Our company can be inserted by a separate script or by Amazon ETL.
+
+    started = time.perf_counter()
+    store = store or get_store()
+    plan = scheduler.plan_for("idealo", store, plan)   # fetch order + budget (see scheduler.py)
+    with Checkpoint("idealo", date.today()) as checkpoint, store.writer(source="idealo") as writer:
+        # Resume mode: skip products already collected today (see resume.py)
+        # ("Idealo" also covers the "Idealo_<shop>" sellers of multi-offer mode)
+        todo, restored = checkpoint.plan(urls, IDEALO_SELLER, store, resume)
+        for product_name, seller_name, price in restored:
+            writer.add(product_name, date.today(), seller_name, price)
+        if plan is not None:
+            todo = plan.order(todo)
+
+        if todo:
+            with BrowserPool(workers) as pool, ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(job, todo))
+    elapsed = time.perf_counter() - started
+
+    if timings:
+        print(
+            f"\n[RUN] Idealo loaded {len(timings)} pages in {elapsed:.1f}s with {workers} browser(s); "
+            f"page load avg {sum(timings) / len(timings):.2f}s, max {max(timings):.2f}s"
+        )
+    if plan is not None:
+        plan.record_skipped(date.today())
+        plan.report()
 
 
+if __name__ == "__main__":
+    run_idealo_today()
 
+    print("\n Idealo scraping completed.")
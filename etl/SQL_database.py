@@ -1,4 +1,5 @@
-import mysql.connector
+import os
+from price_store import MySQLPriceStore, get_store, STORE_BACKEND
 
 
 # 🔧 CHANGE THESE IF NEEDED
@@ -13,6 +14,7 @@ DB_NAME = "price_collection"
 
 
 def create_database():
+    import mysql.connector
     conn = mysql.connector.connect(**DB_CONFIG)
     cursor = conn.cursor()
 
@@ -24,27 +26,23 @@ def create_database():
 
 
 def create_price_table():
-    conn = mysql.connector.connect(database=DB_NAME, **DB_CONFIG)
-    cursor = conn.cursor()
+    # Same PRICE schema for every backend (see price_store.py). For MySQL the
+    # table is created with the admin credentials above.
+    if os.environ.get("PRICE_STORE", STORE_BACKEND) == "mysql":
+        store = MySQLPriceStore(config={**DB_CONFIG, "database": DB_NAME})
+    else:
+        store = get_store()
+    store.create_schema()
 
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS PRICE (
-            ID BIGINT AUTO_INCREMENT PRIMARY KEY,
-            Product VARCHAR(255) NOT NULL,
-            Date DATE NOT NULL,
-            Seller VARCHAR(255) NOT NULL,
-            Price DECIMAL(10,2) NOT NULL,
-            UNIQUE KEY uq_product_date_seller (Product, Date, Seller)
-        )
-    """)
+    print(f"[OK] Table 'PRICE' created or already exists in {store.name}")
 
-    print("[OK] Table 'PRICE' created or already exists")
 
-    cursor.close()
-    conn.close()
+def main():
+    if os.environ.get("PRICE_STORE", STORE_BACKEND) == "mysql":
+        create_database()
+    create_price_table()
 
 
 if __name__ == "__main__":
-    create_database()
-    create_price_table()
+    main()
 
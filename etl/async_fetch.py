@@ -0,0 +1,95 @@
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+
+# TOKEN BUCKET
+
+# Classic token bucket: tokens refill at `rate` per second up to `burst`.
+# Every request takes one token, so a host never sees more than `rate`
+# requests per second on average (plus an initial burst).
+class TokenBucket:
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = float(rate)
+        self.capacity = max(1, int(burst))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+# PER-HOST RATE LIMITER
+
+# One bucket per host, created lazily, so eBay and (later) other hosts
+# are limited independently of each other.
+class HostRateLimiter:
+    def __init__(self, rate_per_sec: float, burst: int = 1):
+        self.rate_per_sec = rate_per_sec
+        self.burst = burst
+        self.buckets = {}
+
+    async def acquire(self, url: str):
+        if not self.rate_per_sec:
+            return
+
+        host = urlsplit(url).netloc.lower()
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            bucket = self.buckets[host] = TokenBucket(self.rate_per_sec, self.burst)
+
+        await bucket.acquire()
+
+
+# CONCURRENT FETCH
+
+async def _fetch_all(urls, worker, rate_per_sec, max_concurrency, burst, allow, skipped):
+    limiter = HostRateLimiter(rate_per_sec, burst)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    loop = asyncio.get_running_loop()
+
+    # The scrapers are blocking (requests/BeautifulSoup), so they run on a
+    # dedicated thread pool sized to the concurrency we want in flight.
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+
+        async def one(i, url):
+            async with semaphore:
+                if allow is not None and not allow(i):
+                    return None, skipped
+                await limiter.acquire(url)
+                try:
+                    return await loop.run_in_executor(pool, worker, url), None
+                except Exception as e:
+                    return None, e
+
+        return await asyncio.gather(*(one(i, url) for i, url in enumerate(urls)))
+
+
+def fetch_all(urls, worker, rate_per_sec=2.0, max_concurrency=8, burst=1, allow=None, skipped=None):
+    """
+    Runs worker(url) for every url with at most `max_concurrency` calls in
+    flight and at most `rate_per_sec` calls started per host per second.
+    If given, allow(i) is asked before the call for urls[i] (e.g. a request
+    budget; by index, since the same url can stand for several items); urls
+    it refuses are not fetched and get (None, skipped).
+
+    Returns a list of (result, error) tuples in the same order as `urls`,
+    so callers can build exactly the same output as a sequential loop.
+    """
+    urls = list(urls)
+    if not urls:
+        return []
+
+    return asyncio.run(_fetch_all(urls, worker, rate_per_sec, max(1, int(max_concurrency)), burst, allow, skipped))
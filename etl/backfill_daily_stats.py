@@ -0,0 +1,21 @@
+import time
+from price_store import get_store, STATS_TABLE
+
+
+# ONE-OFF BACKFILL OF PRICE_DAILY_STATS
+
+# PriceWriter keeps PRICE_DAILY_STATS up to date for every row it writes.
+# Rows that were in PRICE before the table existed (or were loaded some
+# other way) are summarised by running this script once.
+def backfill(store=None):
+    store = store or get_store()
+    store.create_schema()
+
+    started = time.perf_counter()
+    n_dates = store.backfill_daily_stats()
+    print(f"[OK] Rebuilt {STATS_TABLE} for {n_dates} dates in {store.name} "
+          f"({time.perf_counter() - started:.1f}s)")
+
+
+if __name__ == "__main__":
+    backfill()
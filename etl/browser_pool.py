@@ -0,0 +1,130 @@
+import queue
+import threading
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+# CONFIG
+PAGE_LOAD_TIMEOUT = 30  # seconds before driver.get() gives up
+
+# Resources we never need for price extraction. They are blocked at the
+# network layer (CDP) so Chrome does not even download them.
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.css",
+]
+
+
+# DRIVER FACTORY
+
+def make_driver():
+    """
+    Headless Chrome tuned for scraping:
+    - "eager" page load strategy: driver.get() returns at DOMContentLoaded
+    - images, fonts and stylesheets are blocked
+    """
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.page_load_strategy = "eager"
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.stylesheets": 2,
+        "profile.managed_default_content_settings.fonts": 2,
+    })
+
+    driver = webdriver.Chrome(options=options)
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    return driver
+
+
+# BROWSER POOL
+
+# Keeps up to `size` long-lived drivers and hands them out one at a time.
+# Drivers are created lazily, so a pool of 4 used by 1 worker only starts
+# one Chrome. A driver whose block raises (crash, timeout, ...) is thrown
+# away and replaced on demand.
+class BrowserPool:
+    def __init__(self, size=1, factory=make_driver):
+        self.size = max(1, int(size))
+        self.factory = factory
+        self._idle = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            try:
+                d = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    create = self._created < self.size
+                    if create:
+                        self._created += 1
+
+                if create:
+                    try:
+                        return self.factory()
+                    except Exception:
+                        self._free_slot()
+                        raise
+
+                d = self._idle.get()
+
+            # None wakes a waiter after a driver was thrown away: its slot is free
+            if d is not None:
+                return d
+
+    def release(self, driver):
+        self._idle.put(driver)
+
+    def _free_slot(self):
+        with self._lock:
+            self._created -= 1
+        self._idle.put(None)
+
+    def discard(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        self._free_slot()
+
+    @contextmanager
+    def driver(self):
+        # Every driver handed out comes back: released when the block
+        # finishes, thrown away on any exception (a crashed browser, a
+        # timeout, Ctrl+C mid-page) so waiting workers never block forever
+        d = self.acquire()
+        try:
+            yield d
+        except BaseException:
+            self.discard(d)
+            raise
+        self.release(d)
+
+    def close(self):
+        while True:
+            try:
+                d = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if d is not None:
+                try:
+                    d.quit()
+                except Exception:
+                    pass
+                with self._lock:
+                    self._created -= 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
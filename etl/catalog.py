@@ -0,0 +1,160 @@
+import os
+import pickle
+import hashlib
+import threading
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# CONFIG
+# The product catalog: products.xlsx by default, or a CSV / Parquet file
+# with the same columns (env: PRICE_CATALOG).
+CATALOG_PATH = os.path.join(BASE_DIR, "products.xlsx")
+SNAPSHOT_DIR = os.path.join(BASE_DIR, "..", "data", "catalog_cache")   # env: PRICE_CATALOG_CACHE_DIR
+SNAPSHOT_VERSION = 1    # bump when normalisation changes, so old snapshots are ignored
+
+# Canonical column -> accepted headers (compared lower-case, "_" = " ")
+COLUMNS = {
+    "product": ["product name", "product", "name"],
+    "idealo_url": ["idealo url", "idealo"],
+    "amazon_url": ["amazon url", "amazon"],
+    "ebay_url": ["ebay url", "ebay"],
+    "our_price": ["our company price", "our price"],
+}
+
+_memo = {}
+_memo_lock = threading.Lock()
+
+
+def normalize_text(s) -> str:
+    """Cleans cell values: weird spaces, extra whitespace, None/NaN -> ""."""
+    if s is None or (isinstance(s, float) and s != s):
+        return ""
+    return " ".join(str(s).replace("\xa0", " ").strip().split())
+
+
+def _header_key(name):
+    return normalize_text(name).lower().replace("_", " ")
+
+
+# READERS
+
+def _read_xlsx(path):
+    # Read-only mode streams rows instead of building the whole workbook
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, ())
+        return pd.DataFrame([r for r in rows if any(v is not None for v in r)],
+                            columns=list(header)).astype(object)
+    finally:
+        wb.close()
+
+
+def _read_raw(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".xlsx", ".xlsm"):
+        return _read_xlsx(path)
+    if ext == ".csv":
+        return pd.read_csv(path, dtype=str, keep_default_na=False)
+    if ext == ".parquet":
+        return pd.read_parquet(path)
+    raise ValueError(f"Unsupported catalog format: {path} (use .xlsx, .csv or .parquet)")
+
+
+def normalize_catalog(raw: pd.DataFrame) -> pd.DataFrame:
+    """Maps the file's headers to COLUMNS; missing columns become empty strings."""
+    headers = {_header_key(c): c for c in raw.columns if c is not None}
+    df = pd.DataFrame(index=raw.index)
+    found = []
+    for column, aliases in COLUMNS.items():
+        source = next((headers[a] for a in aliases if a in headers), None)
+        df[column] = raw[source].map(normalize_text) if source is not None else ""
+        if source is not None:
+            found.append(column)
+
+    # Rows without a product name are blank lines or notes
+    df = df[df["product"] != ""].reset_index(drop=True)
+    df.attrs["found"] = found
+    df.attrs["headers"] = [str(c) for c in raw.columns]
+    return df
+
+
+# SNAPSHOT CACHE
+
+def _file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _snapshot_path(path):
+    folder = os.environ.get("PRICE_CATALOG_CACHE_DIR", SNAPSHOT_DIR)
+    return os.path.join(folder, hashlib.sha256(path.encode("utf-8")).hexdigest()[:16] + ".pkl")
+
+
+def _load_snapshot(path, stat):
+    """Cached DataFrame when the file is unchanged (same mtime/size, or same content)."""
+    try:
+        with open(_snapshot_path(path), "rb") as f:
+            snap = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None, None
+
+    if snap.get("version") != SNAPSHOT_VERSION:
+        return None, None
+    if (snap["mtime"], snap["size"]) == (stat.st_mtime_ns, stat.st_size):
+        return snap["df"], snap["sha256"]
+
+    # Touched (e.g. copied or saved again) but maybe not changed
+    digest = _file_hash(path)
+    if digest == snap["sha256"]:
+        _save_snapshot(path, stat, digest, snap["df"])
+        return snap["df"], digest
+    return None, digest
+
+
+def _save_snapshot(path, stat, digest, df):
+    target = _snapshot_path(path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump({"version": SNAPSHOT_VERSION, "source": path, "mtime": stat.st_mtime_ns,
+                     "size": stat.st_size, "sha256": digest, "df": df}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, target)
+
+
+# CATALOG LOADER
+
+def load_catalog(path=None, required=("product",)) -> pd.DataFrame:
+    """
+    Returns the catalog with the COLUMNS names (all strings, "" if missing).
+    The file is parsed once: later calls in the same process get the same
+    frame, later runs read the pickled snapshot until the file changes.
+    Raises ValueError when a `required` column is not in the file.
+    """
+    path = os.path.abspath(path or os.environ.get("PRICE_CATALOG", CATALOG_PATH))
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+
+    with _memo_lock:
+        df = _memo.get(key)
+        if df is None:
+            df, digest = _load_snapshot(path, stat)
+            if df is None:
+                df = normalize_catalog(_read_raw(path))
+                _save_snapshot(path, stat, digest or _file_hash(path), df)
+                print(f"[CATALOG] Parsed {len(df)} products from {os.path.basename(path)}")
+            _memo[key] = df
+
+    missing = [c for c in required if c not in df.attrs["found"]]
+    if missing:
+        raise ValueError(
+            f"Missing required columns in {path}.\n"
+            f"Found columns: {df.attrs['headers']}\n"
+            f"Need: {', '.join(COLUMNS[c][0] for c in missing)}"
+        )
+    return df.copy()
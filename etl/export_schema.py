@@ -1,23 +1,36 @@
-import mysql.connector
+import argparse
+from price_store import get_store, MySQLPriceStore, PRICE_TABLE, FACT_TABLE, STATS_TABLE, DIMENSIONS
 
-DB_CONFIG = {
-    "host": "localhost",
-    "user": "root",
-    "password": "your_password",
-    "port": 3306,
-    "database": "price_collection"
-}
 
-with mysql.connector.connect(**DB_CONFIG) as conn:
-    with conn.cursor() as cur:
-        cur.execute("SHOW CREATE TABLE PRICE;")
-        table_name, create_stmt = cur.fetchone()
+# Tables (and the PRICE view on v2) in creation order
+def schema_objects(store):
+    if store.schema == "v2":
+        return [table for table, _ in DIMENSIONS.values()] + [FACT_TABLE, PRICE_TABLE, STATS_TABLE]
+    return [PRICE_TABLE, STATS_TABLE]
 
-schema_sql = f"CREATE DATABASE IF NOT EXISTS price_collection;\nUSE price_collection;\n\n{create_stmt};\n"
 
-with open("prices_db.sql", "w", encoding="utf-8") as f:
-    f.write(schema_sql)
+def export_schema(path="prices_db.sql", store=None):
+    store = store or get_store()
 
-print("[OK] Exported schema to prices_db.sql")
+    statements = [store.show_create(name) for name in schema_objects(store) if store.object_type(name)]
+    header = ""
+    if isinstance(store, MySQLPriceStore):
+        database = store.config["database"]
+        header = f"CREATE DATABASE IF NOT EXISTS {database};\nUSE {database};\n\n"
+    schema_sql = header + "".join(f"{stmt};\n\n" for stmt in statements)
 
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(schema_sql)
 
+    print(f"[OK] Exported schema {store.schema} ({len(statements)} objects) to {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", nargs="?", default="prices_db.sql")
+    args = parser.parse_args(argv)
+    export_schema(args.path)
+
+
+if __name__ == "__main__":
+    main()
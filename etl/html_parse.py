@@ -0,0 +1,79 @@
+import os
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401  (only needed as a BeautifulSoup tree builder)
+    HAVE_LXML = True
+except ImportError:
+    HAVE_LXML = False
+
+# CONFIG
+# Backend = tree builder, optionally with "+strainer" to build only the
+# subtrees the extractor needs. Override with PRICE_HTML_PARSER.
+BACKENDS = ["html.parser", "html.parser+strainer", "lxml", "lxml+strainer"]
+DEFAULT_BACKEND = "lxml+strainer" if HAVE_LXML else "html.parser+strainer"
+
+
+# TARGETED PARSING
+
+# A product page is several hundred KB, but the extractors only read a few
+# price nodes. NodeFilter keeps a tag (with its whole subtree) when it has
+# one of the given ids, classes or attributes, and drops everything else
+# while parsing, so BeautifulSoup never builds the rest of the tree.
+#
+# Descendant selectors keep working as long as the ancestor is listed,
+# e.g. ".a-price .a-offscreen" needs classes={"a-price"}.
+class NodeFilter(SoupStrainer):
+    def __init__(self, ids=(), classes=(), attrs=()):
+        super().__init__()
+        self.ids = set(ids)
+        self.classes = set(classes)
+        # attribute -> set of accepted values (None = any value)
+        self.attrs = {
+            attr: None if wanted is None else ({wanted} if isinstance(wanted, str) else set(wanted))
+            for attr, wanted in dict(attrs).items()
+        }
+
+    def matches(self, attrs):
+        if not attrs:
+            return False
+
+        if self.ids and attrs.get("id") in self.ids:
+            return True
+
+        if self.classes:
+            value = attrs.get("class") or ""
+            names = value.split() if isinstance(value, str) else value
+            if self.classes.intersection(names):
+                return True
+
+        for attr, wanted in self.attrs.items():
+            if attr in attrs and (wanted is None or attrs[attr] in wanted):
+                return True
+
+        return False
+
+    # bs4 >= 4.13 asks these for every top-level tag/string while parsing
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return self.matches(attrs)
+
+    def allow_string_creation(self, string):
+        return False
+
+
+def make_soup(html, node_filter=None, backend=None):
+    """
+    Builds the BeautifulSoup tree for `html` with the configured backend.
+    `node_filter` is only applied by the "+strainer" backends, so the same
+    extractor code runs (and must give the same result) on every backend.
+    """
+    backend = backend or os.environ.get("PRICE_HTML_PARSER", DEFAULT_BACKEND)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown HTML parser backend: {backend} (choose from {BACKENDS})")
+
+    features, _, strained = backend.partition("+")
+    if features == "lxml" and not HAVE_LXML:
+        features = "html.parser"
+
+    parse_only = node_filter if strained and node_filter is not None else None
+    return BeautifulSoup(html, features, parse_only=parse_only)
@@ -0,0 +1,204 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import requests
+from requests.structures import CaseInsensitiveDict
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# CONFIG
+CACHE_DIR = os.path.join(BASE_DIR, "..", "data", "http_cache")   # env: PRICE_HTTP_CACHE_DIR
+CACHE_TTL_SECONDS = 12 * 3600           # serve without asking the server for this long,
+                                        # but never past midnight (prices are stored per day)
+CACHE_MAX_BYTES = 512 * 1024 * 1024     # LRU eviction above this size
+
+# Response headers we keep so a cached page behaves like the original
+KEPT_HEADERS = ["Content-Type", "ETag", "Last-Modified", "Date"]
+
+
+# CACHE STATS
+
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.hits = 0           # fresh entry, no request sent
+        self.revalidated = 0    # stale entry, server answered 304 Not Modified
+        self.misses = 0         # fetched the full page
+        self.bytes_saved = 0
+        self.evictions = 0
+
+    def add(self, field, n=1, saved=0):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + n)
+            self.bytes_saved += saved
+
+    def report(self, label="CACHE"):
+        total = self.hits + self.revalidated + self.misses
+        if not total:
+            return
+        ratio = 100.0 * (self.hits + self.revalidated) / total
+        print(
+            f"[{label}] {self.hits} hits, {self.revalidated} revalidated (304), {self.misses} misses "
+            f"({ratio:.0f}% served from cache), {self.bytes_saved / 1024:.0f} KB saved, "
+            f"{self.evictions} evicted"
+        )
+
+
+def _atomic_write(path, data: bytes):
+    # Write to a temp file first so readers never see half an entry
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _start_of_day(now):
+    """Local midnight before `now` (unix time)."""
+    t = time.localtime(now)
+    return time.mktime((t.tm_year, t.tm_mon, t.tm_mday, 0, 0, 0, 0, 0, -1))
+
+
+# ON-DISK CACHE
+
+# One entry = <sha256(url)>.body (raw page bytes) + <sha256(url)>.json
+# (url, kept headers, stored_at). The body's mtime is touched on every use,
+# so eviction can drop the least recently used entries first.
+class HttpCache:
+    def __init__(self, folder=None, ttl=CACHE_TTL_SECONDS, max_bytes=CACHE_MAX_BYTES):
+        self.folder = folder or os.environ.get("PRICE_HTTP_CACHE_DIR", CACHE_DIR)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()      # all sources
+        self.by_source = {}             # source -> CacheStats
+        self._lock = threading.Lock()
+        os.makedirs(self.folder, exist_ok=True)
+        self._size = sum(os.path.getsize(p) for p in self._bodies())
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.folder, key)
+        return base + ".body", base + ".json"
+
+    def _bodies(self):
+        return [os.path.join(self.folder, n) for n in os.listdir(self.folder) if n.endswith(".body")]
+
+    def lookup(self, url):
+        """Returns the cached entry dict (with "body" and "fresh") or None."""
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                meta["body"] = f.read()
+            os.utime(body_path)     # LRU: mark as recently used
+        except (OSError, ValueError):
+            return None
+
+        # A page from yesterday is revalidated even within the TTL, so
+        # yesterday's price is never stored under today's date
+        now = time.time()
+        meta["fresh"] = now - meta["stored_at"] < self.ttl and meta["stored_at"] >= _start_of_day(now)
+        return meta
+
+    def source_stats(self, source):
+        with self._lock:
+            if source not in self.by_source:
+                self.by_source[source] = CacheStats()
+            return self.by_source[source]
+
+    def count(self, field, source="", saved=0):
+        """Counts a hit / revalidation / miss in the totals and for `source`."""
+        self.stats.add(field, saved=saved)
+        self.source_stats(source).add(field, saved=saved)
+
+    def validators(self, entry):
+        """Conditional request headers for a stale entry."""
+        headers = {}
+        if entry["headers"].get("ETag"):
+            headers["If-None-Match"] = entry["headers"]["ETag"]
+        if entry["headers"].get("Last-Modified"):
+            headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+        return headers
+
+    def store(self, url, response):
+        body_path, meta_path = self._paths(url)
+        meta = {
+            "url": url,
+            "encoding": response.encoding,
+            "headers": {h: response.headers[h] for h in KEPT_HEADERS if h in response.headers},
+            "stored_at": time.time(),
+        }
+        body = response.content
+
+        old_size = os.path.getsize(body_path) if os.path.exists(body_path) else 0
+        _atomic_write(body_path, body)
+        _atomic_write(meta_path, json.dumps(meta).encode("utf-8"))
+
+        with self._lock:
+            self._size += len(body) - old_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def refresh(self, url, entry):
+        """Server said 304: the cached body is valid for another TTL (until midnight)."""
+        _, meta_path = self._paths(url)
+        meta = {k: v for k, v in entry.items() if k not in ("body", "fresh")}
+        meta["stored_at"] = time.time()
+        _atomic_write(meta_path, json.dumps(meta).encode("utf-8"))
+
+    def _evict(self):
+        # Oldest access time first, down to 90% of the cap
+        bodies = sorted(self._bodies(), key=os.path.getmtime)
+        target = self.max_bytes * 0.9
+        for body_path in bodies:
+            if self._size <= target:
+                break
+            size = os.path.getsize(body_path)
+            for path in (body_path, body_path[:-len(".body")] + ".json"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._size -= size
+            self.stats.add("evictions")
+
+    @staticmethod
+    def to_response(url, entry):
+        """Builds a requests.Response from a cache entry."""
+        response = requests.Response()
+        response.url = url
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.encoding = entry["encoding"]
+        response._content = entry["body"]
+        return response
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> HttpCache:
+    """Returns the process-wide cache (created on first use)."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = HttpCache()
+    return _cache
+
+
+def report(label="CACHE", source=None):
+    """Totals of the process, or of one `source` (see http_client.get)."""
+    if _cache is not None:
+        (_cache.stats if source is None else _cache.source_stats(source)).report(label)
+
+
+def reset_stats(source):
+    if _cache is not None:
+        _cache.source_stats(source).reset()
@@ -0,0 +1,197 @@
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+import http_cache
+import page_recorder
+
+# CONFIG
+CONNECT_TIMEOUT = 5.0   # seconds to establish TCP+TLS
+READ_TIMEOUT = 25.0     # seconds to wait between bytes of the response
+POOL_HOSTS = 10         # how many hosts keep their own connection pool
+POOL_MAXSIZE = 16       # keep-alive connections kept per host (>= async concurrency)
+MAX_RETRIES = 1         # retry once on connection errors (not on HTTP errors)
+USE_CACHE = os.environ.get("PRICE_HTTP_CACHE", "0") == "1"   # opt-in on-disk response cache (http_cache.py)
+
+# urllib3 advertises and decodes brotli only when the `brotli` package is
+# installed, so we reuse its list instead of hard-coding "br".
+DEFAULT_HEADERS = {
+    "Accept-Encoding": ACCEPT_ENCODING,
+    "Connection": "keep-alive",
+}
+
+
+# CONNECTION STATS
+
+# A response is either served on a brand-new connection (DNS + TCP + TLS
+# handshake) or on a pooled keep-alive one. Comparing the average latency of
+# both gives a rough estimate of the handshake time we save by reusing.
+class ConnectionStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+        self.new_seconds = 0.0
+        self.reused_seconds = 0.0
+
+    def record(self, reused: bool, seconds: float):
+        with self._lock:
+            self.requests += 1
+            if reused:
+                self.reused_connections += 1
+                self.reused_seconds += seconds
+            else:
+                self.new_connections += 1
+                self.new_seconds += seconds
+
+    def avg_handshake_savings(self) -> float:
+        """Average seconds saved per reused connection (0 if not measurable)."""
+        if not self.new_connections or not self.reused_connections:
+            return 0.0
+        avg_new = self.new_seconds / self.new_connections
+        avg_reused = self.reused_seconds / self.reused_connections
+        return max(0.0, avg_new - avg_reused)
+
+    def report(self, label="HTTP"):
+        if not self.requests:
+            print(f"[{label}] No HTTP requests made")
+            return
+
+        reuse_pct = 100.0 * self.reused_connections / self.requests
+        saving = self.avg_handshake_savings()
+        print(
+            f"[{label}] {self.requests} requests, {self.new_connections} new connections, "
+            f"{self.reused_connections} reused ({reuse_pct:.0f}%), "
+            f"avg handshake savings {saving * 1000:.0f} ms/reuse "
+            f"(~{saving * self.reused_connections:.1f}s total)"
+        )
+
+
+# One ConnectionStats per source ("amazon", "ebay", ...): the ETLs share the
+# session and run at the same time, so one global counter would mix them
+STATS = {}
+_stats_lock = threading.Lock()
+
+
+def stats(source="") -> ConnectionStats:
+    with _stats_lock:
+        if source not in STATS:
+            STATS[source] = ConnectionStats()
+        return STATS[source]
+
+
+def _tracker(source):
+    conn_stats = stats(source)
+
+    def track_connection(response, *args, **kwargs):
+        # Runs before the body is read, so the urllib3 connection is still
+        # attached to the raw response. Tag it the first time we see it.
+        conn = getattr(response.raw, "_connection", None)
+        reused = bool(getattr(conn, "_price_seen", False))
+        if conn is not None:
+            conn._price_seen = True
+        conn_stats.record(reused, response.elapsed.total_seconds())
+        return response
+
+    return track_connection
+
+
+# SHARED SESSION
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Returns the process-wide Session (created on first use)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=POOL_HOSTS,
+                    pool_maxsize=POOL_MAXSIZE,
+                    max_retries=MAX_RETRIES,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update(DEFAULT_HEADERS)
+                _session = session
+    return _session
+
+
+def get(url, headers=None, timeout=None, use_cache=None, source="", **kwargs):
+    """
+    GET through the pooled session with connect/read deadlines.
+    Content-Encoding (gzip/deflate/br) is decoded transparently.
+    Connection and cache stats are counted per `source` (see report()).
+
+    With the cache on, a fresh cached page is returned without a request and
+    a stale one is revalidated with If-None-Match / If-Modified-Since. A page
+    fetched from the server is cached only when the caller keep()s it.
+    """
+    if timeout is None:
+        timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+    if use_cache is None:
+        use_cache = USE_CACHE
+    response = _get(url, headers, timeout, use_cache, source, **kwargs)
+
+    # Record mode: keep the page for the offline extractor benchmarks
+    if response.status_code == 200 and page_recorder.enabled():
+        page_recorder.record_page(url, response.text)
+    return response
+
+
+def _get(url, headers, timeout, use_cache, source, **kwargs):
+    hooks = {"response": [_tracker(source)]}
+    if not use_cache:
+        return get_session().get(url, headers=headers, timeout=timeout, hooks=hooks, **kwargs)
+
+    cache = http_cache.get_cache()
+    entry = cache.lookup(url)
+
+    if entry is not None and entry["fresh"]:
+        cache.count("hits", source, saved=len(entry["body"]))
+        return cache.to_response(url, entry)
+
+    if entry is not None:
+        headers = {**(headers or {}), **cache.validators(entry)}
+
+    response = get_session().get(url, headers=headers, timeout=timeout, hooks=hooks, **kwargs)
+
+    if response.status_code == 304 and entry is not None:
+        cache.refresh(url, entry)
+        cache.count("revalidated", source, saved=len(entry["body"]))
+        return cache.to_response(url, entry)
+
+    cache.count("misses", source)
+    # Bot walls and captchas also come back as 200, so the page is stored
+    # only once the caller extracted a price from it (see keep())
+    response._cache_url = url if response.status_code == 200 else None
+    return response
+
+
+def keep(response):
+    """Caches a page fetched by get() after its price was extracted."""
+    url = getattr(response, "_cache_url", None)
+    if url is not None:
+        response._cache_url = None
+        http_cache.get_cache().store(url, response)
+
+
+def report(label="HTTP", source=""):
+    """Connection reuse and cache use of one source's requests."""
+    stats(source).report(label)
+    http_cache.report(label.replace("HTTP", "CACHE"), source)
+
+
+def reset_stats(source=""):
+    """Starts the counts of `source` over (each ETL run calls this first)."""
+    stats(source).reset()
+    http_cache.reset_stats(source)
@@ -0,0 +1,202 @@
+import os
+import glob
+import time
+import argparse
+import pandas as pd
+from price_store import get_store, PRICE_TABLE, OUR_SELLER
+from catalog import normalize_text
+from price_parse import parse_cents_memoized
+import run_metrics
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# CONFIG
+# Bulk import of price snapshots (data/ebay_prices_*.csv, Idealo_prices_*.csv,
+# price_summary.csv, ...) into PRICE. Files are streamed in chunks, each
+# chunk is normalised in pandas, staged and merged with one set-based
+# statement (see PriceStore.merge_staging), so memory stays flat for
+# multi-GB backfills:
+#   python import_csv.py                        # every CSV in data/
+#   python import_csv.py /backups/prices_*.csv.gz --keep-existing
+DEFAULT_FILES = os.path.join(BASE_DIR, "..", "data", "*.csv")
+CHUNK_ROWS = 200_000
+
+# Canonical column -> accepted headers (compared lower-case, "_" = " ");
+# other columns (e.g. the ID of database exports) are ignored
+COLUMNS = {
+    "Product": ["product", "product name", "name"],
+    "Date": ["date", "day"],
+    "Seller": ["seller", "shop", "platform"],
+    "Price": ["price", "price eur", "preis"],
+}
+
+# Seller spellings in old exports -> the names the ETLs write today
+SELLER_NAMES = {
+    "ebay": "Ebay",
+    "amazon": "Amazon",
+    "idealo": "Idealo",
+    "idealo partner": "Idealo",
+    "our company": OUR_SELLER,
+}
+SELLER_PREFIXES = {"ebay_itm_": "eBay_itm_"}     # multi-offer sellers, see Ebay_ETL.py
+
+
+# NORMALISATION
+
+def map_headers(columns, path=""):
+    """File header -> canonical column; raises ValueError when one is missing."""
+    found = {}
+    for column in columns:
+        key = normalize_text(column).lower().replace("_", " ")
+        for canonical, aliases in COLUMNS.items():
+            if key in aliases and canonical not in found.values():
+                found[column] = canonical
+    missing = [c for c in COLUMNS if c not in found.values()]
+    if missing:
+        raise ValueError(f"{path}: missing column(s) {missing}; found {list(columns)}")
+    return found
+
+
+def seller_name(raw):
+    name = normalize_text(raw)
+    low = name.lower()
+    if low in SELLER_NAMES:
+        return SELLER_NAMES[low]
+    for prefix, canonical in SELLER_PREFIXES.items():
+        if low.startswith(prefix):
+            return canonical + name[len(prefix):]
+    return name
+
+
+def _map_unique(series, func):
+    # Names repeat on every row: normalise each distinct value once
+    codes, uniques = pd.factorize(series)
+    mapped = pd.Index([func(v) for v in uniques] + [""])
+    return pd.Series(mapped.take(codes), index=series.index)
+
+
+def parse_dates(series):
+    """ISO dates fast path, anything else (e.g. 31.12.2025) day-first; NaT when unreadable."""
+    dates = pd.to_datetime(series, format="%Y-%m-%d", errors="coerce")
+    rest = dates.isna() & series.ne("")
+    if rest.any():
+        dates[rest] = pd.to_datetime(series[rest], dayfirst=True, format="mixed", errors="coerce")
+    return dates
+
+
+def normalize_chunk(raw: pd.DataFrame, headers: dict) -> pd.DataFrame:
+    """
+    Raw CSV chunk (all strings) -> Product, Date (ISO), Seller, Price
+    ("123.45", exact from integer cents). Rows with an empty name, an
+    unreadable date or no price are dropped.
+    """
+    df = raw[list(headers)].rename(columns=headers)
+
+    cents = parse_cents_memoized(df["Price"])
+    dates = parse_dates(df["Date"].str.strip())
+    out = pd.DataFrame({
+        "Product": _map_unique(df["Product"], normalize_text),
+        "Date": dates.dt.strftime("%Y-%m-%d"),
+        "Seller": _map_unique(df["Seller"], seller_name),
+        "Price": (cents // 100).astype(str) + "." + (cents % 100).astype(str).str.zfill(2),
+    })
+    valid = cents.notna() & dates.notna() & out["Product"].ne("") & out["Seller"].ne("")
+    return out[valid.to_numpy()]
+
+
+# IMPORT
+
+def read_chunks(path, chunk_rows=CHUNK_ROWS):
+    """(headers, chunk) pairs; compressed files (.gz, .zip, ...) are read as they are."""
+    reader = pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunk_rows,
+                         encoding="utf-8-sig", on_bad_lines="warn")
+    headers = None
+    for chunk in reader:
+        if headers is None:
+            headers = map_headers(chunk.columns, path)
+        yield headers, chunk
+
+
+def import_files(paths, store=None, chunk_rows=CHUNK_ROWS, keep_existing=False, refresh_stats=True):
+    """
+    Imports the CSV files in order (a later file wins on the same
+    Product/Date/Seller unless keep_existing). Returns totals as a dict.
+    """
+    store = store or get_store()
+    totals = {"files": 0, "read": 0, "loaded": 0, "invalid": 0, "duplicates": 0, "seconds": 0.0}
+    dates = set()
+
+    # Staged rows are merged in the order of the unique key (v1) or the
+    # date-leading primary key (v2), so the index is appended to instead of
+    # hit at random; on SQLite that makes the merge ~3x faster
+    key_order = ["Date", "Product", "Seller"] if store.schema == "v2" else ["Product", "Date", "Seller"]
+
+    started = time.perf_counter()
+    conn = store.bulk_connect()
+    try:
+        cur = conn.cursor()
+        store.create_staging(cur)
+        for path in paths:
+            file_started = time.perf_counter()
+            read = loaded = invalid = duplicates = 0
+
+            for headers, raw in read_chunks(path, chunk_rows):
+                df = normalize_chunk(raw, headers)
+                invalid += len(raw) - len(df)
+                unique = df.drop_duplicates(key_order, keep="last").sort_values(key_order)
+                duplicates += len(df) - len(unique)
+
+                if len(unique):
+                    with run_metrics.timer("db_load", "import"):
+                        store.load_staging(cur, list(unique.itertuples(index=False, name=None)))
+                    with run_metrics.timer("db_merge", "import"):
+                        store.merge_staging(cur, keep_existing)
+                        conn.commit()
+                    run_metrics.count("rows_written", len(unique), "import")
+                    dates.update(unique["Date"].unique())
+
+                read += len(raw)
+                loaded += len(unique)
+
+            seconds = time.perf_counter() - file_started
+            print(f"[IMPORT] {os.path.basename(path)}: {read} rows, {loaded} loaded, {invalid} invalid, "
+                  f"{duplicates} duplicate keys in {seconds:.1f}s ({read / seconds if seconds else 0:.0f} rows/sec)")
+            for key, value in (("read", read), ("loaded", loaded), ("invalid", invalid), ("duplicates", duplicates)):
+                totals[key] += value
+            totals["files"] += 1
+        cur.close()
+    finally:
+        conn.close()
+
+    if refresh_stats and dates:
+        stats_started = time.perf_counter()
+        store.backfill_daily_stats(dates)
+        print(f"[DB] Refreshed daily stats for {len(dates)} date(s) in {time.perf_counter() - stats_started:.1f}s")
+
+    totals["seconds"] = time.perf_counter() - started
+    rate = totals["read"] / totals["seconds"] if totals["seconds"] else 0.0
+    print(f"[IMPORT] {totals['files']} file(s), {totals['read']} rows read, {totals['loaded']} loaded into "
+          f"{store.name}.{PRICE_TABLE} in {totals['seconds']:.1f}s ({rate:.0f} rows/sec)")
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import CSV price snapshots into PRICE.")
+    parser.add_argument("files", nargs="*", help=f"CSV files or globs (default: {DEFAULT_FILES})")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows per staged chunk")
+    parser.add_argument("--keep-existing", action="store_true",
+                        help="do not overwrite prices already stored for the same Product/Date/Seller")
+    parser.add_argument("--no-stats", action="store_true",
+                        help="skip the PRICE_DAILY_STATS refresh (run backfill_daily_stats.py later)")
+    args = parser.parse_args(argv)
+
+    paths = []
+    for pattern in args.files or [DEFAULT_FILES]:
+        paths += sorted(glob.glob(pattern)) or [pattern]
+    import_files(paths, chunk_rows=args.chunk_rows, keep_existing=args.keep_existing,
+                 refresh_stats=not args.no_stats)
+    run_metrics.finish()
+
+
+if __name__ == "__main__":
+    main()
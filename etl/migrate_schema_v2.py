@@ -0,0 +1,48 @@
+import time
+import argparse
+from price_store import get_store, MySQLPriceStore, PRICE_TABLE, LEGACY_TABLE
+
+
+# SCHEMA V2 MIGRATION
+
+# Moves an existing v1 database (PRICE keyed on Product/Seller strings) to
+# the PRODUCT / SELLER / PRICE_FACT layout. PRICE is replaced by a view with
+# the same columns, so the ETLs, the report and ad-hoc SQL keep working;
+# the old table stays as PRICE_V1 until you drop it.
+def migrate(store=None):
+    store = store or get_store()
+    if store.schema == "v2":
+        print(f"[OK] {store.name} is already on schema v2")
+        return
+
+    started = time.perf_counter()
+    copied = store.migrate_to_v2()
+    print(f"[OK] Migrated {copied} rows of {store.name} to schema v2 ({time.perf_counter() - started:.1f}s)")
+
+    legacy = store.query(f"SELECT COUNT(*) FROM {LEGACY_TABLE}")[0][0]
+    current = store.query(f"SELECT COUNT(*) FROM {PRICE_TABLE}")[0][0]
+    if legacy != current:
+        print(f"[WARN] {LEGACY_TABLE} has {legacy} rows but the {PRICE_TABLE} view shows {current}")
+    else:
+        print(f"[OK] {PRICE_TABLE} view matches {LEGACY_TABLE} ({current} rows); "
+              f"drop {LEGACY_TABLE} once you are happy with it")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--extend-partitions", type=int, metavar="MONTHS", default=None,
+                        help="MySQL only: add monthly PRICE_FACT partitions up to MONTHS from today")
+    args = parser.parse_args(argv)
+
+    store = get_store()
+    if args.extend_partitions is not None:
+        if not isinstance(store, MySQLPriceStore):
+            raise SystemExit("Partitions are only used on MySQL")
+        added = store.extend_partitions(args.extend_partitions)
+        print(f"[OK] Added {added} monthly partition(s) to PRICE_FACT")
+    else:
+        migrate(store)
+
+
+if __name__ == "__main__":
+    main()
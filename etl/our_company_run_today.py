@@ -1,103 +1,39 @@
-import re
-import pandas as pd
-import mysql.connector
 from datetime import date
-
-DB_CONFIG = {
-    "host": "localhost",
-    "user": "root",
-    "password": "your_password",
-    "port": 3306,
-    "database": "price_collection",
-}
+from price_store import get_store
+from catalog import load_catalog
+from price_parse import parse_price
 
 PRICE_TABLE = "PRICE"
 SELLER_OUR = "Our company"
 
 
-def parse_price(value):
-    """Convert '839,99', '1.299,99 €', 839.99 -> float or None."""
-    if value is None:
-        return None
-
-    t = str(value).replace("\xa0", " ").strip()
-    if not t:
-        return None
-
-    m = re.search(r"(\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2})|\d+[.,]\d{2}|\d+)", t)
-    if not m:
-        return None
-
-    num = m.group(0)
-    if "." in num and "," in num:
-        num = num.replace(".", "").replace(",", ".")
-    elif "," in num:
-        num = num.replace(",", ".")
-
-    try:
-        return float(num)
-    except ValueError:
-        return None
-
-
-def find_col(df, *candidates):
-    """Find column by case-insensitive match."""
-    norm = {c.strip().lower(): c for c in df.columns}
-    for cand in candidates:
-        key = cand.strip().lower()
-        if key in norm:
-            return norm[key]
-    return None
-
-
-def run_our_company_today(excel_path="products.xlsx"):
+def run_our_company_today(excel_path=None, store=None):
     today = date.today()
 
-    df = pd.read_excel(excel_path).fillna("")
-    product_col = find_col(df, "Product name", "product_name", "product", "name")
-    price_col = find_col(df, "Our company price", "our_company_price", "Our Company Price", "our price", "Our price")
-
-    if not product_col or not price_col:
-        raise ValueError(
-            f"Missing columns in {excel_path}. Found: {list(df.columns)}\n"
-            f"Need product + our company price columns."
-        )
+    df = load_catalog(excel_path, required=("product", "our_price"))
 
     rows = []
-    for _, row in df.iterrows():
-        product = str(row[product_col]).strip()
-        price_val = parse_price(row[price_col])
+    for product, raw_price in zip(df["product"], df["our_price"]):
+        price_val = parse_price(raw_price)
 
-        if not product:
-            continue
         if price_val is None:
-            print(f"[WARN] Skipping {product} (invalid Our company price: {row[price_col]})")
+            print(f"[WARN] Skipping {product} (invalid Our company price: {raw_price})")
             continue
 
-        rows.append((product, today, SELLER_OUR, round(price_val, 2)))
+        rows.append((product, today, SELLER_OUR, price_val))
         print(f"[OK] {product} | {SELLER_OUR}: {price_val:.2f} €")
 
     if not rows:
         print("[WARN] No rows to insert.")
         return
 
-    sql = f"""
-    INSERT INTO {PRICE_TABLE} (Product, Date, Seller, Price)
-    VALUES (%s, %s, %s, %s)
-    ON DUPLICATE KEY UPDATE Price = VALUES(Price);
-    """
-
-    conn = mysql.connector.connect(**DB_CONFIG)
-    cur = conn.cursor()
-    cur.executemany(sql, rows)
-    conn.commit()
-
-    print(f"\n[DB] Inserted/updated {len(rows)} rows into {DB_CONFIG['database']}.{PRICE_TABLE} for {today.isoformat()}")
+    store = store or get_store()
+    with store.writer(table=PRICE_TABLE, source="our_company") as writer:
+        writer.add_many(rows)
 
-    cur.close()
-    conn.close()
+    print(f"\n[DB] Inserted/updated {len(rows)} rows into {store.name}.{PRICE_TABLE} for {today.isoformat()}")
 
 
 if __name__ == "__main__":
-    run_our_company_today("products.xlsx")
+    run_our_company_today()
 
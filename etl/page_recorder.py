@@ -0,0 +1,76 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from urllib.parse import urlsplit
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# CONFIG
+# Record mode saves every page the scrapers fetch into a versioned corpus
+# that benchmarks/bench_extractors.py replays offline:
+#   PRICE_RECORD_PAGES=1 python run_all_etl.py
+CORPUS_DIR = os.path.join(BASE_DIR, "..", "benchmarks", "corpus")   # env: PRICE_CORPUS_DIR
+CORPUS_VERSION = "v1"                                               # env: PRICE_CORPUS_VERSION
+
+SOURCES = {"amazon": "amazon", "ebay": "ebay", "idealo": "idealo"}   # host keyword -> source
+
+_lock = threading.Lock()
+
+
+def enabled():
+    return os.environ.get("PRICE_RECORD_PAGES", "0") == "1"
+
+
+def corpus_path(version=None):
+    folder = os.environ.get("PRICE_CORPUS_DIR", CORPUS_DIR)
+    return os.path.join(folder, version or os.environ.get("PRICE_CORPUS_VERSION", CORPUS_VERSION))
+
+
+def source_for(url):
+    host = urlsplit(url).netloc.lower()
+    for keyword, source in SOURCES.items():
+        if keyword in host:
+            return source
+    return None
+
+
+def load_manifest(version=None):
+    path = os.path.join(corpus_path(version), "manifest.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"version": version or os.environ.get("PRICE_CORPUS_VERSION", CORPUS_VERSION), "pages": {}}
+
+
+def record_page(url, html, source=None):
+    """Saves html as <corpus>/<version>/<source>/<hash>.html and lists it in manifest.json."""
+    if not enabled() or not html:
+        return
+
+    source = source or source_for(url)
+    if source is None:
+        return
+
+    folder = corpus_path()
+    name = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16] + ".html"
+    rel = f"{source}/{name}"
+    data = html.encode("utf-8")
+
+    with _lock:
+        os.makedirs(os.path.join(folder, source), exist_ok=True)
+        with open(os.path.join(folder, rel), "wb") as f:
+            f.write(data)
+
+        manifest = load_manifest()
+        manifest["pages"][rel] = {
+            "url": url,
+            "source": source,
+            "bytes": len(data),
+            "sha256": hashlib.sha256(data).hexdigest(),
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        with open(os.path.join(folder, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
@@ -0,0 +1,285 @@
+import os
+import glob
+import json
+import time
+import argparse
+import pandas as pd
+from price_store import get_store, OUR_SELLER
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    from pyarrow import fs
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# CONFIG
+# Columnar copy of PRICE for analytics, so reports do not have to read the
+# whole history out of the OLTP database. One Parquet dataset, partitioned
+# by day and seller family:
+#   data/archive/Date=2026-10-18/Source=ebay/part-<ns>.parquet
+# The source is the family of the seller name (see SOURCES), not the name
+# itself: multi-offer runs store one seller per offer (eBay_itm_<item id>),
+# which would be one directory per item. Seller stays a data column.
+#
+# Rows get in three ways:
+#   - PriceWriter appends what an ETL wrote (PRICE_ARCHIVE=1 or
+#     run_all_etl.py --archive), one small file per partition and run
+#   - python price_archive.py export    # new PRICE rows since the last export
+#   - python price_archive.py compact   # one file per partition, duplicates dropped
+ARCHIVE_DIR = os.path.join(BASE_DIR, "..", "data", "archive")   # env: PRICE_ARCHIVE_DIR
+EXPORT_BATCH = 1_000_000        # PRICE rows per export query
+WATERMARK_FILE = "_watermark.json"
+
+# Seller name prefix -> Source partition (first match wins)
+SOURCES = [
+    ("eBay_itm_", "ebay"),
+    ("Ebay", "ebay"),
+    ("Idealo", "idealo"),       # also Idealo_<shop>
+    ("Amazon", "amazon"),
+    (OUR_SELLER, "our_company"),
+]
+OTHER_SOURCE = "other"
+
+COLUMNS = ["Product", "Date", "Seller", "Price"]
+KEYS = ["Product", "Date", "Seller"]
+
+
+def archive_dir():
+    return os.environ.get("PRICE_ARCHIVE_DIR", ARCHIVE_DIR)
+
+
+def _require_pyarrow():
+    if not HAVE_PYARROW:
+        raise RuntimeError("The price archive needs pyarrow (pip install pyarrow)")
+
+
+def source_of(seller):
+    for prefix, source in SOURCES:
+        if seller.startswith(prefix):
+            return source
+    return OTHER_SOURCE
+
+
+def _file_schema():
+    # Date and Source live in the directory names
+    return pa.schema([("Product", pa.string()), ("Seller", pa.string()), ("Price", pa.float64())])
+
+
+def _partitioning():
+    return ds.partitioning(pa.schema([("Date", pa.date32()), ("Source", pa.string())]), flavor="hive")
+
+
+# WRITING
+
+def _write_file(folder, table, name):
+    # Written under a dot name and renamed, so readers never see half a file
+    os.makedirs(folder, exist_ok=True)
+    tmp = os.path.join(folder, f".{name}.tmp")
+    pq.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, os.path.join(folder, name))
+
+
+def append_rows(rows, folder=None):
+    """
+    Appends (Product, Date, Seller, Price) rows (tuples or a DataFrame with
+    those columns) as one new file per Date/Source partition. File names
+    start with the write time, so name order is write order and a later
+    file wins on the same Product/Date/Seller. Returns the rows written.
+    """
+    _require_pyarrow()
+    folder = folder or archive_dir()
+    df = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows), columns=COLUMNS)
+    if df.empty:
+        return 0
+
+    codes, sellers = pd.factorize(df["Seller"])
+    df = pd.DataFrame({
+        "Product": df["Product"].astype(str),
+        "Date": pd.to_datetime(df["Date"]).dt.strftime("%Y-%m-%d"),
+        "Seller": df["Seller"].astype(str),
+        "Price": df["Price"].astype(float),
+        "Source": pd.Index([source_of(str(s)) for s in sellers]).take(codes),
+    })
+
+    name = f"part-{time.time_ns():020d}.parquet"
+    schema = _file_schema()
+    for (date, source), part in df.groupby(["Date", "Source"], sort=False):
+        table = pa.Table.from_pandas(part[schema.names], schema=schema, preserve_index=False)
+        _write_file(os.path.join(folder, f"Date={date}", f"Source={source}"), table, name)
+    return len(df)
+
+
+# READING
+
+def partitions(folder=None, start=None, end=None, sources=None):
+    """{(date, source): [files, oldest first]} with dates in [start, end]."""
+    folder = folder or archive_dir()
+    start = str(start)[:10] if start else None
+    end = str(end)[:10] if end else None
+
+    found = {}
+    for path in sorted(glob.glob(os.path.join(folder, "Date=*", "Source=*", "part-*.parquet"))):
+        source_dir = os.path.dirname(path)
+        date = os.path.basename(os.path.dirname(source_dir))[len("Date="):]
+        source = os.path.basename(source_dir)[len("Source="):]
+        if (start and date < start) or (end and date > end) or (sources and source not in sources):
+            continue
+        found.setdefault((date, source), []).append(path)
+    return found
+
+
+def load_archive(columns=COLUMNS, start=None, end=None, sources=None, folder=None):
+    """
+    Prices from the archive as a DataFrame (Date as datetime64, Price as
+    float). Only `columns` are decoded and only the partitions in the date
+    range / sources are opened; files are memory-mapped instead of read
+    into buffers. A partition written to more than once since the last
+    compact() is deduplicated, the newest price wins.
+    """
+    _require_pyarrow()
+    folder = folder or archive_dir()
+    columns = list(columns)
+    found = partitions(folder, start, end, sources)
+    if not found:
+        return pd.DataFrame({c: pd.Series(dtype="float64" if c == "Price" else "object") for c in columns})
+
+    # Files are scanned in the order given, so keep="last" = newest write
+    duplicates = any(len(files) > 1 for files in found.values())
+    read = list(dict.fromkeys(columns + KEYS)) if duplicates else columns
+
+    dataset = ds.dataset(
+        [path for files in found.values() for path in files],
+        format="parquet",
+        partitioning=_partitioning(),
+        partition_base_dir=folder,
+        filesystem=fs.LocalFileSystem(use_mmap=True),
+    )
+    df = dataset.to_table(columns=read).to_pandas(date_as_object=False)
+
+    if duplicates:
+        df = df.drop_duplicates(KEYS, keep="last")[columns].reset_index(drop=True)
+    return df
+
+
+# MAINTENANCE
+
+def compact(dates=None, folder=None):
+    """
+    Rewrites every partition (of `dates`, default all) that has more than
+    one file into a single file without duplicate keys. The new file keeps
+    the name of the newest input, so it still sorts before later appends.
+    Returns the number of partitions compacted.
+    """
+    _require_pyarrow()
+    folder = folder or archive_dir()
+    wanted = {str(d)[:10] for d in dates} if dates else None
+    compacted = 0
+    for (date, source), files in partitions(folder).items():
+        if len(files) < 2 or (wanted and date not in wanted):
+            continue
+        df = pd.concat([pq.read_table(path).to_pandas() for path in files], ignore_index=True)
+        df = df.drop_duplicates(["Product", "Seller"], keep="last").sort_values(["Product", "Seller"])
+
+        table = pa.Table.from_pandas(df, schema=_file_schema(), preserve_index=False)
+        _write_file(os.path.dirname(files[-1]), table, os.path.basename(files[-1]))
+        for path in files[:-1]:
+            os.remove(path)
+        compacted += 1
+    return compacted
+
+
+def _read_watermark(folder):
+    path = os.path.join(folder, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_watermark(folder, watermark):
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, WATERMARK_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(watermark, f)
+    os.replace(path + ".tmp", path)
+
+
+def export_from_store(store=None, folder=None, batch=EXPORT_BATCH):
+    """
+    Appends the PRICE rows added since the last export, `batch` rows at a
+    time (see PriceStore.load_prices_after). On schema v1 the watermark is
+    the highest ID exported; an upsert that only changes the price keeps
+    its ID, so it reaches the archive through PriceWriter (PRICE_ARCHIVE=1),
+    not through export. Schema v2 has no row ID: the last exported day is
+    exported again and everything after it.
+    Returns the rows exported.
+    """
+    _require_pyarrow()
+    store = store or get_store()
+    folder = folder or archive_dir()
+    watermark = _read_watermark(folder)
+    exported = 0
+
+    v2 = store.schema == "v2"
+    last_id = (watermark.get("last_date", "0000-01-01"), 0, 0) if v2 else watermark.get("last_id", 0)
+    while True:
+        df = store.load_prices_after(last_id, batch)
+        if df.empty:
+            break
+        exported += append_rows(df[COLUMNS], folder)
+        last_id = df["ID"].iloc[-1]
+        if v2:
+            watermark["last_date"] = last_id[0]
+        else:
+            watermark["last_id"] = last_id = int(last_id)
+        _write_watermark(folder, watermark)     # after every batch: a failed export resumes here
+        print(f"[ARCHIVE] Exported {exported} rows (up to {'key' if v2 else 'ID'} {last_id})")
+    return exported
+
+
+def stats(folder=None):
+    """Files, rows and bytes per source."""
+    _require_pyarrow()
+    per = {}
+    for (date, source), files in partitions(folder).items():
+        entry = per.setdefault(source, {"partitions": 0, "files": 0, "rows": 0, "bytes": 0, "days": set()})
+        entry["partitions"] += 1
+        entry["files"] += len(files)
+        entry["days"].add(date)
+        for path in files:
+            entry["rows"] += pq.ParquetFile(path).metadata.num_rows
+            entry["bytes"] += os.path.getsize(path)
+    return pd.DataFrame([
+        {"source": source, "days": len(e["days"]), "first": min(e["days"]), "last": max(e["days"]),
+         "files": e["files"], "rows": e["rows"], "MB": round(e["bytes"] / 1e6, 1)}
+        for source, e in sorted(per.items())
+    ])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parquet archive of PRICE for analytics.")
+    parser.add_argument("command", choices=["export", "compact", "stats"],
+                        help="export: new PRICE rows since the last export; "
+                             "compact: merge small files; stats: archive size per source")
+    parser.add_argument("--dir", default=None, help=f"archive folder (default: {ARCHIVE_DIR})")
+    parser.add_argument("--batch", type=int, default=EXPORT_BATCH, help="PRICE rows per export query")
+    args = parser.parse_args()
+    folder = args.dir or archive_dir()
+
+    started = time.perf_counter()
+    if args.command == "export":
+        rows = export_from_store(folder=folder, batch=args.batch)
+        print(f"[ARCHIVE] {rows} rows exported to {folder} in {time.perf_counter() - started:.1f}s")
+        compacted = compact(folder=folder)
+        print(f"[ARCHIVE] Compacted {compacted} partition(s)")
+    elif args.command == "compact":
+        compacted = compact(folder=folder)
+        print(f"[ARCHIVE] Compacted {compacted} partition(s) in {time.perf_counter() - started:.1f}s")
+    else:
+        table = stats(folder)
+        print(table.to_string(index=False) if len(table) else f"[ARCHIVE] {folder} is empty")
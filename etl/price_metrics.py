@@ -0,0 +1,65 @@
+import pandas as pd
+
+OUR_SELLER = "Our company"
+KEYS = ["Product", "Date"]
+
+
+# PRODUCT x DATE METRICS
+
+def product_date_metrics(df: pd.DataFrame, our_seller=OUR_SELLER) -> pd.DataFrame:
+    """
+    One row per (Product, Date) from raw Product/Date/Seller/Price rows:
+      min_price, avg_price, max_price  - over all sellers
+      seller_count                     - number of offers
+      our_price                        - price of `our_seller` (NaN if absent)
+      our_rank                         - 1 = cheapest; ties share the better
+                                         rank, like check_rank_changes (NaN if absent)
+
+    Everything is computed with groupby aggregations and one groupby rank,
+    no per-group Python code, so it scales to millions of rows.
+    """
+    price = df["Price"].astype(float)
+    groups = [df["Product"], df["Date"]]
+
+    result = price.groupby(groups, sort=True).agg(
+        min_price="min",
+        avg_price="mean",
+        max_price="max",
+        seller_count="size",
+    )
+
+    rank = price.groupby(groups).rank(method="min")
+    ours = df["Seller"].eq(our_seller).to_numpy()
+    our_rows = pd.DataFrame({
+        "Product": df["Product"].to_numpy()[ours],
+        "Date": df["Date"].to_numpy()[ours],
+        "our_price": price.to_numpy()[ours],
+        "our_rank": rank.to_numpy()[ours],
+    }).drop_duplicates(KEYS).set_index(KEYS)
+
+    result = result.join(our_rows)
+    result.index.names = KEYS
+    return result.reset_index()
+
+
+# RANK CHANGES BETWEEN TWO DATES
+
+def find_rank_changes(ranks: pd.DataFrame, current_date, previous_date) -> pd.DataFrame:
+    """
+    Products whose our_rank differs between `previous_date` and `current_date`,
+    from Product/Date/our_rank rows, one per product and date (e.g.
+    product_date_metrics() output or PriceStore.load_ranks()).
+    Returns product, previous_rank, current_rank - one merge, no Python loop.
+    """
+    ours = ranks.dropna(subset=["our_rank"])
+    current = ours.loc[ours["Date"] == current_date, ["Product", "our_rank"]]
+    previous = ours.loc[ours["Date"] == previous_date, ["Product", "our_rank"]]
+
+    merged = previous.merge(current, on="Product", suffixes=("_previous", "_current"))
+    merged = merged[merged["our_rank_previous"] != merged["our_rank_current"]].sort_values("Product")
+
+    return pd.DataFrame({
+        "product": merged["Product"].to_numpy(),
+        "previous_rank": merged["our_rank_previous"].astype(int).to_numpy(),
+        "current_rank": merged["our_rank_current"].astype(int).to_numpy(),
+    })
@@ -0,0 +1,127 @@
+import re
+from decimal import Decimal
+import pandas as pd
+
+# PRICE PARSING
+# One parser for every scraper and loader. Prices are read as integer cents,
+# so no float rounding sneaks in; parse_price() gives a Decimal for the DB.
+#
+#   "1.299,99 €"  "EUR 2.049,00"  "899,99"   (EU)
+#   "$1,299.99"   "USD 899.99"    "1299"     (US / plain)
+#   "1 299,99 €"  "1.299,-"       "+EUR 4,99 Versand"
+#
+# The last separator followed by 1-2 digits is the decimal point; groups of
+# exactly three digits after a separator are thousands. Texts often hold
+# other numbers too ("Lieferung in 2-4 Tagen EUR 4,99", "3 Angebote ab
+# 1.299,99 €", "Artikelnummer 204961449144 EUR 12,00"), so the amount is,
+# in this order:
+#   1. the first number with decimals ("4,99", "1.299,-")
+#   2. the first number next to a currency marker ("EUR 12", "1.299 €")
+#   3. the number itself, when the whole text is one number ("1299")
+# Anything else ("2 verfügbar") is no price.
+
+SEPARATORS = " .,'’\u00a0\u202f\u2009"    # thousands: space, no-break/thin space, . , '
+PRICE_RE = re.compile(
+    rf"(?P<int>\d{{1,3}}(?:[{SEPARATORS}]\d{{3}})+(?!\d)|\d+)"   # 1.299 / 1,299 / 1 299 / 1299
+    r"(?:[.,](?:(?P<dec>\d{1,2})|(?P<dash>[-–]))?)?(?!\d)"          # ,99 / .9 / ,-
+)
+CURRENCY = r"(?:€|EUR|USD|US\s?\$|\$|£|GBP)"
+CURRENCY_BEFORE_RE = re.compile(rf"{CURRENCY}\s*$", re.IGNORECASE)
+CURRENCY_AFTER_RE = re.compile(rf"\s*{CURRENCY}", re.IGNORECASE)
+NON_DIGITS_RE = re.compile(r"\D")
+
+# Shipping text meaning "no shipping cost" (DE / EN)
+FREE_SHIPPING = ("kostenlos", "gratis", "free")
+
+
+# SCALAR PARSERS
+
+def find_amount(text):
+    """The PRICE_RE match holding the amount of `text` (rules above), or None."""
+    first = currency = None
+    for m in PRICE_RE.finditer(text):
+        if m.group("dec") or m.group("dash"):
+            return m
+        if first is None:
+            first = m
+        if currency is None and (CURRENCY_BEFORE_RE.search(text, 0, m.start())
+                                 or CURRENCY_AFTER_RE.match(text, m.end())):
+            currency = m
+    if currency is not None:
+        return currency
+    if first is not None and not text[:first.start()].strip() and not text[first.end():].strip():
+        return first
+    return None
+
+
+def parse_cents(text):
+    """'1.299,99 €' -> 129999; None when there is no price in `text`."""
+    if text is None:
+        return None
+    m = find_amount(text if isinstance(text, str) else str(text))
+    if not m:
+        return None
+    whole, dec = m.group("int", "dec")
+    if not whole.isdigit():
+        whole = NON_DIGITS_RE.sub("", whole)
+    return int(whole) * 100 + (int(dec.ljust(2, "0")) if dec else 0)
+
+
+def cents_to_decimal(cents):
+    return None if cents is None else Decimal(cents).scaleb(-2)
+
+
+def parse_price(text):
+    """'1.299,99 €' -> Decimal('1299.99'); None when there is no price."""
+    return cents_to_decimal(parse_cents(text))
+
+
+def shipping_cents(text):
+    """'Kostenloser Versand' -> 0, '+EUR 4,99 Versand' -> 499; unknown -> 0."""
+    if not text:
+        return 0
+    low = str(text).lower()
+    if any(word in low for word in FREE_SHIPPING):
+        return 0
+    cents = parse_cents(text)
+    return cents if cents is not None else 0
+
+
+def shipping_price(text):
+    return cents_to_decimal(shipping_cents(text))
+
+
+def price_from_parts(whole, fraction=None):
+    """Amazon style split price: whole '1.299,' + fraction '99' -> Decimal('1299.99')."""
+    digits = NON_DIGITS_RE.sub("", str(whole or ""))
+    if not digits:
+        return None
+    frac = NON_DIGITS_RE.sub("", str(fraction or ""))[:2].ljust(2, "0")
+    return cents_to_decimal(int(digits) * 100 + int(frac))
+
+
+# COLUMN PARSER
+
+def parse_cents_memoized(values, shipping=False) -> pd.Series:
+    """
+    parse_cents() over a Series / array / list of raw values, memoized: each
+    distinct value goes through the scalar parser once (a Python loop over
+    the uniques, not a vectorized parse), and the results are broadcast back
+    with one take() over the factorize codes. Scraped and imported prices
+    repeat a lot, so that is far fewer calls than rows.
+    Returns nullable Int64 cents (<NA> = no price). With shipping=True the
+    shipping_cents() rules apply (free or unknown -> 0).
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+
+    parse = shipping_cents if shipping else parse_cents
+    missing = 0 if shipping else None
+    # Extra last slot for missing values: factorize code -1 takes it
+    cents = pd.array([parse(v) for v in uniques] + [missing], dtype="Int64")
+    return pd.Series(cents.take(codes), index=series.index)
+
+
+def cents_to_float(cents: pd.Series) -> pd.Series:
+    """Int64 cents -> float64 euros (NaN for missing), e.g. for DataFrame inserts."""
+    return cents.astype("Float64").div(100).astype("float64")
@@ -0,0 +1,829 @@
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+import datetime as dt
+from decimal import Decimal
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# CONFIG
+# One place for the database settings. Environment variables win, so a
+# local run can switch backend/credentials without editing any script:
+#   PRICE_STORE=sqlite PRICE_STORE_PATH=/tmp/prices.sqlite python run_all_etl.py
+DB_CONFIG = {
+    "host": os.environ.get("PRICE_DB_HOST", "localhost"),
+    "user": os.environ.get("PRICE_DB_USER", "etl_user"),
+    "password": os.environ.get("PRICE_DB_PASSWORD", "your_pass"),  # <-- change before use
+    "port": int(os.environ.get("PRICE_DB_PORT", "3306")),
+    "database": os.environ.get("PRICE_DB_NAME", "price_collection"),
+}
+
+STORE_BACKEND = "mysql"     # default backend: "mysql" or "sqlite" (env: PRICE_STORE)
+SQLITE_PATH = os.path.join(BASE_DIR, "..", "data", "prices.sqlite")   # env: PRICE_STORE_PATH
+
+PRICE_TABLE = "PRICE"
+STATS_TABLE = "PRICE_DAILY_STATS"   # one row per product/date, kept up to date by PriceWriter
+OUR_SELLER = "Our company"
+STATS_CHUNK = 500                   # products per incremental refresh statement
+STATS_COLUMNS = "Product, Date, MinPrice, AvgPrice, MaxPrice, OfferCount, OurPrice, OurRank"
+
+# Schema v2 (optional): integer-keyed PRODUCT / SELLER dimensions and a
+# date-keyed fact table (partitioned by month on MySQL). PRICE becomes a
+# view with the v1 columns, so every query keeps working unchanged.
+# Migrate an existing database with etl/migrate_schema_v2.py.
+SCHEMA_VERSION = None               # "v1", "v2" or None = detect (env: PRICE_SCHEMA)
+FACT_TABLE = "PRICE_FACT"
+LEGACY_TABLE = "PRICE_V1"           # the v1 table is kept under this name after migrating
+DIMENSIONS = {"Product": ("PRODUCT", "ProductID"), "Seller": ("SELLER", "SellerID")}
+PARTITION_START = "2025-01-01"      # first monthly partition (MySQL)
+PARTITION_MONTHS_AHEAD = 12         # partitions created ahead of today; extend_partitions() adds more
+
+STAGING_TABLE = "PRICE_STAGING"     # per-connection temporary table for bulk imports (import_csv.py)
+
+PRICE_VIEW_SQL = f"""
+    CREATE VIEW {PRICE_TABLE} AS
+    SELECT d.Name AS Product, f.Date, s.Name AS Seller, f.Price
+    FROM {FACT_TABLE} f
+    JOIN PRODUCT d ON d.ProductID = f.ProductID
+    JOIN SELLER s ON s.SellerID = f.SellerID
+"""
+
+# sqlite3 has no built-in adapters for these on newer Pythons
+sqlite3.register_adapter(dt.date, lambda d: d.isoformat())
+sqlite3.register_adapter(Decimal, float)
+
+
+# PRICE STORE INTERFACE
+
+# Everything the ETLs and the report need from the database. SQL passed to
+# query()/read_df() uses %s placeholders; backends translate if needed.
+# Backends must implement every @abstractmethod, otherwise they fail when
+# instantiated rather than halfway through a load.
+class PriceStore(ABC):
+    name = "store"
+    placeholder = "%s"
+    insert_ignore = "INSERT IGNORE"
+    Error = Exception
+    _schema = None
+
+    @abstractmethod
+    def connect(self):
+        """Opens a new DB-API connection."""
+
+    def create_schema(self, table=PRICE_TABLE):
+        """Creates `table` with the PRICE schema (plus PRICE_DAILY_STATS for PRICE)."""
+        if table == PRICE_TABLE and self.schema == "v2":
+            self._create_v2_schema()
+        else:
+            self._create_v1_table(table)
+        if table == PRICE_TABLE:
+            self._create_stats_table()
+
+    @abstractmethod
+    def _create_v1_table(self, table):
+        """Creates `table` with the v1 PRICE columns."""
+
+    @abstractmethod
+    def _create_stats_table(self):
+        """Creates PRICE_DAILY_STATS."""
+
+    @abstractmethod
+    def object_type(self, name):
+        """Returns "table", "view" or None when `name` does not exist."""
+
+    @abstractmethod
+    def show_create(self, name):
+        """CREATE statement(s) of a table or view, as the database reports them."""
+
+    @property
+    def schema(self):
+        # Detected once: a database with the fact table is on v2
+        if self._schema is None:
+            self._schema = "v2" if self.object_type(FACT_TABLE) else "v1"
+        return self._schema
+
+    @abstractmethod
+    def _create_v2_tables(self):
+        """Creates PRODUCT, SELLER and PRICE_FACT."""
+
+    def _create_v2_schema(self):
+        self._create_v2_tables()
+        kind = self.object_type(PRICE_TABLE)
+        if kind == "table":
+            raise RuntimeError(f"{PRICE_TABLE} is still a v1 table; run etl/migrate_schema_v2.py first")
+        if kind is None:
+            self.execute(PRICE_VIEW_SQL)
+
+    @abstractmethod
+    def _upsert_fact(self, cursor, facts):
+        """Writes (Date, ProductID, SellerID, Price) rows into PRICE_FACT."""
+
+    @abstractmethod
+    def upsert(self, cursor, rows, table=PRICE_TABLE):
+        """Writes (Product, Date, Seller, Price) rows; same key -> price is updated."""
+
+    @abstractmethod
+    def _stats_upsert(self, select_sql):
+        """Wraps a SELECT of STATS_COLUMNS into an upsert into PRICE_DAILY_STATS."""
+
+    def _sql(self, sql):
+        return sql if self.placeholder == "%s" else sql.replace("%s", self.placeholder)
+
+    # -- schema v2 dimensions --
+
+    def _dimension_ids(self, cursor, column, names):
+        """Name -> surrogate key in PRODUCT / SELLER, adding names seen for the first time."""
+        table, key = DIMENSIONS[column]
+        names = sorted(set(names))
+        ids = {}
+
+        def lookup(wanted):
+            for i in range(0, len(wanted), STATS_CHUNK):
+                chunk = wanted[i:i + STATS_CHUNK]
+                cursor.execute(self._sql(
+                    f"SELECT Name, {key} FROM {table} WHERE Name IN ({', '.join(['%s'] * len(chunk))})"
+                ), chunk)
+                ids.update(cursor.fetchall())
+
+        lookup(names)
+        missing = [n for n in names if n not in ids]
+        if missing:
+            cursor.executemany(self._sql(f"{self.insert_ignore} INTO {table} (Name) VALUES (%s)"),
+                               [(n,) for n in missing])
+            lookup(missing)
+        return ids
+
+    def _fact_rows(self, cursor, rows):
+        """(Product, Date, Seller, Price) -> (Date, ProductID, SellerID, Price)."""
+        products = self._dimension_ids(cursor, "Product", [r[0] for r in rows])
+        sellers = self._dimension_ids(cursor, "Seller", [r[2] for r in rows])
+        return [(day, products[product], sellers[seller], price) for product, day, seller, price in rows]
+
+    def migrate_to_v2(self, batch_size=5000):
+        """
+        Copies the v1 PRICE table into PRODUCT / SELLER / PRICE_FACT (one
+        transaction per date), keeps it as PRICE_V1 and puts the PRICE view
+        in its place. Returns the number of rows copied.
+        """
+        if self.object_type(PRICE_TABLE) != "table":
+            raise RuntimeError(f"{PRICE_TABLE} is not a v1 table; nothing to migrate")
+
+        self._create_v2_tables()
+        dates = [str(d)[:10] for (d,) in self.query(f"SELECT DISTINCT Date FROM {PRICE_TABLE} ORDER BY Date")]
+        copied = 0
+        conn = self.connect()
+        try:
+            cur = conn.cursor()
+            for day in dates:
+                cur.execute(self._sql(f"SELECT Product, Date, Seller, Price FROM {PRICE_TABLE} WHERE Date = %s"),
+                            (day,))
+                rows = cur.fetchall()
+                for i in range(0, len(rows), batch_size):
+                    self._upsert_fact(cur, self._fact_rows(cur, rows[i:i + batch_size]))
+                conn.commit()
+                copied += len(rows)
+
+            cur.execute(f"ALTER TABLE {PRICE_TABLE} RENAME TO {LEGACY_TABLE}")
+            cur.execute(PRICE_VIEW_SQL)
+            conn.commit()
+            cur.close()
+        finally:
+            conn.close()
+
+        self._schema = "v2"
+        return copied
+
+    # -- bulk import: staging table + set-based merge --
+
+    def bulk_connect(self):
+        """Connection for load_staging() / merge_staging() (the staging table lives in it)."""
+        return self.connect()
+
+    @abstractmethod
+    def create_staging(self, cursor):
+        """Creates the (empty) staging table on the cursor's connection."""
+
+    def load_staging(self, cursor, rows):
+        """Appends (Product, Date, Seller, Price) rows to the staging table."""
+        cursor.executemany(self._sql(
+            f"INSERT INTO {STAGING_TABLE} (Product, Date, Seller, Price) VALUES (%s, %s, %s, %s)"
+        ), rows)
+
+    @abstractmethod
+    def _merge_into(self, table, columns, key, select_sql, keep_existing):
+        """INSERT ... SELECT that updates (or with keep_existing, keeps) rows with the same `key`."""
+
+    def merge_staging(self, cursor, keep_existing=False):
+        """
+        Moves the staged rows into PRICE (PRODUCT / SELLER / PRICE_FACT on v2)
+        with one set-based statement per table, then empties the staging table.
+        Same key -> the staged price wins, unless keep_existing is set.
+        """
+        if self.schema == "v2":
+            # New names first, as an anti-join so no surrogate keys are wasted
+            for column, (table, key) in DIMENSIONS.items():
+                cursor.execute(f"""
+                    INSERT INTO {table} (Name)
+                    SELECT DISTINCT s.{column}
+                    FROM {STAGING_TABLE} s
+                    LEFT JOIN {table} d ON d.Name = s.{column}
+                    WHERE d.{key} IS NULL
+                """)
+            cursor.execute(self._merge_into(FACT_TABLE, "Date, ProductID, SellerID, Price", "Date, ProductID, SellerID", f"""
+                SELECT s.Date, p.ProductID, se.SellerID, s.Price
+                FROM {STAGING_TABLE} s
+                JOIN PRODUCT p ON p.Name = s.Product
+                JOIN SELLER se ON se.Name = s.Seller
+            """, keep_existing))
+        else:
+            cursor.execute(self._merge_into(PRICE_TABLE, "Product, Date, Seller, Price", "Product, Date, Seller", f"""
+                SELECT Product, Date, Seller, Price FROM {STAGING_TABLE}
+            """, keep_existing))
+        cursor.execute(f"DELETE FROM {STAGING_TABLE}")
+
+    def execute(self, sql, params=()):
+        conn = self.connect()
+        try:
+            cur = conn.cursor()
+            cur.execute(self._sql(sql), params)
+            conn.commit()
+            cur.close()
+        finally:
+            conn.close()
+
+    def query(self, sql, params=()):
+        conn = self.connect()
+        try:
+            cur = conn.cursor()
+            cur.execute(self._sql(sql), params)
+            rows = cur.fetchall()
+            cur.close()
+            return rows
+        finally:
+            conn.close()
+
+    def read_df(self, sql, params=()):
+        import pandas as pd     # only commands that read DataFrames pay for the import
+        conn = self.connect()
+        try:
+            return pd.read_sql(self._sql(sql), conn, params=params or None)
+        finally:
+            conn.close()
+
+    def writer(self, **kwargs):
+        from price_writer import PriceWriter
+        return PriceWriter(self, **kwargs)
+
+    # -- queries shared by run_all_etl and visualization_email --
+
+    def seller_counts(self, date_iso):
+        return self.query(f"""
+            SELECT Seller, COUNT(*) AS cnt
+            FROM {PRICE_TABLE}
+            WHERE Date = %s
+            GROUP BY Seller
+            ORDER BY Seller
+        """, (date_iso,))
+
+    def collected_keys(self, date_iso):
+        """(Product, Seller) pairs already stored for a date, in one query (resume mode)."""
+        return set(self.query(f"""
+            SELECT Product, Seller
+            FROM {PRICE_TABLE}
+            WHERE Date = %s
+        """, (str(date_iso)[:10],)))
+
+    def load_recent_prices(self, since, seller_prefixes=None):
+        """
+        Product, Seller, Date, Price from `since` on, optionally only for
+        sellers starting with one of `seller_prefixes` (LIKE, so "_" in a
+        prefix matches any character; callers filter exactly if it matters).
+        """
+        params = [str(since)[:10]]
+        where = "Date >= %s"
+        if seller_prefixes:
+            where += f" AND ({' OR '.join(['Seller LIKE %s'] * len(seller_prefixes))})"
+            params += [f"{prefix}%" for prefix in seller_prefixes]
+        df = self.read_df(f"""
+            SELECT Product, Seller, Date, Price
+            FROM {PRICE_TABLE}
+            WHERE {where}
+        """, tuple(params))
+        import pandas as pd
+        df["Date"] = pd.to_datetime(df["Date"])
+        df["Price"] = df["Price"].astype(float)
+        return df
+
+    def load_prices(self):
+        return self.read_df(f"""
+            SELECT Product, Date, Seller, Price
+            FROM {PRICE_TABLE}
+            ORDER BY Product, Date
+        """)
+
+    def load_prices_after(self, last_id, limit):
+        """
+        Up to `limit` PRICE rows after `last_id`, in ID order (price_archive.py
+        export). The ID column is the watermark to pass back: the row ID on
+        v1; on v2, which has no row ID, the fact key (Date, ProductID,
+        SellerID) - `last_id` (date, 0, 0) starts at the first row of a date.
+        """
+        if self.schema == "v2":
+            return self._load_facts_after(last_id or ("0000-01-01", 0, 0), limit)
+        df = self.read_df(f"""
+            SELECT ID, Product, Date, Seller, Price
+            FROM {PRICE_TABLE}
+            WHERE ID > %s
+            ORDER BY ID
+            LIMIT %s
+        """, (int(last_id), int(limit)))
+        df["Price"] = df["Price"].astype(float)
+        return df
+
+    def _load_facts_after(self, last_key, limit):
+        # Keyset paging along the fact table's primary key; Date >= %s
+        # lets the planner use it as a range scan
+        date, product_id, seller_id = last_key
+        date = str(date)[:10]
+        df = self.read_df(f"""
+            SELECT f.Date, f.ProductID, f.SellerID, d.Name AS Product, s.Name AS Seller, f.Price
+            FROM {FACT_TABLE} f
+            JOIN PRODUCT d ON d.ProductID = f.ProductID
+            JOIN SELLER s ON s.SellerID = f.SellerID
+            WHERE f.Date >= %s
+              AND (f.Date > %s OR f.ProductID > %s OR (f.ProductID = %s AND f.SellerID > %s))
+            ORDER BY f.Date, f.ProductID, f.SellerID
+            LIMIT %s
+        """, (date, date, int(product_id), int(product_id), int(seller_id), int(limit)))
+        df["ID"] = list(zip(df["Date"].astype(str).str[:10], df["ProductID"].astype(int), df["SellerID"].astype(int)))
+        df["Price"] = df["Price"].astype(float)
+        return df[["ID", "Product", "Date", "Seller", "Price"]]
+
+    # -- daily statistics (PRICE_DAILY_STATS) --
+
+    # Our rank = 1 + number of offers strictly cheaper than ours, i.e. ties
+    # share the better rank (same as pandas rank(method="min")).
+    # Parameters: our seller, the date (first and last date with
+    # date_range=True), then `n_products` product names (all products of
+    # the date when 0).
+    def _stats_select(self, n_products=0, date_range=False):
+        products = f" IN ({', '.join(['%s'] * n_products)})" if n_products else ""
+        dates = "BETWEEN %s AND %s" if date_range else "= %s"
+        if self.schema == "v2":
+            # Integer keys on the fact table instead of the view's names
+            return f"""
+                SELECT d.Name, f.Date, MIN(f.Price), AVG(f.Price), MAX(f.Price), COUNT(*),
+                       o.Price,
+                       CASE WHEN o.Price IS NULL THEN NULL ELSE 1 + SUM(f.Price < o.Price) END
+                FROM {FACT_TABLE} f
+                JOIN PRODUCT d ON d.ProductID = f.ProductID
+                LEFT JOIN {FACT_TABLE} o
+                       ON o.Date = f.Date AND o.ProductID = f.ProductID
+                      AND o.SellerID = (SELECT SellerID FROM SELLER WHERE Name = %s)
+                WHERE f.Date {dates} {"AND d.Name" + products if products else ""}
+                GROUP BY f.ProductID, d.Name, f.Date, o.Price
+            """
+        return f"""
+            SELECT p.Product, p.Date, MIN(p.Price), AVG(p.Price), MAX(p.Price), COUNT(*),
+                   o.Price,
+                   CASE WHEN o.Price IS NULL THEN NULL ELSE 1 + SUM(p.Price < o.Price) END
+            FROM {PRICE_TABLE} p
+            LEFT JOIN {PRICE_TABLE} o
+                   ON o.Product = p.Product AND o.Date = p.Date AND o.Seller = %s
+            WHERE p.Date {dates} {"AND p.Product" + products if products else ""}
+            GROUP BY p.Product, p.Date, o.Price
+        """
+
+    def refresh_daily_stats(self, cursor, keys):
+        """Recomputes PRICE_DAILY_STATS for the given (Product, Date) keys only."""
+        by_date = {}
+        for product, day in keys:
+            by_date.setdefault(str(day)[:10], set()).add(product)
+
+        for day, products in sorted(by_date.items()):
+            products = sorted(products)
+            for i in range(0, len(products), STATS_CHUNK):
+                chunk = products[i:i + STATS_CHUNK]
+                cursor.execute(self._sql(self._stats_upsert(self._stats_select(len(chunk)))),
+                               [OUR_SELLER, day, *chunk])
+
+    def backfill_daily_stats(self, dates=None):
+        """
+        Rebuilds PRICE_DAILY_STATS from the whole PRICE history, one date at
+        a time. With `dates` (e.g. after a bulk import) the range from the
+        first to the last of them is rebuilt in one statement instead:
+        without a Date index on v1, that is one table scan instead of one per date.
+        """
+        if dates is not None:
+            dates = sorted({str(d)[:10] for d in dates})
+            if dates:
+                self.execute(self._stats_upsert(self._stats_select(date_range=True)),
+                             [OUR_SELLER, dates[0], dates[-1]])
+            return len(dates)
+
+        dates = [str(d)[:10] for (d,) in self.query(f"SELECT DISTINCT Date FROM {PRICE_TABLE} ORDER BY Date")]
+        conn = self.connect()
+        try:
+            cur = conn.cursor()
+            for day in dates:
+                cur.execute(self._sql(self._stats_upsert(self._stats_select())), [OUR_SELLER, day])
+                conn.commit()
+            cur.close()
+        finally:
+            conn.close()
+        return len(dates)
+
+    def load_daily_stats(self, products=None):
+        """
+        PRICE_DAILY_STATS with the column names of
+        price_metrics.product_date_metrics(); only `products` when given.
+        """
+        where = ""
+        if products is not None:
+            products = list(products)
+            where = f"WHERE Product IN ({', '.join(['%s'] * len(products))})" if products else "WHERE 1 = 0"
+        df = self.read_df(f"""
+            SELECT Product, Date,
+                   MinPrice AS min_price, AvgPrice AS avg_price, MaxPrice AS max_price,
+                   OfferCount AS seller_count, OurPrice AS our_price, OurRank AS our_rank
+            FROM {STATS_TABLE}
+            {where}
+            ORDER BY Product, Date
+        """, tuple(products or ()))
+        numeric = ["min_price", "avg_price", "max_price", "our_price", "our_rank"]
+        df[numeric] = df[numeric].astype(float)     # MySQL returns Decimal objects
+        return df
+
+    def latest_stats_date(self, on_or_before=None):
+        """Most recent date in PRICE_DAILY_STATS (not after `on_or_before`), or None."""
+        if on_or_before is None:
+            rows = self.query(f"SELECT MAX(Date) FROM {STATS_TABLE}")
+        else:
+            rows = self.query(f"SELECT MAX(Date) FROM {STATS_TABLE} WHERE Date <= %s",
+                              (str(on_or_before)[:10],))
+        return str(rows[0][0])[:10] if rows and rows[0][0] is not None else None
+
+    def load_ranks(self, dates):
+        """Product, Date, our_rank for the given dates only (products we sell)."""
+        dates = [str(d)[:10] for d in dates]
+        df = self.read_df(f"""
+            SELECT Product, Date, OurRank AS our_rank
+            FROM {STATS_TABLE}
+            WHERE Date IN ({', '.join(['%s'] * len(dates))}) AND OurRank IS NOT NULL
+        """, tuple(dates))
+        import pandas as pd
+        df["Date"] = pd.to_datetime(df["Date"])
+        df["our_rank"] = df["our_rank"].astype(float)
+        return df
+
+
+# MYSQL BACKEND
+
+def month_partitions(start=PARTITION_START, months_ahead=PARTITION_MONTHS_AHEAD):
+    """PARTITION BY RANGE clause with one partition per month (plus pmax)."""
+    return "PARTITION BY RANGE (TO_DAYS(Date)) (\n" + ",\n".join(
+        _month_partition_defs(dt.date.fromisoformat(start), months_ahead) + [_PMAX]
+    ) + "\n)"
+
+
+_PMAX = "PARTITION pmax VALUES LESS THAN MAXVALUE"
+
+
+def _month_partition_defs(first, months_ahead):
+    today = dt.date.today()
+    last = today.year * 12 + today.month - 1 + months_ahead
+    month = first.replace(day=1)
+    parts = []
+    while month.year * 12 + month.month - 1 <= last:
+        upper = dt.date(month.year + month.month // 12, month.month % 12 + 1, 1)
+        parts.append(f"PARTITION p{month:%Y%m} VALUES LESS THAN (TO_DAYS('{upper}'))")
+        month = upper
+    return parts
+
+
+class MySQLPriceStore(PriceStore):
+    _local_infile = True    # set to False once the server refuses LOAD DATA LOCAL
+
+    def __init__(self, config=None, schema=None):
+        self.config = dict(config or DB_CONFIG)
+        self.name = f"mysql:{self.config.get('database')}"
+        self._schema = schema or os.environ.get("PRICE_SCHEMA", SCHEMA_VERSION)
+
+    @property
+    def Error(self):
+        import mysql.connector
+        return mysql.connector.Error
+
+    def connect(self):
+        import mysql.connector
+        return mysql.connector.connect(**self.config)
+
+    def object_type(self, name):
+        rows = self.query("""
+            SELECT TABLE_TYPE FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """, (name,))
+        if not rows:
+            return None
+        return "view" if rows[0][0] == "VIEW" else "table"
+
+    def show_create(self, name):
+        return self.query(f"SHOW CREATE TABLE {name}")[0][1]
+
+    def _create_v2_tables(self):
+        # Names compare byte-wise, like the Python strings they come from
+        for table, key in DIMENSIONS.values():
+            self.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    {key} INT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+                    Name VARCHAR(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL,
+                    UNIQUE KEY uq_{table.lower()}_name (Name)
+                )
+            """)
+        # PRIMARY KEY (Date, ...): one day's rows are contiguous - stats
+        #   refresh, backfill and the writer's upsert key
+        # idx_product_date: covers a product's price history (report)
+        # idx_date_seller: covers offers per seller on a date (db_summary)
+        # A partitioned table cannot have foreign keys; the writer resolves
+        # the surrogate keys itself.
+        self.execute(f"""
+            CREATE TABLE IF NOT EXISTS {FACT_TABLE} (
+                Date DATE NOT NULL,
+                ProductID INT UNSIGNED NOT NULL,
+                SellerID INT UNSIGNED NOT NULL,
+                Price DECIMAL(10,2) NOT NULL,
+                PRIMARY KEY (Date, ProductID, SellerID),
+                KEY idx_product_date (ProductID, Date, SellerID, Price),
+                KEY idx_date_seller (Date, SellerID)
+            )
+            {month_partitions()}
+        """)
+
+    def extend_partitions(self, months_ahead=PARTITION_MONTHS_AHEAD):
+        """Splits pmax so there is a monthly partition up to `months_ahead` from today."""
+        names = [n for (n,) in self.query("""
+            SELECT PARTITION_NAME FROM information_schema.PARTITIONS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME <> 'pmax'
+            ORDER BY PARTITION_ORDINAL_POSITION
+        """, (FACT_TABLE,))]
+        last = dt.datetime.strptime(names[-1][1:], "%Y%m").date()
+        first = dt.date(last.year + last.month // 12, last.month % 12 + 1, 1)
+        parts = _month_partition_defs(first, months_ahead)
+        if parts:
+            self.execute(f"ALTER TABLE {FACT_TABLE} REORGANIZE PARTITION pmax INTO ({', '.join(parts + [_PMAX])})")
+        return len(parts)
+
+    def _create_v1_table(self, table):
+        self.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                ID BIGINT AUTO_INCREMENT PRIMARY KEY,
+                Product VARCHAR(255) NOT NULL,
+                Date DATE NOT NULL,
+                Seller VARCHAR(255) NOT NULL,
+                Price DECIMAL(10,2) NOT NULL,
+                UNIQUE KEY uq_product_date_seller (Product, Date, Seller)
+            )
+        """)
+
+    def _create_stats_table(self):
+        self.execute(f"""
+            CREATE TABLE IF NOT EXISTS {STATS_TABLE} (
+                Product VARCHAR(255) NOT NULL,
+                Date DATE NOT NULL,
+                MinPrice DECIMAL(10,2) NOT NULL,
+                AvgPrice DECIMAL(12,4) NOT NULL,
+                MaxPrice DECIMAL(10,2) NOT NULL,
+                OfferCount INT NOT NULL,
+                OurPrice DECIMAL(10,2) NULL,
+                OurRank INT NULL,
+                PRIMARY KEY (Product, Date),
+                KEY idx_stats_date (Date)
+            )
+        """)
+
+    def _stats_upsert(self, select_sql):
+        return (
+            f"INSERT INTO {STATS_TABLE} ({STATS_COLUMNS}) {select_sql} "
+            f"ON DUPLICATE KEY UPDATE MinPrice = VALUES(MinPrice), AvgPrice = VALUES(AvgPrice), "
+            f"MaxPrice = VALUES(MaxPrice), OfferCount = VALUES(OfferCount), "
+            f"OurPrice = VALUES(OurPrice), OurRank = VALUES(OurRank)"
+        )
+
+    def bulk_connect(self):
+        import mysql.connector
+        return mysql.connector.connect(**self.config, allow_local_infile=True)
+
+    def create_staging(self, cursor):
+        # Same collation as the dimension names, so the v2 merge joins on the index
+        cursor.execute(f"""
+            CREATE TEMPORARY TABLE IF NOT EXISTS {STAGING_TABLE} (
+                Product VARCHAR(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL,
+                Date DATE NOT NULL,
+                Seller VARCHAR(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL,
+                Price DECIMAL(10,2) NOT NULL
+            )
+        """)
+
+    def load_staging(self, cursor, rows):
+        """
+        Streams the rows through LOAD DATA LOCAL INFILE (one tab-separated
+        temp file per call). Falls back to multi-row INSERTs when the server
+        or client has local_infile disabled.
+        """
+        if self._local_infile:
+            import tempfile
+            fd, path = tempfile.mkstemp(prefix="price_import_", suffix=".tsv")
+            infile = path.replace(os.sep, "/")
+            try:
+                # Names are whitespace-normalised, so they hold no tab/newline
+                with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as f:
+                    for product, day, seller, price in rows:
+                        f.write(f"{product}\t{day}\t{seller}\t{price}\n")
+                cursor.execute(
+                    f"LOAD DATA LOCAL INFILE '{infile}' INTO TABLE {STAGING_TABLE} "
+                    f"CHARACTER SET utf8mb4 FIELDS TERMINATED BY '\\t' ESCAPED BY '' "
+                    f"LINES TERMINATED BY '\\n' (Product, Date, Seller, Price)"
+                )
+                return
+            except self.Error as e:
+                print(f"[WARN] LOAD DATA LOCAL INFILE not available ({e}); using multi-row INSERTs")
+                self._local_infile = False
+            finally:
+                os.remove(path)
+
+        for i in range(0, len(rows), 5000):
+            batch = rows[i:i + 5000]
+            values = ", ".join(["(%s, %s, %s, %s)"] * len(batch))
+            cursor.execute(f"INSERT INTO {STAGING_TABLE} (Product, Date, Seller, Price) VALUES {values}",
+                           [v for row in batch for v in row])
+
+    def _merge_into(self, table, columns, key, select_sql, keep_existing):
+        if keep_existing:
+            return f"INSERT IGNORE INTO {table} ({columns}) {select_sql}"
+        return f"INSERT INTO {table} ({columns}) {select_sql} ON DUPLICATE KEY UPDATE {table}.Price = VALUES(Price)"
+
+    def _upsert_fact(self, cursor, facts):
+        values = ", ".join(["(%s, %s, %s, %s)"] * len(facts))
+        cursor.execute(
+            f"INSERT INTO {FACT_TABLE} (Date, ProductID, SellerID, Price) VALUES {values} "
+            f"ON DUPLICATE KEY UPDATE Price = VALUES(Price)",
+            [v for row in facts for v in row],
+        )
+
+    def upsert(self, cursor, rows, table=PRICE_TABLE):
+        if table == PRICE_TABLE and self.schema == "v2":
+            return self._upsert_fact(cursor, self._fact_rows(cursor, rows))
+
+        # One multi-row statement per batch: a single round trip to the server
+        values = ", ".join(["(%s, %s, %s, %s)"] * len(rows))
+        cursor.execute(
+            f"INSERT INTO {table} (Product, Date, Seller, Price) VALUES {values} "
+            f"ON DUPLICATE KEY UPDATE Price = VALUES(Price)",
+            [v for row in rows for v in row],
+        )
+
+
+# EMBEDDED SQLITE BACKEND
+
+# Same PRICE schema and upsert semantics in a single file, so the whole
+# pipeline (and the benchmarks) can run on one box without a MySQL server.
+class SQLitePriceStore(PriceStore):
+    placeholder = "?"
+    insert_ignore = "INSERT OR IGNORE"
+    Error = sqlite3.Error
+
+    def __init__(self, path=None, schema=None):
+        self.path = path or os.environ.get("PRICE_STORE_PATH", SQLITE_PATH)
+        self.name = f"sqlite:{self.path}"
+        self._schema = schema or os.environ.get("PRICE_SCHEMA", SCHEMA_VERSION)
+
+    def connect(self):
+        folder = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(folder, exist_ok=True)
+        # Scrapers write from worker threads; PriceWriter serialises access.
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def object_type(self, name):
+        rows = self.query("SELECT type FROM sqlite_master WHERE type IN ('table', 'view') AND name = %s",
+                          (name,))
+        return rows[0][0] if rows else None
+
+    def show_create(self, name):
+        # The table/view first, then its indexes
+        rows = self.query("""
+            SELECT sql FROM sqlite_master
+            WHERE tbl_name = %s AND sql IS NOT NULL
+            ORDER BY type = 'index', name
+        """, (name,))
+        return ";\n".join(sql for (sql,) in rows)
+
+    def _create_v2_tables(self):
+        # No partitioning in SQLite; WITHOUT ROWID keeps the fact rows
+        # clustered on (Date, ProductID, SellerID) like InnoDB does.
+        for table, key in DIMENSIONS.values():
+            self.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    {key} INTEGER PRIMARY KEY,
+                    Name VARCHAR(255) NOT NULL UNIQUE
+                )
+            """)
+        self.execute(f"""
+            CREATE TABLE IF NOT EXISTS {FACT_TABLE} (
+                Date DATE NOT NULL,
+                ProductID INTEGER NOT NULL,
+                SellerID INTEGER NOT NULL,
+                Price DECIMAL(10,2) NOT NULL,
+                PRIMARY KEY (Date, ProductID, SellerID)
+            ) WITHOUT ROWID
+        """)
+        self.execute(f"CREATE INDEX IF NOT EXISTS idx_product_date ON {FACT_TABLE} (ProductID, Date, SellerID, Price)")
+        self.execute(f"CREATE INDEX IF NOT EXISTS idx_date_seller ON {FACT_TABLE} (Date, SellerID)")
+
+    def _create_v1_table(self, table):
+        self.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                ID INTEGER PRIMARY KEY AUTOINCREMENT,
+                Product VARCHAR(255) NOT NULL,
+                Date DATE NOT NULL,
+                Seller VARCHAR(255) NOT NULL,
+                Price DECIMAL(10,2) NOT NULL,
+                UNIQUE (Product, Date, Seller)
+            )
+        """)
+
+    def _create_stats_table(self):
+        self.execute(f"""
+            CREATE TABLE IF NOT EXISTS {STATS_TABLE} (
+                Product VARCHAR(255) NOT NULL,
+                Date DATE NOT NULL,
+                MinPrice DECIMAL(10,2) NOT NULL,
+                AvgPrice DECIMAL(12,4) NOT NULL,
+                MaxPrice DECIMAL(10,2) NOT NULL,
+                OfferCount INT NOT NULL,
+                OurPrice DECIMAL(10,2) NULL,
+                OurRank INT NULL,
+                PRIMARY KEY (Product, Date)
+            )
+        """)
+        self.execute(f"CREATE INDEX IF NOT EXISTS idx_stats_date ON {STATS_TABLE} (Date)")
+
+    def _stats_upsert(self, select_sql):
+        return (
+            f"INSERT INTO {STATS_TABLE} ({STATS_COLUMNS}) {select_sql} "
+            f"ON CONFLICT (Product, Date) DO UPDATE SET MinPrice = excluded.MinPrice, "
+            f"AvgPrice = excluded.AvgPrice, MaxPrice = excluded.MaxPrice, "
+            f"OfferCount = excluded.OfferCount, OurPrice = excluded.OurPrice, OurRank = excluded.OurRank"
+        )
+
+    def create_staging(self, cursor):
+        cursor.execute(f"""
+            CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} (
+                Product VARCHAR(255) NOT NULL,
+                Date DATE NOT NULL,
+                Seller VARCHAR(255) NOT NULL,
+                Price DECIMAL(10,2) NOT NULL
+            )
+        """)
+
+    def _merge_into(self, table, columns, key, select_sql, keep_existing):
+        if keep_existing:
+            return f"INSERT OR IGNORE INTO {table} ({columns}) {select_sql}"
+        # "WHERE true" keeps the parser from reading ON CONFLICT as a join constraint
+        return (f"INSERT INTO {table} ({columns}) {select_sql} WHERE true "
+                f"ON CONFLICT ({key}) DO UPDATE SET Price = excluded.Price")
+
+    def _upsert_fact(self, cursor, facts):
+        cursor.executemany(
+            f"INSERT INTO {FACT_TABLE} (Date, ProductID, SellerID, Price) VALUES (?, ?, ?, ?) "
+            f"ON CONFLICT (Date, ProductID, SellerID) DO UPDATE SET Price = excluded.Price",
+            facts,
+        )
+
+    def upsert(self, cursor, rows, table=PRICE_TABLE):
+        if table == PRICE_TABLE and self.schema == "v2":
+            return self._upsert_fact(cursor, self._fact_rows(cursor, rows))
+
+        # No network round trips, so executemany inside one transaction is
+        # as fast as a multi-row VALUES list and has no variable limit.
+        cursor.executemany(
+            f"INSERT INTO {table} (Product, Date, Seller, Price) VALUES (?, ?, ?, ?) "
+            f"ON CONFLICT (Product, Date, Seller) DO UPDATE SET Price = excluded.Price",
+            rows,
+        )
+
+
+# FACTORY
+
+def get_store(backend=None, **kwargs) -> PriceStore:
+    """Returns the configured store ("mysql" or "sqlite")."""
+    backend = (backend or os.environ.get("PRICE_STORE", STORE_BACKEND)).lower()
+    if backend == "mysql":
+        return MySQLPriceStore(**kwargs)
+    if backend == "sqlite":
+        store = SQLitePriceStore(**kwargs)
+        store.create_schema()   # embedded file is created on first use
+        return store
+    raise ValueError(f"Unknown PRICE_STORE backend: {backend}")
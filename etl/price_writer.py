@@ -0,0 +1,173 @@
+import os
+import time
+import threading
+import run_metrics
+
+# CONFIG
+PRICE_TABLE = "PRICE"
+BATCH_SIZE = 500                # flush when this many rows are buffered
+FLUSH_INTERVAL_SECONDS = 5.0    # ... or when the oldest buffered row is this old (checked by a
+                                # timer, so rows do not wait for the next add() of a slow scrape)
+
+
+# BUFFERED BULK UPSERT WRITER
+
+# Collects (Product, Date, Seller, Price) rows and writes them as one
+# upsert batch (multi-row INSERT ... ON DUPLICATE KEY UPDATE on MySQL), over
+# a single connection that stays open for the whole run. In the same
+# transaction, PRICE_DAILY_STATS is refreshed for the touched product/dates.
+# With archive=True (default: PRICE_ARCHIVE=1) the PRICE rows are also
+# appended to the Parquet archive on close (see price_archive.py).
+#
+# Usage:
+#     with get_store().writer() as writer:
+#         writer.add(product, today, "Amazon", price)
+class PriceWriter:
+    def __init__(self, store, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL_SECONDS,
+                 table=PRICE_TABLE, label="DB", archive=None, source=""):
+        self.store = store          # PriceStore: connect() + upsert()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.table = table
+        self.label = label
+        self.source = source        # metrics label, e.g. "amazon" (see run_metrics.py)
+        self.maintain_stats = table == PRICE_TABLE
+        if archive is None:
+            archive = os.environ.get("PRICE_ARCHIVE", "0") == "1"
+        self.archive = archive and table == PRICE_TABLE
+        self._archived = []         # rows written, appended to the archive once on close
+
+        self._conn = None
+        self._buffer = {}           # (Product, Date, Seller) -> Price, last write wins
+        self._buffer_since = None
+        self._timer = None              # flushes the buffer once it is flush_interval old
+        self._lock = threading.Lock()   # scrapers may add from worker threads
+
+        self.rows_written = 0
+        self.batches = 0
+        self.write_seconds = 0.0
+
+    # -- buffering --
+
+    def add(self, product, date, seller, price):
+        with self._lock:
+            if not self._buffer:
+                self._buffer_since = time.monotonic()
+                self._start_timer()
+            self._buffer[(product, date, seller)] = price
+
+            if (len(self._buffer) >= self.batch_size
+                    or time.monotonic() - self._buffer_since >= self.flush_interval):
+                self._flush_locked()
+
+    def add_many(self, rows):
+        """rows: iterable of (Product, Date, Seller, Price) tuples."""
+        for product, date, seller, price in rows:
+            self.add(product, date, seller, price)
+
+    def _start_timer(self):
+        self._timer = threading.Timer(self.flush_interval, self._flush_due)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _stop_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _flush_due(self):
+        # Runs in the Timer thread; an error is left for the next add() / close() to raise
+        with self._lock:
+            if self._timer is not threading.current_thread():
+                return      # the buffer was flushed (and maybe refilled) meanwhile
+            self._timer = None
+            try:
+                self._flush_locked()
+            except Exception as e:
+                print(f"[WARN] {self.label}: timed flush failed, retrying with the next batch: {e}")
+
+    # -- writing --
+
+    def _flush_locked(self):
+        self._stop_timer()
+        if not self._buffer:
+            return
+
+        rows = [(p, d, s, price) for (p, d, s), price in self._buffer.items()]
+
+        started = time.perf_counter()
+        if self._conn is None:
+            self._conn = self.store.connect()
+        cur = self._conn.cursor()
+        try:
+            self.store.upsert(cur, rows, self.table)
+            if self.maintain_stats:
+                self.store.refresh_daily_stats(cur, {(p, d) for p, d, _, _ in rows})
+            self._conn.commit()
+        except Exception:
+            self._conn.rollback()   # the rows stay buffered for the next flush
+            raise
+        finally:
+            cur.close()
+        seconds = time.perf_counter() - started
+        self.write_seconds += seconds
+        run_metrics.observe("db_write", seconds, self.source)
+        run_metrics.count("rows_written", len(rows), self.source)
+
+        self.rows_written += len(rows)
+        self.batches += 1
+        if self.archive:
+            self._archived += rows
+        self._buffer.clear()
+        self._buffer_since = None
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        with self._lock:
+            try:
+                self._flush_locked()
+            finally:
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+            self._append_archive()
+
+    def _append_archive(self):
+        # One file per partition and run instead of one per batch; the rows
+        # are already in PRICE, so a failure here only costs the archive copy
+        # (price_archive.py export picks new rows up again)
+        if not self._archived:
+            return
+        try:
+            import price_archive
+            price_archive.append_rows(self._archived)
+            print(f"[ARCHIVE] Appended {len(self._archived)} rows to {price_archive.archive_dir()}")
+        except Exception as e:
+            print(f"[WARN] Archive append failed: {e}")
+        self._archived = []
+
+    def report(self):
+        rate = self.rows_written / self.write_seconds if self.write_seconds > 0 else 0.0
+        print(f"[{self.label}] Upserted {self.rows_written} rows into {self.store.name}.{self.table} "
+              f"in {self.batches} batch(es) ({rate:.0f} rows/sec)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+            self.report()
+            return
+
+        # Keep what was collected before the error, but never let a failing
+        # write replace the exception that is already propagating
+        try:
+            self.close()
+        except Exception as e:
+            print(f"[WARN] {self.label}: could not write the buffered rows: {e}")
+        else:
+            self.report()
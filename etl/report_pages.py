@@ -0,0 +1,168 @@
+import os
+import time
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import matplotlib
+matplotlib.use("Agg")   # non-interactive backend, safe in worker processes
+import matplotlib.pyplot as plt  # noqa: E402
+from pypdf import PdfWriter  # noqa: E402
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# CONFIG
+# Every product page is rendered once into its own small PDF, keyed by a
+# hash of the product's data, and reused until that data changes.
+PAGE_CACHE_DIR = os.path.join(BASE_DIR, "..", "data", "report_cache")   # env: PRICE_REPORT_CACHE_DIR
+REPORT_WORKERS = None       # processes for rendering (None = one per CPU); env: PRICE_REPORT_WORKERS
+PAGE_LAYOUT_VERSION = "1"   # bump when the page layout changes, so all pages are redrawn
+
+PLOT_COLUMNS = ["Date", "min_price", "avg_price", "our_price", "our_rank"]
+
+
+# ONE PRODUCT PAGE
+
+def draw_product_page(product, temp, path):
+    """
+    Draws the 3 plots of one product into a one-page PDF at `path`:
+    - PLOT 1: Minimal price vs Our price over time
+    - PLOT 2: Average price vs Our price over time
+    - PLOT 3: Rank of our price over time
+    Returns the render time in seconds.
+    """
+    started = time.perf_counter()
+
+    # Data for current product
+    temp = temp.sort_values("Date").copy()
+
+    # Convert dates to string for plotting
+    temp["Date_str"] = temp["Date"].dt.strftime("%Y-%m-%d")
+
+    # Create figure with 3 subplots
+    fig, axes = plt.subplots(3, 1, figsize=(12, 14))
+    fig.suptitle(product, fontsize=18, fontweight="bold")
+
+    # PLOT 1: MIN PRICE vs OUR PRICE
+    ymin1 = 0
+    ymax1 = max(
+        temp["min_price"].max(),
+        temp["our_price"].max()
+    ) * 1.1
+
+    axes[0].plot(temp["Date_str"], temp["min_price"],
+                 marker="o", lw=2.3, label="Min Price", color="blue")
+    axes[0].plot(temp["Date_str"], temp["our_price"],
+                 marker="o", lw=2.3, label="Our Price", color="red")
+    axes[0].set_ylim(ymin1, ymax1)
+    axes[0].set_xlabel("Date")
+    axes[0].set_ylabel("Price (€)")
+    axes[0].set_title("Minimal Price vs Our Price Over Time")
+    axes[0].grid(True, alpha=0.35)
+    axes[0].legend()
+
+    # PLOT 2: AVG PRICE vs OUR PRICE
+    ymin2 = 0
+    ymax2 = max(
+        temp["avg_price"].max(),
+        temp["our_price"].max()
+    ) * 1.1
+
+    axes[1].plot(temp["Date_str"], temp["avg_price"],
+                 marker="o", lw=2.3, label="Average Price", color="green")
+    axes[1].plot(temp["Date_str"], temp["our_price"],
+                 marker="o", lw=2.3, label="Our Price", color="red")
+    axes[1].set_ylim(ymin2, ymax2)
+    axes[1].set_xlabel("Date")
+    axes[1].set_ylabel("Price (€)")
+    axes[1].set_title("Average Price vs Our Price Over Time")
+    axes[1].grid(True, alpha=0.35)
+    axes[1].legend()
+
+    # PLOT 3: RANK TREND
+    axes[2].plot(temp["Date_str"], temp["our_rank"],
+                 marker="o", lw=2.5, color="purple")
+    axes[2].invert_yaxis()  # Rank 1 (best) at top
+    axes[2].set_xlabel("Date")
+    axes[2].set_ylabel("Rank")
+    axes[2].set_title("Rank of Our Price Over Time (Lower is Better)")
+    axes[2].grid(alpha=0.35)
+
+    # Rotate x-axis labels
+    for ax in axes:
+        ax.tick_params(axis="x", rotation=45)
+
+    # Adjust layout and save page (temp file first, so a crash never leaves
+    # a half-written page in the cache)
+    plt.tight_layout(rect=[0, 0, 1, 0.96])
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    fig.savefig(tmp, format="pdf", bbox_inches="tight", pad_inches=0.4)
+    plt.close(fig)
+    os.replace(tmp, path)
+
+    return time.perf_counter() - started
+
+
+def page_key(product, temp):
+    """Hash of everything drawn on the page; a new date or price gives a new key."""
+    h = hashlib.sha256()
+    h.update(f"{PAGE_LAYOUT_VERSION}\0{product}\0".encode("utf-8"))
+    data = temp[PLOT_COLUMNS].sort_values("Date").reset_index(drop=True)
+    h.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+# WHOLE REPORT
+
+def render_report(metrics, filename, workers=None, cache_dir=None, prune=True):
+    """
+    Writes one page per product of `metrics` (product x date table) to
+    `filename`. Cached pages are reused, the others are rendered in a
+    process pool, then all pages are merged in product order.
+    With prune=False, cached pages of products not in `metrics` are kept
+    (reports of a few products must not empty the cache of the full one).
+    """
+    cache_dir = cache_dir or os.environ.get("PRICE_REPORT_CACHE_DIR", PAGE_CACHE_DIR)
+    os.makedirs(cache_dir, exist_ok=True)
+    workers = workers or int(os.environ.get("PRICE_REPORT_WORKERS", 0)) or REPORT_WORKERS
+
+    pages, todo = [], []
+    for product, temp in metrics.groupby("Product"):
+        path = os.path.join(cache_dir, page_key(product, temp) + ".pdf")
+        pages.append(path)
+        if not os.path.exists(path):
+            todo.append((product, temp[PLOT_COLUMNS], path))
+
+    started = time.perf_counter()
+    timings = []
+    if len(todo) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(draw_product_page, *job) for job in todo]
+            for (product, _, _), future in zip(todo, futures):
+                timings.append((product, future.result()))
+    else:
+        timings = [(product, draw_product_page(product, temp, path)) for product, temp, path in todo]
+    render_seconds = time.perf_counter() - started
+
+    for product, seconds in timings:
+        print(f"[TIME] Rendered page {product}: {seconds:.2f}s")
+
+    writer = PdfWriter()
+    for path in pages:
+        writer.append(path)
+    with open(filename, "wb") as f:
+        writer.write(f)
+
+    # Pages of old data are never used again
+    if prune:
+        keep = {os.path.basename(p) for p in pages}
+        for name in os.listdir(cache_dir):
+            if name.endswith(".pdf") and name not in keep:
+                os.remove(os.path.join(cache_dir, name))
+
+    hits = len(pages) - len(todo)
+    ratio = 100.0 * hits / len(pages) if pages else 0.0
+    print(f"[CACHE] Report pages: {hits} cached, {len(todo)} rendered "
+          f"({ratio:.0f}% hit ratio), rendering took {render_seconds:.1f}s")
+    return filename
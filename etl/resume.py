@@ -0,0 +1,127 @@
+import os
+import json
+import glob
+import datetime as dt
+import threading
+from decimal import Decimal
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# CONFIG
+# Every ETL appends the products it finished to a checkpoint file per source
+# and day. In resume mode (run_all_etl.py --resume or PRICE_RESUME=1) a rerun
+# after a crash fetches only what is neither in PRICE for today nor in the
+# checkpoint:
+#   PRICE_RESUME=1 python Amazon_ETL.py
+CHECKPOINT_DIR = os.path.join(BASE_DIR, "..", "data", "checkpoints")   # env: PRICE_CHECKPOINT_DIR
+CHECKPOINT_KEEP_DAYS = 7    # older checkpoint files are removed
+
+# Checkpoint status of a finished product
+OK = "ok"           # offers scraped (stored with the entry)
+EMPTY = "empty"     # page loaded but had no price; not fetched again today
+# Fetch errors are not recorded, so a resumed run retries them.
+
+
+def enabled():
+    return os.environ.get("PRICE_RESUME", "0") == "1"
+
+
+def checkpoint_dir():
+    return os.environ.get("PRICE_CHECKPOINT_DIR", CHECKPOINT_DIR)
+
+
+def prune(keep_days=CHECKPOINT_KEEP_DAYS):
+    """Deletes checkpoint files of days older than `keep_days`."""
+    oldest = (dt.date.today() - dt.timedelta(days=keep_days)).isoformat()
+    for path in glob.glob(os.path.join(checkpoint_dir(), "*_????-??-??.jsonl")):
+        if os.path.basename(path)[-16:-6] < oldest:
+            os.remove(path)
+
+
+# CHECKPOINT FILE
+
+class Checkpoint:
+    """
+    Append-only JSON-lines log of the products one source finished on one day.
+    Each line is written and flushed as soon as the product is done, so the
+    file survives a crash; on load the last line per product wins.
+
+    Rows reach PRICE only when PriceWriter flushes (eBay writes everything at
+    the end), so the scraped (seller, price) offers are kept here too: a
+    resumed run re-adds the ones that never made it into the database
+    instead of fetching them again.
+    """
+
+    def __init__(self, source, day, folder=None):
+        self.source = source
+        self.day = str(day)[:10]
+        folder = folder or checkpoint_dir()
+        os.makedirs(folder, exist_ok=True)
+        self.path = os.path.join(folder, f"{source}_{self.day}.jsonl")
+        self.entries = self._load()     # product -> (status, [(seller, Decimal price)])
+        self._lock = threading.Lock()   # scrapers may mark from worker threads
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _load(self):
+        entries = {}
+        if not os.path.exists(self.path):
+            return entries
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue    # last line cut off by the crash
+                offers = [(seller, Decimal(price)) for seller, price in entry.get("offers", [])]
+                entries[entry["product"]] = (entry["status"], offers)
+        return entries
+
+    def mark(self, product, status, offers=()):
+        """offers: the (seller, price) rows scraped for `product`."""
+        offers = list(offers)
+        line = json.dumps({"product": product, "status": status,
+                           "offers": [[seller, str(price)] for seller, price in offers]}, ensure_ascii=False)
+        with self._lock:
+            self.entries[product] = (status, offers)
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def plan(self, products, sellers, store=None, resume=None):
+        """
+        Splits `products` into (to fetch, [(product, seller, price)] to re-add
+        without fetching). `sellers` is the seller name, or a tuple of name
+        prefixes, the source writes. Without resume mode everything is fetched.
+        """
+        products = list(products)
+        if not (enabled() if resume is None else resume):
+            return products, []
+
+        stored = set()
+        if store is not None:
+            # One query for all of today's keys instead of one per product
+            stored = {p for p, s in store.collected_keys(self.day) if s.startswith(sellers)}
+
+        todo, restored = [], []
+        for product in products:
+            status, offers = self.entries.get(product, (None, []))
+            if product in stored or status == EMPTY:
+                continue
+            if status == OK and offers:
+                restored += [(product, seller, price) for seller, price in offers]
+            else:
+                todo.append(product)
+
+        print(f"[RESUME] {self.source}: {len(products) - len(todo)} of {len(products)} products already "
+              f"done today ({len(restored)} offers restored from {os.path.basename(self.path)}), "
+              f"fetching {len(todo)}")
+        return todo, restored
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,76 +1,236 @@
 import os
 import sys
-import subprocess
+import time
+import argparse
 import datetime as dt
-import mysql.connector
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from price_store import get_store
+import run_metrics
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-
 # all python codes should be in the same folder + products file
-SCRIPTS = [
-    os.path.join(BASE_DIR, "Amazon_ETL.py"),
-    os.path.join(BASE_DIR, "Ebay_ETL.py"),
-    os.path.join(BASE_DIR, "Idealo_ETL.py"),
-    os.path.join(BASE_DIR, "our_company_run_today.py"),
-]
-
-DB_CONFIG = {
-    "host": "localhost",
-    "user": "etl_user",
-    "password": "Megha616@",
-    "port": 3306,
-    "database": "price_collection",
-}
+# (or a CSV/Parquet catalog via PRICE_CATALOG, see catalog.py)
+PRODUCTS_XLSX = os.environ.get("PRICE_CATALOG", os.path.join(BASE_DIR, "products.xlsx"))
+
+
+# STAGES
+
+# Each stage imports its ETL module only when it runs, so in "thread" mode
+# the modules (pandas, requests, selenium, ...) are imported once and shared.
+def run_amazon():
+    import Amazon_ETL
+    Amazon_ETL.run_amazon_today(PRODUCTS_XLSX)
 
-PRICE_TABLE = "PRICE"
 
+def run_ebay():
+    import Ebay_ETL
+    Ebay_ETL.run_ebay_etl(products_xlsx=PRODUCTS_XLSX, save_csv=False, write_db=True)
 
-def run_script(path: str) -> int:
-    """Run a scraper script exactly as-is."""
-    print(f"\n===== RUNNING: {path} =====")
-    result = subprocess.run([sys.executable, path], capture_output=False)
-    return result.returncode
 
+def run_idealo():
+    import Idealo_ETL
+    Idealo_ETL.run_idealo_today(PRODUCTS_XLSX)
+
+
+def run_our_company():
+    import our_company_run_today
+    our_company_run_today.run_our_company_today(PRODUCTS_XLSX)
+
+
+# Dependency graph: stage -> (function, stages that must succeed first,
+# stages that only have to finish first, whatever their outcome).
+# The three marketplaces hit different hosts and do not depend on each other.
+# Our own prices go in last, as in the old sequential run: concurrent
+# writers can refresh PRICE_DAILY_STATS without seeing each other's
+# uncommitted rows (MySQL), so our writer recomputes today's stats and
+# OurRank once over every marketplace row that made it in. A failed
+# marketplace does not stop it.
+STAGES = {
+    "amazon": (run_amazon, [], []),
+    "ebay": (run_ebay, [], []),
+    "idealo": (run_idealo, [], []),
+    "our_company": (run_our_company, [], ["amazon", "ebay", "idealo"]),
+}
 
-def db_summary(today_iso: str):
+
+def run_stage(name: str, func, collect_metrics=False):
+    """
+    Runs one stage and returns (wall-clock seconds, metrics) (raises on
+    failure). With collect_metrics (worker processes) the stage's metrics
+    are handed back to the parent, otherwise metrics is None.
+    """
+    print(f"\n===== RUNNING: {name} =====")
+    started = time.perf_counter()
+    with run_metrics.timer("stage", name):
+        func()
+    seconds = time.perf_counter() - started
+    return seconds, (run_metrics.REGISTRY.drain() if collect_metrics else None)
+
+
+# DAG ORCHESTRATOR
+
+def run_dag(stages=STAGES, mode="thread", max_workers=None):
+    """
+    Runs every stage as soon as the stages it requires succeeded and the
+    ones it runs after finished.
+    mode="thread" runs stages in-process, mode="process" in worker processes.
+
+    A failing stage does not stop the others; stages requiring it are
+    skipped. Returns {stage: {"status", "seconds", "error"}}.
+    """
+    for name, (_, requires, after) in stages.items():
+        unknown = [d for d in requires + after if d not in stages]
+        if unknown:
+            raise ValueError(f"Stage '{name}' depends on unknown stage(s): {unknown}")
+
+    pool_cls = ProcessPoolExecutor if mode == "process" else ThreadPoolExecutor
+    results = {}
+    pending = dict(stages)
+    running = {}
+
+    with pool_cls(max_workers=max_workers or len(stages)) as pool:
+        while pending or running:
+            # Skip stages whose dependencies failed, submit the ready ones
+            for name, (func, requires, after) in list(pending.items()):
+                failed = [d for d in requires if d in results and results[d]["status"] != "ok"]
+                if failed:
+                    results[name] = {"status": "skipped", "seconds": 0.0,
+                                     "error": f"dependency failed: {', '.join(failed)}"}
+                    del pending[name]
+                elif all(d in results for d in requires + after):
+                    running[pool.submit(run_stage, name, func, mode == "process")] = name
+                    del pending[name]
+
+            if not running:
+                if pending:
+                    raise ValueError(f"Dependency cycle between stages: {sorted(pending)}")
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    seconds, stage_metrics = future.result()
+                    if stage_metrics is not None:
+                        run_metrics.REGISTRY.merge(stage_metrics)
+                    results[name] = {"status": "ok", "seconds": seconds, "error": None}
+                except Exception as e:
+                    results[name] = {"status": "failed", "seconds": 0.0, "error": str(e)}
+                    print(f"[ERROR] Stage {name} failed: {e}")
+
+    return {name: results[name] for name in stages}
+
+
+def print_timings(results: dict, total_seconds: float):
+    print("\n===== STAGE TIMINGS =====")
+    print(f"{'stage':15} {'status':8} {'seconds':>8}")
+    for name, r in results.items():
+        print(f"{name:15} {r['status']:8} {r['seconds']:8.1f}")
+        if r["error"]:
+            print(f"{'':15} {r['error']}")
+    print(f"{'total':15} {'':8} {total_seconds:8.1f}")
+
+
+def db_summary(today_iso: str, store=None):
     """Quick proof for demo: show counts per seller for today."""
-    conn = mysql.connector.connect(**DB_CONFIG)
-    cur = conn.cursor()
-
-    cur.execute(f"""
-        SELECT Seller, COUNT(*) AS cnt
-        FROM {DB_CONFIG["database"]}.{PRICE_TABLE}
-        WHERE Date = %s
-        GROUP BY Seller
-        ORDER BY Seller;
-    """, (today_iso,))
-
-    rows = cur.fetchall()
-    cur.close()
-    conn.close()
-
-    print("\n===== DB SUMMARY (today) =====")
+    store = store or get_store()
+    rows = store.seller_counts(today_iso)
+
+    print(f"\n===== DB SUMMARY (today, {store.name}) =====")
     for seller, cnt in rows:
         print(f"{seller:15} {cnt}")
 
 
-if __name__ == "__main__":
+def main(argv=None):
+    global PRODUCTS_XLSX
+    parser = argparse.ArgumentParser(description="Run all price ETLs as a dependency graph.")
+    parser.add_argument("--mode", choices=["thread", "process"], default="thread",
+                        help="run stages in-process (thread) or in worker processes")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="max stages running at the same time (default: all)")
+    parser.add_argument("--store", choices=["mysql", "sqlite"], default=None,
+                        help="price store backend (default: PRICE_STORE env var or mysql)")
+    parser.add_argument("--catalog", default=None,
+                        help="product catalog (.xlsx, .csv or .parquet; default: products.xlsx)")
+    parser.add_argument("--resume", action="store_true",
+                        help="after a crash: only fetch products not collected today (see resume.py)")
+    parser.add_argument("--multi-offer", action="store_true",
+                        help="store every offer of the eBay / Idealo pages, not just the first one")
+    parser.add_argument("--ebay-async", action="store_true",
+                        help="fetch eBay pages concurrently under a per-host rate limit instead of one by one")
+    parser.add_argument("--schedule", action="store_true",
+                        help="fetch volatile / close-to-rank-flip products first, skip quiet ones (see scheduler.py)")
+    parser.add_argument("--budget-seconds", type=float, default=None,
+                        help="with --schedule: stop each source after this many seconds")
+    parser.add_argument("--budget-requests", type=int, default=None,
+                        help="with --schedule: stop each source after this many requests")
+    parser.add_argument("--metrics", action="store_true",
+                        help="record per-stage latency/throughput, write data/metrics snapshots (see run_metrics.py)")
+    parser.add_argument("--archive", action="store_true",
+                        help="also append the collected rows to the Parquet archive (see price_archive.py)")
+    args = parser.parse_args(argv)
+
+    # Worker processes inherit the environment, so this reaches every stage
+    if args.store:
+        os.environ["PRICE_STORE"] = args.store
+    if args.catalog:
+        os.environ["PRICE_CATALOG"] = PRODUCTS_XLSX = os.path.abspath(args.catalog)
+    if args.resume:
+        os.environ["PRICE_RESUME"] = "1"
+    if args.multi_offer:
+        os.environ["PRICE_MULTI_OFFER"] = "1"
+    if args.ebay_async:
+        os.environ["PRICE_EBAY_ASYNC"] = "1"
+    if args.schedule:
+        os.environ["PRICE_SCHEDULE"] = "1"
+    if args.budget_seconds is not None:
+        os.environ["PRICE_BUDGET_SECONDS"] = str(args.budget_seconds)
+    if args.budget_requests is not None:
+        os.environ["PRICE_BUDGET_REQUESTS"] = str(args.budget_requests)
+    if args.archive:
+        os.environ["PRICE_ARCHIVE"] = "1"
+    if args.metrics:
+        os.environ["PRICE_METRICS"] = "1"
+
+    import resume
+    resume.prune()
+
     today = dt.date.today().isoformat()
 
-    for script in SCRIPTS:
-        code = run_script(script)
-        if code != 0:
-            print(f"[ERROR] {script} exited with code {code}. Stopping pipeline.")
-            sys.exit(code)
+    # Parse the catalog once up front; stages (and worker processes) then
+    # get it from memory or from the snapshot in data/catalog_cache
+    from catalog import load_catalog
+    load_catalog(PRODUCTS_XLSX)
 
-    db_summary(today)
-    print("\n All ETLs finished.")
+    started = time.perf_counter()
+    run_metrics.REGISTRY.reset()
+    results = run_dag(STAGES, mode=args.mode, max_workers=args.workers)
+    print_timings(results, time.perf_counter() - started)
 
+    # Response cache totals (stages share it in thread mode)
+    import http_cache
+    http_cache.report("CACHE total")
 
+    db_summary(today)
 
+    # Every stage appended its own files; merge today's into one per partition
+    if os.environ.get("PRICE_ARCHIVE", "0") == "1":
+        import price_archive
+        compacted = price_archive.compact([today])
+        print(f"[ARCHIVE] Compacted {compacted} partition(s) of {today}")
 
+    # Latency / throughput snapshot, also for a run with failed stages
+    run_metrics.count("stage_failures", sum(r["status"] != "ok" for r in results.values()))
+    run_metrics.finish()
 
+    failed = [name for name, r in results.items() if r["status"] != "ok"]
+    if failed:
+        print(f"\n[ERROR] {len(failed)} stage(s) did not finish: {', '.join(failed)}")
+        sys.exit(1)
 
+    print("\n All ETLs finished.")
 
 
+if __name__ == "__main__":
+    main()
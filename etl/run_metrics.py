@@ -0,0 +1,260 @@
+import os
+import json
+import time
+import random
+import threading
+from contextlib import nullcontext
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# CONFIG
+# Latency and throughput of every pipeline stage, per source. Off by
+# default; with metrics on (run_all_etl.py --metrics or PRICE_METRICS=1)
+# the scrapers, PriceWriter and the orchestrator record:
+#   timers      - seconds per fetch / parse / page_load / db_write / stage
+#   counters    - requests, offers, rows_written, <stage>_errors, ...
+# and run_all_etl.py writes a snapshot at the end of the run:
+#   data/metrics/run_<timestamp>.json   p50/p95/p99 per stage and source
+#   data/metrics/price_etl.prom         the same in Prometheus textfile format
+#                                       (node_exporter --collector.textfile.directory)
+METRICS_DIR = os.path.join(BASE_DIR, "..", "data", "metrics")   # env: PRICE_METRICS_DIR
+PROM_FILE = "price_etl.prom"
+PROM_PREFIX = "price_etl"
+MAX_SAMPLES = 10_000        # per timer; beyond that a uniform random sample is kept
+QUANTILES = (0.5, 0.95, 0.99)
+
+_NULL = nullcontext()
+
+
+def enabled():
+    return os.environ.get("PRICE_METRICS", "0") == "1"
+
+
+def metrics_dir():
+    return os.environ.get("PRICE_METRICS_DIR", METRICS_DIR)
+
+
+# REGISTRY
+
+class Timer:
+    """Exact count/sum/min/max plus a bounded reservoir sample for the quantiles."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.samples = []
+
+    def add(self, seconds, rng):
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(seconds)
+        else:
+            # Reservoir sampling: every observation is kept with equal probability
+            slot = rng.randrange(self.count)
+            if slot < MAX_SAMPLES:
+                self.samples[slot] = seconds
+
+    def merge(self, other, rng):
+        # Combine exact totals; quantiles come from the pooled samples
+        count = self.count + other.count
+        pooled = self.samples + other.samples
+        if len(pooled) > MAX_SAMPLES:
+            # Each reservoir stands for `count` observations, so it gets a share
+            # of the merged sample in proportion to its count, not its length
+            mine = round(MAX_SAMPLES * self.count / count)
+            mine = min(len(self.samples), max(MAX_SAMPLES - len(other.samples), mine))
+            pooled = rng.sample(self.samples, mine) + rng.sample(other.samples, MAX_SAMPLES - mine)
+        self.count, self.total = count, self.total + other.total
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        self.samples = pooled
+
+    def summary(self):
+        import numpy as np      # only needed for snapshots
+        q = np.quantile(self.samples, QUANTILES) if self.samples else [0.0] * len(QUANTILES)
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "min": round(self.min if self.count else 0.0, 6),
+            "max": round(self.max, 6),
+            **{f"p{int(level * 100)}": round(float(v), 6) for level, v in zip(QUANTILES, q)},
+        }
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()   # scrapers record from worker threads
+        self._rng = random.Random(0)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.timers = {}        # (stage, source) -> Timer
+            self.counters = {}      # (name, source) -> number
+            self.started = time.time()
+
+    def observe(self, stage, seconds, source=""):
+        with self._lock:
+            timer = self.timers.get((stage, source))
+            if timer is None:
+                timer = self.timers[(stage, source)] = Timer()
+            timer.add(seconds, self._rng)
+
+    def count(self, name, n=1, source=""):
+        with self._lock:
+            self.counters[(name, source)] = self.counters.get((name, source), 0) + n
+
+    def drain(self):
+        """Raw state (picklable) for a worker process to hand back; the registry starts over."""
+        with self._lock:
+            state = (self.timers, self.counters)
+            self.timers, self.counters = {}, {}
+        return state
+
+    def merge(self, state):
+        timers, counters = state
+        with self._lock:
+            for key, timer in timers.items():
+                if key in self.timers:
+                    self.timers[key].merge(timer, self._rng)
+                else:
+                    self.timers[key] = timer
+            for key, n in counters.items():
+                self.counters[key] = self.counters.get(key, 0) + n
+
+    def snapshot(self):
+        with self._lock:
+            finished = time.time()
+            elapsed = max(finished - self.started, 1e-9)
+            return {
+                "started": self.started,
+                "finished": finished,
+                # per_sec: throughput of the stage over the whole run
+                "timers": [{"stage": stage, "source": source, **timer.summary(),
+                            "per_sec": round(timer.count / elapsed, 3)}
+                           for (stage, source), timer in sorted(self.timers.items())],
+                "counters": [{"name": name, "source": source, "value": value}
+                             for (name, source), value in sorted(self.counters.items())],
+            }
+
+
+REGISTRY = Registry()
+
+
+# RECORDING (no-ops unless enabled)
+
+class _Timed:
+    __slots__ = ("stage", "source", "started")
+
+    def __init__(self, stage, source):
+        self.stage = stage
+        self.source = source
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        REGISTRY.observe(self.stage, time.perf_counter() - self.started, self.source)
+        if exc_type is not None:
+            REGISTRY.count(f"{self.stage}_errors", 1, self.source)
+
+
+def timer(stage, source=""):
+    """
+    Context manager timing one `stage` of `source`; an exception inside
+    also counts as an error. When metrics are off it is a shared no-op.
+        with run_metrics.timer("fetch", "ebay"):
+            ...
+    """
+    return _Timed(stage, source) if enabled() else _NULL
+
+
+def observe(stage, seconds, source=""):
+    """Records a duration measured by the caller."""
+    if enabled():
+        REGISTRY.observe(stage, seconds, source)
+
+
+def count(name, n=1, source=""):
+    if enabled():
+        REGISTRY.count(name, n, source)
+
+
+# OUTPUT
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def to_prometheus(snapshot):
+    """Snapshot in the Prometheus text exposition format (summaries + counters)."""
+    name = f"{PROM_PREFIX}_stage_seconds"
+    lines = [f"# HELP {name} Duration of one pipeline stage per source.", f"# TYPE {name} summary"]
+    for t in snapshot["timers"]:
+        labels = f'stage="{_label(t["stage"])}",source="{_label(t["source"])}"'
+        for level in QUANTILES:
+            lines.append(f'{name}{{{labels},quantile="{level}"}} {t[f"p{int(level * 100)}"]}')
+        lines.append(f"{name}_sum{{{labels}}} {t['sum']}")
+        lines.append(f"{name}_count{{{labels}}} {t['count']}")
+
+    for counter in sorted({c["name"] for c in snapshot["counters"]}):
+        metric = f"{PROM_PREFIX}_{counter}_total"
+        lines += [f"# HELP {metric} Total {counter.replace('_', ' ')} in the last run.",
+                  f"# TYPE {metric} counter"]
+        for c in snapshot["counters"]:
+            if c["name"] == counter:
+                lines.append(f'{metric}{{source="{_label(c["source"])}"}} {c["value"]}')
+
+    metric = f"{PROM_PREFIX}_last_run_timestamp_seconds"
+    lines += [f"# HELP {metric} End of the last run (unix time).", f"# TYPE {metric} gauge",
+              f"{metric} {snapshot['finished']:.0f}"]
+    return "\n".join(lines) + "\n"
+
+
+def _atomic_write(path, text):
+    # The textfile collector may read at any moment: write then rename
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(path + ".tmp", path)
+
+
+def write_snapshot(folder=None):
+    """Writes the JSON and Prometheus snapshots; returns (json path, prom path)."""
+    folder = folder or metrics_dir()
+    os.makedirs(folder, exist_ok=True)
+    snapshot = REGISTRY.snapshot()
+
+    stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(snapshot["finished"]))
+    json_path = os.path.join(folder, f"run_{stamp}.json")
+    prom_path = os.path.join(folder, PROM_FILE)
+    _atomic_write(json_path, json.dumps(snapshot, indent=2))
+    _atomic_write(prom_path, to_prometheus(snapshot))
+    return json_path, prom_path
+
+
+def report(label="METRICS"):
+    snapshot = REGISTRY.snapshot()
+    if not snapshot["timers"] and not snapshot["counters"]:
+        return
+    print(f"\n===== {label} =====")
+    print(f"{'stage':12} {'source':12} {'count':>7} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8} {'max s':>8} {'/sec':>7}")
+    for t in snapshot["timers"]:
+        print(f"{t['stage']:12} {t['source']:12} {t['count']:7} {t['p50']:8.3f} {t['p95']:8.3f} "
+              f"{t['p99']:8.3f} {t['max']:8.3f} {t['per_sec']:7.2f}")
+    for c in snapshot["counters"]:
+        print(f"{c['name']:12} {c['source']:12} {c['value']:7}")
+
+
+def finish(label="METRICS"):
+    """End of a run: prints the table and writes both snapshots (if enabled)."""
+    if not enabled():
+        return None
+    report(label)
+    paths = write_snapshot()
+    print(f"[METRICS] Wrote {paths[0]} and {paths[1]}")
+    return paths
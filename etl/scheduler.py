@@ -0,0 +1,251 @@
+import os
+import json
+import time
+import argparse
+import threading
+import datetime as dt
+import numpy as np
+import pandas as pd
+from price_store import get_store, OUR_SELLER
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# CONFIG
+# Schedule mode (run_all_etl.py --schedule or PRICE_SCHEDULE=1): instead of
+# fetching every product on every source, each ETL asks for a plan built
+# from the PRICE history. Products whose price probably changed since the
+# last fetch, or that are close to overtaking / being overtaken by our
+# price, go first; quiet products are skipped until they get stale.
+# Nothing is stored for products that were not fetched: PRICE only holds
+# prices observed on their date. Their stats and OurRank for the day are
+# computed over fewer sellers, so the unfetched products are listed in
+# data/schedule/skipped_<source>.json and the rank check leaves them out
+# (see skipped_products() and visualization_email.check_rank_changes).
+HISTORY_DAYS = 60               # history used to estimate change rates
+PRIOR_CHANGES = 1.0             # smoothing: every product starts at
+PRIOR_DAYS = 7.0                # ... one change per week
+MIN_PRIORITY = 0.2              # skip products scoring below this
+MAX_STALE_DAYS = 7              # always fetch prices older than this
+FLIP_GAP = 0.03                 # within 3% of our price a small move changes our rank
+FLIP_BOOST = 2.0                # priority multiplier at zero gap is 1 + FLIP_BOOST
+BUDGET_SECONDS = None           # per source and run (env: PRICE_BUDGET_SECONDS)
+BUDGET_REQUESTS = None          # per source and run (env: PRICE_BUDGET_REQUESTS)
+SKIPPED_DIR = os.path.join(BASE_DIR, "..", "data", "schedule")   # env: PRICE_SCHEDULE_DIR
+
+# Source -> prefixes of the seller names its ETL writes (multi-offer mode
+# stores one seller per offer, e.g. "eBay_itm_<item id>", "Idealo_<shop>")
+SOURCES = {"amazon": ("Amazon",), "ebay": ("Ebay", "eBay_itm_"), "idealo": ("Idealo",)}
+
+
+def enabled():
+    return os.environ.get("PRICE_SCHEDULE", "0") == "1"
+
+
+def _env_number(name, default):
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+class BudgetExhausted(Exception):
+    """Result of a fetch that was not started because the budget ran out."""
+
+
+# SKIPPED PRODUCTS
+
+def skipped_path(source):
+    return os.path.join(os.environ.get("PRICE_SCHEDULE_DIR", SKIPPED_DIR), f"skipped_{source}.json")
+
+
+def load_skipped(source):
+    """{product: set of ISO dates} on which the schedule did not fetch the product."""
+    try:
+        with open(skipped_path(source), encoding="utf-8") as f:
+            return {product: set(dates) for product, dates in json.load(f).items()}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_skipped(source, skipped, oldest):
+    """Writes `skipped`, without dates before `oldest` (out of the history window)."""
+    keep = {product: sorted(d for d in dates if d >= oldest) for product, dates in skipped.items()}
+    path = skipped_path(source)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({product: dates for product, dates in keep.items() if dates}, f)
+    os.replace(path + ".tmp", path)
+
+
+def skipped_products(dates, sources=tuple(SOURCES)):
+    """Products some source's schedule did not fetch on one of `dates` (their rank is not comparable)."""
+    dates = {str(d)[:10] for d in dates}
+    return {product for source in sources for product, days in load_skipped(source).items() if days & dates}
+
+
+# CHANGE RATE ESTIMATE
+
+def estimate(history: pd.DataFrame, sellers, today, our_seller=OUR_SELLER) -> pd.DataFrame:
+    """
+    One row per product offered by sellers starting with `sellers` (a prefix
+    or tuple of prefixes) in `history` (Product, Seller, Date, Price rows),
+    indexed by Product. With several offers a day, the cheapest one counts.
+      rate       - price changes per day (smoothed)
+      age_days   - days since the last stored price
+      p_change   - chance the price changed since then, 1 - exp(-rate * age)
+      gap        - relative distance between the last price and ours
+      priority   - p_change, boosted up to (1 + FLIP_BOOST)x near our price
+    """
+    today = pd.Timestamp(today)
+    own = history[history["Seller"].str.startswith(sellers)]
+    if own.empty:
+        return pd.DataFrame(columns=["rate", "age_days", "p_change", "gap", "priority"])
+    own = own.groupby(["Product", "Date"], as_index=False)["Price"].min()
+
+    prev = own.groupby("Product")["Price"].shift()
+    own = own.assign(changed=(prev.notna() & (own["Price"] != prev)).astype(int))
+    per = own.groupby("Product").agg(
+        changes=("changed", "sum"),
+        first=("Date", "min"),
+        last=("Date", "max"),
+        price=("Price", "last"),
+    )
+
+    span = (per["last"] - per["first"]).dt.days
+    per["rate"] = (per["changes"] + PRIOR_CHANGES) / (span + PRIOR_DAYS)
+    per["age_days"] = (today - per["last"]).dt.days.clip(lower=0)
+    per["p_change"] = 1 - np.exp(-per["rate"] * per["age_days"])
+
+    ours = (history[history["Seller"] == our_seller]
+            .sort_values("Date").groupby("Product")["Price"].last())
+    per["gap"] = (per["price"] - ours.reindex(per.index)).abs() / ours.reindex(per.index)
+    closeness = (1 - per["gap"] / FLIP_GAP).clip(lower=0, upper=1).fillna(0)
+    per["priority"] = per["p_change"] * (1 + FLIP_BOOST * closeness)
+    return per[["rate", "age_days", "p_change", "gap", "priority"]]
+
+
+# PLAN
+
+class SchedulePlan:
+    """
+    Fetch order for one source plus a time/request budget. ETLs call
+    order() on their product list, then allow() before every request and
+    stop when it returns False. At the end they call record_skipped() for
+    today; report() prints what the schedule saved.
+    """
+
+    def __init__(self, source, estimates, budget_seconds=None, budget_requests=None):
+        self.source = source
+        self.estimates = estimates
+        self.budget_seconds = budget_seconds
+        self.budget_requests = budget_requests
+
+        self.products = []          # catalog products passed to order()
+        self.planned = []           # ... the ones to fetch, best first
+        self.fetched = set()
+        self.started = None
+        self.exhausted = False
+        self._lock = threading.Lock()
+
+    def order(self, products):
+        """The products to fetch, highest priority first. Products without history always come first."""
+        self.products = list(products)
+        est = self.estimates
+        known = [p for p in self.products if p in est.index]
+        new = [p for p in self.products if p not in est.index]
+
+        keep = est.loc[known]
+        keep = keep[(keep["priority"] >= MIN_PRIORITY) | (keep["age_days"] >= MAX_STALE_DAYS)]
+        self.planned = new + keep.sort_values("priority", ascending=False, kind="stable").index.tolist()
+        return list(self.planned)
+
+    def allow(self, product):
+        """Counts one request for `product`; False (from then on always) once the budget is used up."""
+        with self._lock:
+            if self.started is None:
+                self.started = time.monotonic()
+            if self.exhausted:
+                return False
+            if ((self.budget_requests is not None and len(self.fetched) >= self.budget_requests)
+                    or (self.budget_seconds is not None
+                        and time.monotonic() - self.started >= self.budget_seconds)):
+                self.exhausted = True
+                print(f"[SCHEDULE] {self.source}: budget used up after {len(self.fetched)} requests")
+                return False
+            self.fetched.add(product)
+            return True
+
+    def record_skipped(self, today):
+        """
+        Records the products that were not fetched for `today` (see
+        skipped_products()), so the rank check does not read their partial
+        stats as a rank change. Returns them.
+        """
+        day = str(today)[:10]
+        unfetched = [p for p in self.products if p not in self.fetched]
+        skipped = load_skipped(self.source)
+        for product in unfetched:
+            skipped.setdefault(product, set()).add(day)
+        oldest = (pd.Timestamp(day) - pd.Timedelta(days=HISTORY_DAYS)).strftime("%Y-%m-%d")
+        save_skipped(self.source, skipped, oldest)
+        return unfetched
+
+    def report(self):
+        total = len(self.products)
+        fetched = len(self.fetched)
+        cut = len(self.planned) - fetched
+        skipped = [p for p in self.products if p not in self.planned]
+        unfetched = [p for p in self.products if p not in self.fetched and p in self.estimates.index]
+
+        est = self.estimates.loc[unfetched]
+        saved = total - fetched
+        print(f"[SCHEDULE] {self.source}: {fetched} of {total} products fetched, {len(skipped)} skipped "
+              f"by schedule, {cut} cut by budget; saved {saved} fetches "
+              f"({100.0 * saved / total if total else 0:.0f}%)")
+        if len(est):
+            print(f"[SCHEDULE] {self.source}: staleness of unfetched prices avg {est['age_days'].mean():.1f} "
+                  f"days, max {int(est['age_days'].max())} days, ~{est['p_change'].sum():.1f} of them "
+                  f"expected to have changed")
+
+
+def build_plans(sources=tuple(SOURCES), store=None, today=None,
+                budget_seconds=None, budget_requests=None):
+    """{source: SchedulePlan} from one query over the last HISTORY_DAYS of PRICE."""
+    store = store or get_store()
+    today = today or dt.date.today()
+    since = today - dt.timedelta(days=HISTORY_DAYS)
+    history = store.load_recent_prices(since, [OUR_SELLER] + [p for s in sources for p in SOURCES[s]])
+
+    if budget_seconds is None:
+        budget_seconds = _env_number("PRICE_BUDGET_SECONDS", BUDGET_SECONDS)
+    if budget_requests is None:
+        budget_requests = _env_number("PRICE_BUDGET_REQUESTS", BUDGET_REQUESTS)
+
+    return {
+        source: SchedulePlan(source, estimate(history, SOURCES[source], today),
+                             budget_seconds, budget_requests)
+        for source in sources
+    }
+
+
+def plan_for(source, store=None, plan=None):
+    """The plan an ETL should follow: `plan` if given, a new one in schedule mode, else None."""
+    if plan is not None or not enabled():
+        return plan
+    return build_plans([source], store)[source]
+
+
+if __name__ == "__main__":
+    # Dry run: print what the schedule would fetch today
+    parser = argparse.ArgumentParser(description="Show today's scrape plan per source.")
+    parser.add_argument("--catalog", default=None, help="product catalog (default: products.xlsx)")
+    parser.add_argument("--top", type=int, default=10, help="products shown per source")
+    args = parser.parse_args()
+
+    from catalog import load_catalog
+    catalog = load_catalog(args.catalog)
+    for source, plan in build_plans().items():
+        products = catalog.loc[catalog[f"{source}_url"] != "", "product"]
+        planned = plan.order(products)
+        print(f"\n===== {source}: {len(planned)} of {len(products)} products planned =====")
+        shown = plan.estimates.reindex(planned[:args.top])
+        with pd.option_context("display.width", 160, "display.max_colwidth", 40):
+            print(shown.round(3).to_string() if len(shown) else "(nothing to fetch)")
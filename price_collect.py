@@ -0,0 +1,88 @@
+import os
+import sys
+import argparse
+
+# One entry point for the whole pipeline:
+#   python price_collect.py scrape [--mode process --resume ...]   all ETLs (etl/run_all_etl.py)
+#   python price_collect.py load [files ...]                        CSV import (etl/import_csv.py)
+#   python price_collect.py report [--from-archive ...]             PDF report + email (visualization_email.py)
+#   python price_collect.py alert [--full-report ...]               rank check first, PDF only if needed
+#   python price_collect.py schema create|export|backfill|migrate   database schema (etl/SQL_database.py, ...)
+# Options after the command go to that command (`scrape --help`).
+#
+# Startup is kept cheap: this file only imports the standard library, and
+# each command imports its modules (pandas, matplotlib, selenium, mysql,
+# ...) when it runs. benchmarks/bench_startup.py guards that.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "etl"))
+
+
+# COMMANDS
+
+def scrape(argv):
+    import run_all_etl
+    run_all_etl.main(argv)
+
+
+def load(argv):
+    import import_csv
+    import_csv.main(argv)
+
+
+def report(argv):
+    import visualization_email
+    visualization_email.cli(argv)
+
+
+def alert(argv):
+    import visualization_email
+    visualization_email.cli(["--lazy", *argv])
+
+
+def schema(argv):
+    parser = argparse.ArgumentParser(prog="price_collect.py schema")
+    parser.add_argument("action", choices=["create", "export", "backfill", "migrate"],
+                        help="create: database + tables, export: DDL to a .sql file, "
+                             "backfill: rebuild PRICE_DAILY_STATS, migrate: move to schema v2")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="options of the action (export: path)")
+    args = parser.parse_args(argv)
+
+    if args.action == "create":
+        import SQL_database
+        SQL_database.main()
+    elif args.action == "export":
+        import export_schema
+        export_schema.main(args.args)
+    elif args.action == "backfill":
+        import backfill_daily_stats
+        backfill_daily_stats.backfill()
+    else:
+        import migrate_schema_v2
+        migrate_schema_v2.main(args.args)
+
+
+COMMANDS = {
+    "scrape": (scrape, "collect today's prices from all sources"),
+    "load": (load, "bulk import CSV price snapshots"),
+    "report": (report, "PDF report of all products, email on rank changes"),
+    "alert": (alert, "rank check first; summary email, then a PDF of the changed products"),
+    "schema": (schema, "create, export, backfill or migrate the database schema"),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="price_collect.py",
+        description="Price collection pipeline.",
+        epilog="commands:\n" + "\n".join(f"  {name:8} {text}" for name, (_, text) in COMMANDS.items()),
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=COMMANDS, metavar="command")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="options of the command (<command> --help)")
+    args = parser.parse_args(argv)
+
+    # The commands' own parsers print "price_collect.py <command>" in their usage
+    sys.argv[0] = f"{parser.prog} {args.command}"
+    COMMANDS[args.command][0](args.args)
+
+
+if __name__ == "__main__":
+    main()
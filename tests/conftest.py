@@ -0,0 +1,9 @@
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# The ETL modules import each other by bare name (they are run from etl/);
+# visualization_email.py and price_collect.py live in the repo root
+sys.path.insert(0, os.path.join(ROOT, "etl"))
+sys.path.insert(0, ROOT)
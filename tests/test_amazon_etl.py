@@ -0,0 +1,38 @@
+from datetime import date
+from decimal import Decimal
+
+import requests
+
+import Amazon_ETL
+from price_store import SQLitePriceStore
+from resume import Checkpoint, OK
+
+PAGES = {
+    "https://amazon.de/ok": (200, '<span class="a-price-whole">19,</span><span class="a-price-fraction">99</span>'),
+    "https://amazon.de/captcha": (503, "<html>Robot check</html>"),
+}
+
+
+def fake_get(url, headers=None, source="", **kwargs):
+    if url == "https://amazon.de/slow":
+        raise requests.Timeout("read timed out")
+    response = requests.Response()
+    response.status_code, response._content, response.url = PAGES[url][0], PAGES[url][1].encode(), url
+    response.encoding = "utf-8"
+    return response
+
+
+def test_failed_requests_are_logged_and_not_checkpointed(tmp_path, monkeypatch):
+    monkeypatch.setenv("PRICE_CHECKPOINT_DIR", str(tmp_path))
+    monkeypatch.setattr(Amazon_ETL.http_client, "get", fake_get)
+    catalog = tmp_path / "products.csv"
+    catalog.write_text("Product Name,Amazon URL\nA,https://amazon.de/ok\nB,https://amazon.de/slow\n"
+                       "C,https://amazon.de/captcha\n", encoding="utf-8")
+    store = SQLitePriceStore(path=str(tmp_path / "prices.sqlite"))
+    store.create_schema()
+
+    Amazon_ETL.run_amazon_today(str(catalog), store=store, resume=False)
+
+    assert [tuple(r) for r in store.query("SELECT Product, Seller, Price FROM PRICE")] == [("A", "Amazon", 19.99)]
+    entries = Checkpoint("amazon", date.today(), folder=str(tmp_path)).entries
+    assert entries == {"A": (OK, [("Amazon", Decimal("19.99"))])}
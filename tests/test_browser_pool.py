@@ -0,0 +1,53 @@
+import threading
+
+import pytest
+
+from browser_pool import BrowserPool
+
+
+class FakeDriver:
+    def __init__(self):
+        self.closed = False
+
+    def quit(self):
+        self.closed = True
+
+
+def test_driver_is_discarded_on_any_exception():
+    created = []
+    pool = BrowserPool(1, factory=lambda: created.append(FakeDriver()) or created[-1])
+
+    with pytest.raises(ValueError):
+        with pool.driver():
+            raise ValueError("not a WebDriverException")
+    assert created[0].closed
+
+    with pool.driver() as d:        # the slot is free again, a new browser is started
+        assert d is created[1]
+
+
+def test_waiter_gets_a_slot_when_the_driver_is_discarded():
+    pool = BrowserPool(1, factory=FakeDriver)
+    got = []
+    holding, release = threading.Event(), threading.Event()
+
+    def holder():
+        with pytest.raises(RuntimeError):
+            with pool.driver():
+                holding.set()
+                release.wait()
+                raise RuntimeError("page blew up")
+
+    def waiter():
+        with pool.driver() as d:
+            got.append(d)
+
+    first = threading.Thread(target=holder)
+    first.start()
+    holding.wait()
+    second = threading.Thread(target=waiter)
+    second.start()
+    release.set()
+    first.join(5)
+    second.join(5)
+    assert not second.is_alive() and len(got) == 1 and not got[0].closed
@@ -0,0 +1,48 @@
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+import Ebay_ETL
+import scheduler
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    monkeypatch.setenv("PRICE_CHECKPOINT_DIR", str(tmp_path))
+    monkeypatch.setenv("PRICE_SCHEDULE_DIR", str(tmp_path))
+    monkeypatch.delenv("PRICE_EBAY_ASYNC", raising=False)
+    monkeypatch.setattr(Ebay_ETL, "scrape_ebay_price", lambda url: Decimal("9.99"))
+    sleeps = []
+    monkeypatch.setattr(Ebay_ETL.time, "sleep", sleeps.append)
+    path = tmp_path / "products.csv"
+    # A and B share one listing URL
+    path.write_text("Product Name,Ebay URL\nA,https://ebay.de/sch/x\nB,https://ebay.de/sch/x\n"
+                    "C,https://ebay.de/sch/y\n", encoding="utf-8")
+    return str(path), sleeps
+
+
+def run(catalog, **kwargs):
+    return Ebay_ETL.run_ebay_etl(catalog, save_csv=False, write_db=False, resume=False, **kwargs)
+
+
+def test_sequential_by_default_without_a_pause_after_the_last_page(catalog):
+    path, sleeps = catalog
+    df = run(path)
+    assert list(df["Product"]) == ["A", "B", "C"]
+    assert df["Price"].dtype == "float64" and df["Price"].tolist() == [9.99] * 3
+    assert sleeps == [Ebay_ETL.REQUEST_DELAY_SECONDS] * 2
+
+
+def test_async_budget_counts_products_sharing_a_url(catalog):
+    path, sleeps = catalog
+    plan = scheduler.SchedulePlan("ebay", pd.DataFrame(columns=["rate", "age_days", "p_change", "gap", "priority"]))
+    df = run(path, use_async=True, plan=plan)
+    assert plan.fetched == {"A", "B", "C"}
+    assert list(df["Product"]) == ["A", "B", "C"] and not sleeps
+
+
+def test_no_schedule_without_a_store(catalog, monkeypatch):
+    monkeypatch.setenv("PRICE_SCHEDULE", "1")
+    monkeypatch.setattr(scheduler, "build_plans", lambda *a, **k: pytest.fail("opened the store"))
+    assert len(run(catalog[0])) == 3
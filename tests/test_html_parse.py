@@ -0,0 +1,83 @@
+from decimal import Decimal
+
+import pytest
+
+from html_parse import BACKENDS
+from Amazon_ETL import parse_amazon_price
+from Ebay_ETL import parse_ebay_price, parse_ebay_offers
+from Idealo_ETL import parse_idealo_prices, parse_idealo_offers
+
+# Small pages shaped like the real ones: price nodes nested in unrelated
+# markup, decoys outside the filtered nodes, pages without any price
+NOISE = '<div id="nav"><span class="a-price-symbol">€</span><p>Lieferung in 2-4 Tagen</p></div>'
+
+AMAZON = {
+    "split price": (f'<html><body>{NOISE}<div id="corePrice"><span class="a-price">'
+                    '<span class="a-offscreen">1.299,99 €</span><span aria-hidden="true">'
+                    '<span class="a-price-whole">1.299<span class="a-price-decimal">,</span></span>'
+                    '<span class="a-price-fraction">99</span></span></span></div></body></html>',
+                    Decimal("1299.99")),
+    "offscreen only": (f'<html><body>{NOISE}<span class="a-price a-text-price">'
+                       '<span class="a-offscreen">49,90 €</span></span></body></html>', Decimal("49.90")),
+    "no price": (f"<html><body>{NOISE}<p>Derzeit nicht verfügbar.</p></body></html>", None),
+}
+
+EBAY_LISTING = (
+    f'<html><body>{NOISE}<ul class="srp-results">'
+    '<li class="s-item"><span class="s-item__price">Preis auf Anfrage</span></li>'
+    '<li class="s-item"><a class="s-item__link" href="https://www.ebay.de/itm/204961449144?hash=x">'
+    '<span>Neu</span></a><div><span class="s-item__price">EUR 89,00</span>'
+    '<span class="s-item__shipping">+EUR 4,99 Versand</span></div></li>'
+    '<li class="s-item"><a href="https://www.ebay.de/itm/some-title/115000000001">x</a>'
+    '<span class="s-item__price">EUR 92,50</span>'
+    '<span class="s-item__logisticsCost">Kostenloser Versand</span></li>'
+    '</ul></body></html>'
+)
+EBAY = {
+    "listing": (EBAY_LISTING, Decimal("93.99")),
+    "item page": ('<html><body><div class="x-price-primary"><span class="ux-textual-display">'
+                  'EUR 1.049,00</span></div><div class="ux-labels-values__values-content">'
+                  '<span>EUR 5,90 Versand</span></div></body></html>', Decimal("1054.90")),
+    "item page by id": ('<html><body><span id="prcIsum">EUR 15,00</span>'
+                        '<span id="fshippingCost"><span>Kostenlos</span></span></body></html>', Decimal("15.00")),
+    "no price": (f"<html><body>{NOISE}</body></html>", None),
+}
+
+
+def idealo_offer(price, shop, shipping=""):
+    return (f'<li class="productOffers-listItem" data-product-id="1" data-shop-name="{shop}">'
+            f'<div><div class="text-base font-medium text-orange-500">{price}</div></div>'
+            f'<span class="shipping">{shipping}</span></li>')
+
+
+IDEALO = {
+    "offers": (f'<html><body>{NOISE}<ul>' + idealo_offer("199,00 €", "Shop A")
+               + idealo_offer("189,50 €", "Shop B", "+ 4,99 € Versand")
+               + idealo_offer("ausverkauft", "Shop C") + "</ul></body></html>",
+               (3, [Decimal("199.00"), Decimal("189.50")])),
+    "no offers": (f"<html><body>{NOISE}</body></html>", (0, [])),
+}
+
+CASES = (
+    [(parse_amazon_price, name, html, expected) for name, (html, expected) in AMAZON.items()]
+    + [(parse_ebay_price, name, html, expected) for name, (html, expected) in EBAY.items()]
+    + [(parse_idealo_prices, name, html, expected) for name, (html, expected) in IDEALO.items()]
+)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("extract, name, html, expected", CASES,
+                         ids=[f"{case[0].__name__}-{case[1]}" for case in CASES])
+def test_backends_match_html_parser(backend, extract, name, html, expected):
+    assert extract(html, backend=backend) == extract(html, backend="html.parser") == expected
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_multi_offer_backends_match_html_parser(backend):
+    assert parse_ebay_offers(EBAY_LISTING, backend=backend) == parse_ebay_offers(EBAY_LISTING, backend="html.parser")
+    assert parse_ebay_offers(EBAY_LISTING, backend=backend) == [
+        ("eBay_itm_204961449144", Decimal("93.99")), ("eBay_itm_115000000001", Decimal("92.50"))]
+    html = IDEALO["offers"][0]
+    assert parse_idealo_offers(html, backend=backend) == parse_idealo_offers(html, backend="html.parser")
+    assert parse_idealo_offers(html, backend=backend)[1] == [
+        ("Idealo_Shop A", Decimal("199.00")), ("Idealo_Shop B", Decimal("194.49"))]
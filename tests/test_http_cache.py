@@ -0,0 +1,63 @@
+import json
+import time
+
+import requests
+
+import http_cache
+import http_client
+from http_cache import HttpCache
+
+
+def cached_at(tmp_path, stored_at, ttl=12 * 3600):
+    cache = HttpCache(folder=str(tmp_path), ttl=ttl)
+    body_path, meta_path = cache._paths("https://example.com/item")
+    with open(body_path, "wb") as f:
+        f.write(b"<html>EUR 4,99</html>")
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({"url": "https://example.com/item", "encoding": "utf-8", "headers": {},
+                   "stored_at": stored_at}, f)
+    return cache.lookup("https://example.com/item")
+
+
+def test_entry_from_today_within_ttl_is_fresh(tmp_path):
+    assert cached_at(tmp_path, time.time() - 1)["fresh"]
+
+
+def test_entry_from_yesterday_is_stale_within_ttl(tmp_path):
+    # Stored one second before midnight: well inside the 12h TTL, but another day
+    t = time.localtime()
+    midnight = time.mktime((t.tm_year, t.tm_mon, t.tm_mday, 0, 0, 0, 0, 0, -1))
+    assert not cached_at(tmp_path, midnight - 1, ttl=10 ** 9)["fresh"]
+
+
+def test_entry_older_than_ttl_is_stale(tmp_path):
+    assert not cached_at(tmp_path, time.time() - 120, ttl=60)["fresh"]
+
+
+def serve(monkeypatch, tmp_path, body):
+    def fake_get(url, headers=None, **kwargs):
+        response = requests.Response()
+        response.status_code, response._content, response.url = 200, body, url
+        return response
+
+    monkeypatch.setattr(http_cache, "_cache", HttpCache(folder=str(tmp_path)))
+    monkeypatch.setattr(http_client.get_session(), "get", fake_get)
+    return http_cache.get_cache()
+
+
+def test_fetched_page_is_cached_only_when_kept(monkeypatch, tmp_path):
+    cache = serve(monkeypatch, tmp_path, b"<html>Robot check</html>")
+    http_client.get("https://example.com/item", use_cache=True)     # no price: not kept
+    assert cache.lookup("https://example.com/item") is None
+
+    response = http_client.get("https://example.com/item", use_cache=True)
+    http_client.keep(response)
+    assert cache.lookup("https://example.com/item")["fresh"]
+
+
+def test_cached_page_is_not_stored_again(monkeypatch, tmp_path):
+    cache = serve(monkeypatch, tmp_path, b"<html>EUR 4,99</html>")
+    http_client.keep(http_client.get("https://example.com/item", use_cache=True))
+    stored_at = cache.lookup("https://example.com/item")["stored_at"]
+    http_client.keep(http_client.get("https://example.com/item", use_cache=True))
+    assert cache.lookup("https://example.com/item")["stored_at"] == stored_at
@@ -0,0 +1,25 @@
+from decimal import Decimal
+
+from Idealo_ETL import parse_idealo_offers
+
+
+def offer(price, shop=None, logo=None, shipping=""):
+    attr = f' data-shop-name="{shop}"' if shop else ""
+    img = f'<img alt="{logo}" src="x.png">' if logo else ""
+    return (f'<li data-product-id="1"{attr}>{img}'
+            f'<div class="text-base font-medium text-orange-500">{price}</div>'
+            f'<span>{shipping}</span></li>')
+
+
+def test_offers_without_shop_name_are_skipped():
+    html = "<ul>" + offer("199,00 €", shop="Shop A") + offer("189,00 €") + offer("195,00 €", logo="Shop B") + "</ul>"
+    n_items, offers = parse_idealo_offers(html)
+    assert n_items == 3
+    assert sorted(offers) == [("Idealo_Shop A", Decimal("199.00")), ("Idealo_Shop B", Decimal("195.00"))]
+
+
+def test_shipping_amount_is_added_not_the_delivery_days():
+    html = "<ul>" + offer("199,00 €", shop="Shop A", shipping="Lieferung in 2-4 Tagen + 4,99 € Versand") \
+        + offer("150,00 €", shop="Shop C", shipping="Versand in 2 Tagen") + "</ul>"
+    _, offers = parse_idealo_offers(html)
+    assert dict(offers) == {"Idealo_Shop A": Decimal("203.99"), "Idealo_Shop C": Decimal("150.00")}
@@ -0,0 +1,109 @@
+import random
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from price_parse import parse_cents, parse_price, shipping_price, parse_cents_memoized
+
+NBSP = "\u00a0"
+
+
+@pytest.mark.parametrize("text, expected", [
+    # Other numbers next to the price (eBay listing / shipping lines)
+    ("Lieferung in 2-4 Tagen EUR 4,99", "4.99"),
+    ("3 Angebote ab 1.299,99 €", "1299.99"),
+    ("Artikelnummer 204961449144 EUR 12,00", "12.00"),
+    ("2 verfügbar", None),
+    ("Versand in 2 Tagen", None),
+    # Plain price formats
+    ("1.299,99 €", "1299.99"),
+    ("EUR 2.049,00", "2049.00"),
+    ("899,99", "899.99"),
+    ("$1,299.99", "1299.99"),
+    ("US $1,299.99", "1299.99"),
+    ("USD 899.99", "899.99"),
+    (f"1{NBSP}299,99{NBSP}€", "1299.99"),
+    ("1.299,-", "1299.00"),
+    ("12.5", "12.50"),
+    # Whole numbers: only alone or next to a currency
+    ("1299", "1299.00"),
+    ("1,299", "1299.00"),
+    ("EUR 12", "12.00"),
+    ("12 €", "12.00"),
+    ("Preis auf Anfrage", None),
+    ("", None),
+    (None, None),
+])
+def test_parse_price(text, expected):
+    assert parse_price(text) == (Decimal(expected) if expected else None)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Lieferung in 2-4 Tagen EUR 4,99", "4.99"),
+    ("+EUR 4,99 Versand", "4.99"),
+    ("Kostenloser Versand", "0.00"),
+    ("Free shipping", "0.00"),
+    ("Versand in 2 Tagen", "0.00"),
+    ("2 verfügbar", "0.00"),
+    ("", "0.00"),
+])
+def test_shipping_price(text, expected):
+    assert shipping_price(text) == Decimal(expected)
+
+
+# PROPERTIES (seeded random amounts, formats and surrounding text; plain
+# loops instead of hypothesis, which is not a dependency)
+
+def group(n, sep):
+    s = str(n)
+    parts = []
+    while len(s) > 3:
+        parts.insert(0, s[-3:])
+        s = s[:-3]
+    return sep.join([s] + parts)
+
+
+FORMATS = [
+    lambda e, c: f"{group(e, '.')},{c:02d} €",
+    lambda e, c: f"EUR {group(e, '.')},{c:02d}",
+    lambda e, c: f"{group(e, NBSP)},{c:02d}{NBSP}€",
+    lambda e, c: f"${group(e, ',')}.{c:02d}",
+    lambda e, c: f"USD {e}.{c:02d}",
+    lambda e, c: f"+EUR {e},{c:02d} Versand",
+    lambda e, c: f"{e},{c:02d}",
+]
+
+# Text with numbers of its own, put in front of the price
+PREFIXES = ["", "Neu ", "{n} Angebote ab ", "Lieferung in {n}-{m} Tagen ", "Artikelnummer {id} ",
+            "Nur noch {n} verfügbar - "]
+
+
+def random_prices(seed, count=2000):
+    rng = random.Random(seed)
+    for _ in range(count):
+        cents = rng.randrange(1, 500_000_00)
+        prefix = rng.choice(PREFIXES).format(n=rng.randrange(1, 20), m=rng.randrange(2, 30),
+                                             id=rng.randrange(10**11, 10**12))
+        yield prefix + rng.choice(FORMATS)(cents // 100, cents % 100), cents
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_parse_cents_round_trip(seed):
+    for text, cents in random_prices(seed):
+        assert parse_cents(text) == cents, text
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_memoized_matches_scalar(seed):
+    texts = [text for text, _ in random_prices(seed, 500)] + ["2 verfügbar", "1299", None, ""]
+    column = parse_cents_memoized(texts)
+    scalar = [parse_cents(text) for text in texts]
+    assert [None if pd.isna(v) else int(v) for v in column] == scalar
+
+
+def test_bare_number_in_text_is_not_a_price():
+    rng = random.Random(0)
+    for _ in range(500):
+        n = rng.randrange(0, 10**12)
+        assert parse_cents(f"{rng.choice(['Nur noch', 'Artikel', 'Menge'])} {n} {rng.choice(['Stück', 'verfügbar', ''])}") is None
@@ -0,0 +1,43 @@
+import pytest
+
+import price_store
+from price_store import PriceStore, SQLitePriceStore
+
+
+def test_backend_missing_a_method_fails_when_instantiated():
+    methods = dict(vars(SQLitePriceStore))
+    del methods["create_staging"]
+    Incomplete = type("IncompletePriceStore", (PriceStore,), methods)
+    with pytest.raises(TypeError, match="create_staging"):
+        Incomplete(path=":memory:")
+
+
+def test_backends_implement_the_interface(tmp_path):
+    assert SQLitePriceStore(path=str(tmp_path / "prices.sqlite"))
+    assert price_store.MySQLPriceStore.__abstractmethods__ == frozenset()
+
+
+@pytest.mark.parametrize("schema", ["v1", "v2"])
+def test_load_prices_after_pages_through_every_row(tmp_path, schema):
+    store = SQLitePriceStore(path=str(tmp_path / "prices.sqlite"), schema=schema)
+    store.create_schema()
+    rows = [(product, day, seller, 10.0 + i)
+            for i, (day, product, seller) in enumerate(
+                (day, product, seller) for day in ["2026-01-05", "2026-01-04"]
+                for product in ["B", "A"] for seller in ["Our company", "Shop"])]
+    conn = store.connect()
+    store.upsert(conn.cursor(), rows)
+    conn.commit()
+    conn.close()
+
+    seen, last_id = [], 0
+    while True:
+        df = store.load_prices_after(last_id, 3)
+        if df.empty:
+            break
+        seen += list(df[["Product", "Date", "Seller", "Price"]].itertuples(index=False, name=None))
+        last_id = df["ID"].iloc[-1]
+    assert sorted(seen) == sorted(rows)
+    if schema == "v2":
+        # (date, 0, 0) starts at the first row of that date
+        assert len(store.load_prices_after(("2026-01-05", 0, 0), 100)) == 4
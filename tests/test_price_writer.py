@@ -0,0 +1,44 @@
+import time
+
+import pytest
+
+from price_store import SQLitePriceStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLitePriceStore(path=str(tmp_path / "prices.sqlite"))
+    store.create_schema()
+    return store
+
+
+def stored(store):
+    return [tuple(r) for r in store.query("SELECT Product, Seller, Price FROM PRICE")]
+
+
+def test_buffered_rows_are_flushed_by_the_timer(store):
+    with store.writer(flush_interval=0.05) as writer:
+        writer.add("A", "2026-01-05", "Amazon", 9.99)
+        time.sleep(0.5)     # a slow scrape: no further add() call
+        assert stored(store) == [("A", "Amazon", 9.99)]
+        assert writer.batches == 1
+
+
+def test_error_in_the_block_is_not_replaced_by_a_failing_flush(store, monkeypatch):
+    def broken_upsert(cursor, rows, table):
+        raise RuntimeError("database gone")
+
+    with pytest.raises(ValueError, match="scrape failed"):
+        with store.writer() as writer:
+            writer.add("A", "2026-01-05", "Amazon", 9.99)
+            monkeypatch.setattr(store, "upsert", broken_upsert)
+            raise ValueError("scrape failed")
+    assert stored(store) == []
+
+
+def test_rows_collected_before_an_error_are_kept(store):
+    with pytest.raises(ValueError):
+        with store.writer() as writer:
+            writer.add("A", "2026-01-05", "Amazon", 9.99)
+            raise ValueError("scrape failed")
+    assert stored(store) == [("A", "Amazon", 9.99)]
@@ -0,0 +1,41 @@
+import threading
+
+import run_all_etl
+
+
+def recorder():
+    order, lock = [], threading.Lock()
+
+    def stage(name, fail=False):
+        def run():
+            with lock:
+                order.append(name)
+            if fail:
+                raise RuntimeError(f"{name} broke")
+        return run
+
+    return order, stage
+
+
+def test_stage_runs_after_others_even_when_they_fail():
+    order, stage = recorder()
+    stages = {
+        "a": (stage("a"), [], []),
+        "b": (stage("b", fail=True), [], []),
+        "last": (stage("last"), [], ["a", "b"]),
+    }
+    results = run_all_etl.run_dag(stages)
+    assert order[-1] == "last"
+    assert {name: r["status"] for name, r in results.items()} == {"a": "ok", "b": "failed", "last": "ok"}
+
+
+def test_stage_requiring_a_failed_stage_is_skipped():
+    order, stage = recorder()
+    stages = {"b": (stage("b", fail=True), [], []), "needs_b": (stage("needs_b"), ["b"], [])}
+    results = run_all_etl.run_dag(stages)
+    assert order == ["b"] and results["needs_b"]["status"] == "skipped"
+
+
+def test_our_prices_are_written_after_the_marketplaces():
+    _, requires, after = run_all_etl.STAGES["our_company"]
+    assert not requires and set(after) == {"amazon", "ebay", "idealo"}
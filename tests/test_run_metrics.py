@@ -0,0 +1,38 @@
+import random
+
+from run_metrics import MAX_SAMPLES, Timer
+
+
+def timer(values, rng):
+    t = Timer()
+    for v in values:
+        t.add(v, rng)
+    return t
+
+
+def test_merge_weights_reservoirs_by_count():
+    rng = random.Random(1)
+    # 500k fast observations against 10k slow ones: the slow ones are ~2%
+    fast = timer((rng.uniform(0.9, 1.1) for _ in range(500_000)), rng)
+    slow = timer((rng.uniform(99, 101) for _ in range(10_000)), rng)
+    fast.merge(slow, rng)
+
+    summary = fast.summary()
+    assert fast.count == 510_000 and len(fast.samples) == MAX_SAMPLES
+    assert summary["p95"] < 1.2                   # unweighted pooling put p95 at ~100
+    assert abs(sum(v > 50 for v in fast.samples) - MAX_SAMPLES * 10 / 510) < 60
+
+
+def test_merge_below_the_limit_keeps_every_sample():
+    rng = random.Random(2)
+    a, b = timer([1.0] * 300, rng), timer([2.0] * 200, rng)
+    a.merge(b, rng)
+    assert sorted(a.samples) == [1.0] * 300 + [2.0] * 200
+    assert (a.count, a.min, a.max) == (500, 1.0, 2.0)
+
+
+def test_merge_with_an_empty_timer():
+    rng = random.Random(3)
+    a = timer([0.5] * (MAX_SAMPLES + 10), rng)
+    a.merge(Timer(), rng)
+    assert a.count == MAX_SAMPLES + 10 and len(a.samples) == MAX_SAMPLES
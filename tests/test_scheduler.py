@@ -0,0 +1,45 @@
+import pandas as pd
+
+import scheduler
+from price_store import OUR_SELLER
+
+
+def history():
+    rows = [("A", "Ebay", "2026-01-01", 100.0), ("A", "Ebay", "2026-01-02", 95.0),
+            ("B", "Ebay", "2026-01-04", 50.0), ("B", "eBay_itm_1", "2026-01-04", 52.0)]
+    rows += [(p, OUR_SELLER, d, 99.0) for p in "AB" for d in ("2026-01-01", "2026-01-04")]
+    df = pd.DataFrame(rows, columns=["Product", "Seller", "Date", "Price"])
+    df["Date"] = pd.to_datetime(df["Date"])
+    return df
+
+
+def test_estimate_counts_every_seller_of_the_source():
+    est = scheduler.estimate(history(), scheduler.SOURCES["ebay"], "2026-01-05")
+    assert est.loc["A", "age_days"] == 3
+    assert est.loc["B", "age_days"] == 1
+
+
+def test_unfetched_products_are_recorded_as_skipped(tmp_path, monkeypatch):
+    monkeypatch.setenv("PRICE_SCHEDULE_DIR", str(tmp_path))
+    plan = scheduler.SchedulePlan("ebay", scheduler.estimate(history(), scheduler.SOURCES["ebay"], "2026-01-05"),
+                                  budget_requests=1)
+    for product in plan.order(["A", "B"]):
+        plan.allow(product)
+
+    assert plan.record_skipped("2026-01-05") == [p for p in ["A", "B"] if p not in plan.fetched]
+    skipped = set(plan.products) - plan.fetched
+    assert scheduler.load_skipped("ebay") == {p: {"2026-01-05"} for p in skipped}
+    assert scheduler.skipped_products(["2026-01-04", "2026-01-05"]) == skipped
+    assert scheduler.skipped_products(["2026-01-04"]) == set()
+
+
+def test_rank_check_leaves_out_skipped_products(tmp_path, monkeypatch):
+    import visualization_email
+
+    monkeypatch.setenv("PRICE_SCHEDULE_DIR", str(tmp_path))
+    scheduler.save_skipped("amazon", {"A": {"2026-01-05"}}, "2026-01-01")
+    metrics = pd.DataFrame({"Product": ["A", "A", "B", "B"],
+                            "Date": pd.to_datetime(["2026-01-04", "2026-01-05"] * 2),
+                            "our_rank": [2.0, 1.0, 1.0, 3.0]})
+    changes = visualization_email.check_rank_changes(metrics=metrics)
+    assert [c["product"] for c in changes] == ["B"]
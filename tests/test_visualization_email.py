@@ -0,0 +1,41 @@
+import pandas as pd
+
+import visualization_email
+
+
+class Stats:
+    def load_daily_stats(self, products=None):
+        return pd.DataFrame({"Product": ["A"], "Date": ["2026-01-05"], "our_price": [9.0],
+                             "min_price": [8.0], "seller_count": [3], "our_rank": [2.0]})
+
+
+def lazy_run(monkeypatch, settings):
+    change = {"product": "A", "previous_rank": 1, "current_rank": 2}
+    monkeypatch.setattr(visualization_email, "load_settings", lambda: settings)
+    monkeypatch.setattr(visualization_email, "check_rank_changes", lambda **kw: [change])
+    monkeypatch.setattr(visualization_email, "generate_pdf_report", lambda *a, **kw: "report.pdf")
+    monkeypatch.setattr(visualization_email, "send_report_email", lambda *a, **kw: None)
+    return visualization_email.run_lazy(Stats())
+
+
+def test_summary_not_reported_sent_without_recipients(monkeypatch, capsys):
+    sent = []
+    monkeypatch.setattr(visualization_email.smtplib, "SMTP", lambda *a: sent.append(a))
+    lazy_run(monkeypatch, {"recipients": "", "smtp_user": "me"})
+    out = capsys.readouterr().out
+    assert not sent
+    assert "no recipients" in out
+    assert "summary email sent" not in out
+
+
+def test_summary_reported_sent(monkeypatch, capsys):
+    class SMTP:
+        def __init__(self, *args):
+            pass
+
+        starttls = login = send_message = quit = lambda self, *a: None
+
+    monkeypatch.setattr(visualization_email.smtplib, "SMTP", SMTP)
+    lazy_run(monkeypatch, {"recipients": "a@example.com", "smtp_user": "me", "smtp_password": "x",
+                           "smtp_server": "localhost", "smtp_port": "25"})
+    assert "summary email sent" in capsys.readouterr().out
@@ -1,79 +1,71 @@
 import os
-import pandas as pd
-import matplotlib.pyplot as plt
-import mysql.connector
-from matplotlib.backends.backend_pdf import PdfPages
+import sys
+import time
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.base import MIMEBase
 from email import encoders
 from datetime import datetime
+from functools import lru_cache
 
 
-# Database connection configuration
-db_config = {
-    "host": "localhost",
-    "user": "root",
-    "password": "12345678",  # UPDATE THIS WITH YOUR PASSWORD
-    "database": "price_collection"
-}
-
-# Load email settings from settings.txt
-settings = {}
-try:
-    with open("settings.txt", "r") as f:
-        for line in f:
-            if "=" in line:
-                name, value = line.split("=", 1)
-                settings[name.strip()] = value.strip()
-    print("Email settings loaded successfully")
-except FileNotFoundError:
-    print("WARNING: settings.txt not found. Email notification will be skipped.")
-    settings = None
+# Database connection configuration lives in etl/price_store.py
+# (MySQL credentials or the embedded SQLite file, chosen by PRICE_STORE)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "etl"))
+# pandas and etl/price_metrics.py are imported in the functions that use
+# them, so `price_collect.py alert --help` starts without pandas
+from price_store import get_store  # noqa: E402
+
+
+# Email settings from settings.txt, read the first time an email needs
+# them (importing this module or running --help does not touch the file)
+@lru_cache(maxsize=None)
+def load_settings(path="settings.txt"):
+    settings = {}
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                if "=" in line:
+                    name, value = line.split("=", 1)
+                    settings[name.strip()] = value.strip()
+        print("Email settings loaded successfully")
+    except FileNotFoundError:
+        print("WARNING: settings.txt not found. Email notification will be skipped.")
+        settings = None
+    return settings
 
 
 #task 3 - generates visualizations + pdf reports
 
-def generate_pdf_report(df):
+def generate_pdf_report(df, metrics=None, partial=False):
     """
-    Generate PDF report with 3 plots per product:
+    Generate PDF report with 3 plots per product (drawn by
+    etl/report_pages.py):
     - PLOT 1: Minimal price vs Our price over time
     - PLOT 2: Average price vs Our price over time
     - PLOT 3: Rank of our price over time
 
+    `metrics` is the product x date table (PRICE_DAILY_STATS or
+    product_date_metrics()); computed from `df` when not given.
+    partial=True: `metrics` holds only some products (e.g. the ones whose
+    rank changed); the report gets its own file name and the page cache
+    of the other products is kept.
+
     Returns: filename of generated PDF
     """
 
-    print("\n[TASK 3] Generating PDF Visualization Report...")
+    import pandas as pd
+    from price_metrics import product_date_metrics
 
-    # Convert Date column to datetime
-    df["Date"] = pd.to_datetime(df["Date"])
+    print("\n[TASK 3] Generating PDF Visualization Report...")
 
     # Calculate metrics for each product on each date
-    result = (
-        df.groupby(["Product", "Date"], as_index=False)
-        .apply(lambda x: pd.Series({
-            # Lowest price among all sellers
-            "min_price": x["Price"].min(),
-
-            # Average market price
-            "avg_price": x["Price"].mean(),
-
-            # Price of Our Company
-            "our_price": x.loc[x["Seller"] == "Our company", "Price"].values[0]
-            if len(x.loc[x["Seller"] == "Our company", "Price"].values) > 0
-            else None,
-
-            # Rank of Our Company (1 = cheapest)
-            "our_rank": int(
-                x.sort_values("Price")["Seller"]
-                .tolist()
-                .index("Our company") + 1
-            ) if "Our company" in x["Seller"].values else None
-        }))
-        .reset_index(drop=True)
-    )
+    # (min, average, our price and our rank - see etl/price_metrics.py)
+    if metrics is None:
+        df["Date"] = pd.to_datetime(df["Date"])
+        metrics = product_date_metrics(df)
+    result = metrics
 
     # Generate filename with current date
     report_date = datetime.now().strftime("%Y-%m-%d")
@@ -83,83 +75,15 @@ def generate_pdf_report(df):
     os.makedirs(folder, exist_ok=True)
 
     # Final PDF file path
-    filename = os.path.join(folder, f"{report_date}_prices.pdf")
+    suffix = "rank_changes" if partial else "prices"
+    filename = os.path.join(folder, f"{report_date}_{suffix}.pdf")
 
     print(f"Generating report: {filename}")
 
-    # Create multi-page PDF
-    with PdfPages(filename) as pdf:
-
-        # Loop through each product
-        for product in result["Product"].unique():
-
-            # Extract data for current product
-            temp = (
-                result[result["Product"] == product]
-                .sort_values("Date")
-                .copy()
-            )
-
-            # Convert dates to string for plotting
-            temp["Date_str"] = temp["Date"].dt.strftime("%Y-%m-%d")
-
-            # Create figure with 3 subplots
-            fig, axes = plt.subplots(3, 1, figsize=(12, 14))
-            fig.suptitle(product, fontsize=18, fontweight="bold")
-
-            # PLOT 1: MIN PRICE vs OUR PRICE
-            ymin1 = 0
-            ymax1 = max(
-                temp["min_price"].max(),
-                temp["our_price"].max()
-            ) * 1.1
-
-            axes[0].plot(temp["Date_str"], temp["min_price"],
-                         marker="o", lw=2.3, label="Min Price", color="blue")
-            axes[0].plot(temp["Date_str"], temp["our_price"],
-                         marker="o", lw=2.3, label="Our Price", color="red")
-            axes[0].set_ylim(ymin1, ymax1)
-            axes[0].set_xlabel("Date")
-            axes[0].set_ylabel("Price (€)")
-            axes[0].set_title("Minimal Price vs Our Price Over Time")
-            axes[0].grid(True, alpha=0.35)
-            axes[0].legend()
-
-            # PLOT 2: AVG PRICE vs OUR PRICE
-            ymin2 = 0
-            ymax2 = max(
-                temp["avg_price"].max(),
-                temp["our_price"].max()
-            ) * 1.1
-
-            axes[1].plot(temp["Date_str"], temp["avg_price"],
-                         marker="o", lw=2.3, label="Average Price", color="green")
-            axes[1].plot(temp["Date_str"], temp["our_price"],
-                         marker="o", lw=2.3, label="Our Price", color="red")
-            axes[1].set_ylim(ymin2, ymax2)
-            axes[1].set_xlabel("Date")
-            axes[1].set_ylabel("Price (€)")
-            axes[1].set_title("Average Price vs Our Price Over Time")
-            axes[1].grid(True, alpha=0.35)
-            axes[1].legend()
-
-            # PLOT 3: RANK TREND
-            axes[2].plot(temp["Date_str"], temp["our_rank"],
-                         marker="o", lw=2.5, color="purple")
-            axes[2].invert_yaxis()  # Rank 1 (best) at top
-            axes[2].set_xlabel("Date")
-            axes[2].set_ylabel("Rank")
-            axes[2].set_title("Rank of Our Price Over Time (Lower is Better)")
-            axes[2].grid(alpha=0.35)
-
-            # Rotate x-axis labels
-            for ax in axes:
-                ax.tick_params(axis="x", rotation=45)
-
-            # Adjust layout and save page
-            plt.tight_layout(rect=[0, 0, 1, 0.96])
-            pdf.savefig(bbox_inches="tight", pad_inches=0.4)
-            plt.close()
+    # One page per product, rendered in parallel and cached between runs
+    # (see etl/report_pages.py; matplotlib is only imported here)
+    from report_pages import render_report
+    render_report(result, filename, prune=not partial)
 
     print(f"✓ PDF report generated successfully: {filename}")
     return filename
@@ -167,57 +91,81 @@ def generate_pdf_report(df):
 
 # email notification for changes in price
 
-def check_rank_changes(df):
+def comparison_target(today, compare_to=None):
     """
-    Check if rank of 'Our company' changed between the two most recent dates.
+    Latest date to compare `today` against: the previous collection date
+    (None), `compare_to` days back (int, 7 = week-over-week) or a given date.
+    """
+    import pandas as pd
+
+    if compare_to is None:
+        return today - pd.Timedelta(days=1)
+    if isinstance(compare_to, int):
+        return today - pd.Timedelta(days=compare_to)
+    return pd.Timestamp(compare_to)
+
+
+def check_rank_changes(df=None, metrics=None, store=None, compare_to=None):
+    """
+    Check if rank of 'Our company' changed between the most recent date and
+    an earlier one (see comparison_target; the latest data on or before
+    that date is used).
+    Only those two dates are read: from PRICE_DAILY_STATS through `store`,
+    or from the product x date `metrics` / raw `df` when given. Products a
+    scheduled run skipped on one of the dates are not compared.
     Returns list of products with rank changes.
     """
+    import pandas as pd
+    from price_metrics import product_date_metrics, find_rank_changes
 
     print("\n[TASK 4] Checking for rank changes...")
 
-    # Convert Date to datetime
-    df["Date"] = pd.to_datetime(df["Date"])
+    # Rank for each product on each date
+    if metrics is None and df is not None:
+        df["Date"] = pd.to_datetime(df["Date"])
+        metrics = product_date_metrics(df)
 
-    # Calculate rank for each product on each date
-    df_ranked = df.copy()
-    df_ranked['Rank'] = df_ranked.groupby(['Product', 'Date'])['Price'].rank(method='min')
+    if metrics is not None:
+        dates = pd.Series(metrics["Date"].unique())
 
-    # Get the two most recent dates
-    all_dates = sorted(df_ranked['Date'].unique(), reverse=True)
+        def latest_date(on_or_before=None):
+            found = dates if on_or_before is None else dates[dates <= on_or_before]
+            return found.max() if len(found) else None
+    else:
+        store = store or get_store()
 
-    if len(all_dates) < 2:
-        print("Not enough data to compare ranks (need at least 2 dates)")
-        return []
-
-    today = all_dates[0]
-    yesterday = all_dates[1]
+        def latest_date(on_or_before=None):
+            found = store.latest_stats_date(on_or_before)
+            return pd.Timestamp(found) if found else None
 
-    print(f"Comparing ranks between {yesterday.date()} and {today.date()}")
+    # Get the most recent date and the one to compare with
+    today = latest_date()
+    previous = latest_date(comparison_target(today, compare_to)) if today is not None else None
 
-    # Filter for "Our company" only
-    ours = df_ranked[df_ranked['Seller'] == 'Our company']
+    if previous is None:
+        print("Not enough data to compare ranks (need at least 2 dates)")
+        return []
 
-    # Get today's and yesterday's ranks
-    rank_today = ours[ours['Date'] == today][['Product', 'Rank']]
-    rank_yesterday = ours[ours['Date'] == yesterday][['Product', 'Rank']]
+    print(f"Comparing ranks between {previous.date()} and {today.date()}")
 
-    # Find rank changes
-    changes = []
-    for _, row in rank_today.iterrows():
-        prod = row['Product']
-        current_rank = int(row['Rank'])
+    if metrics is not None:
+        ranks = metrics.loc[metrics["Date"].isin([today, previous]), ["Product", "Date", "our_rank"]]
+    else:
+        ranks = store.load_ranks([today, previous])
 
-        prev_row = rank_yesterday[rank_yesterday['Product'] == prod]
-        if not prev_row.empty:
-            previous_rank = int(prev_row['Rank'].values[0])
+    # A product the schedule did not fetch on one of the dates has stats over
+    # fewer sellers that day (see etl/scheduler.py): its rank is not compared
+    import scheduler
+    skipped = ranks["Product"].isin(scheduler.skipped_products([today.date(), previous.date()]))
+    if skipped.any():
+        print(f"  {ranks.loc[skipped, 'Product'].nunique()} product(s) not fetched on both dates are left out")
+        ranks = ranks[~skipped]
 
-            if current_rank != previous_rank:
-                changes.append({
-                    'product': prod,
-                    'previous_rank': previous_rank,
-                    'current_rank': current_rank
-                })
-                print(f"  ✓ Rank change detected: {prod} ({previous_rank} → {current_rank})")
+    # Find rank changes (one merge of the two dates, see etl/price_metrics.py)
+    changes = find_rank_changes(ranks, today, previous).to_dict("records")
+    for change in changes:
+        print(f"  ✓ Rank change detected: {change['product']} "
+              f"({change['previous_rank']} → {change['current_rank']})")
 
     if not changes:
         print("  No rank changes detected")
@@ -225,49 +173,35 @@ def check_rank_changes(df):
     return changes
 
 
-def send_email(rank_changes, pdf_filename):
+def change_lines(rank_changes, details=None):
     """
-    Send email notification about rank changes with PDF report attached.
-    Only sends if rank changes occurred and settings are available.
+    One line per rank change. `details` (product x date metrics of the
+    current date) adds our price, the cheapest offer and the offer count.
     """
+    import pandas as pd
 
-    if not settings:
-        print("Skipping email: settings.txt not found")
-        return
-
-    if not rank_changes:
-        print("No rank changes detected. No email will be sent.")
-        return
-
-    print(f"\nSending email notification for {len(rank_changes)} product(s)...")
-
-    # Build email body
-    body = "Hello,\n\n"
-    body += "The following products have experienced rank changes:\n\n"
+    current = {}
+    if details is not None and len(details):
+        current = details.set_index("Product").to_dict("index")
 
+    lines = []
     for change in rank_changes:
         if change['current_rank'] < change['previous_rank']:
             direction = "improved ↑"
         else:
             direction = "worsened ↓"
 
-        body += f"• {change['product']}: "
-        body += f"Rank {change['previous_rank']} → {change['current_rank']} ({direction})\n"
+        line = f"• {change['product']}: Rank {change['previous_rank']} → {change['current_rank']} ({direction})"
+        row = current.get(change['product'])
+        if row is not None and pd.notna(row.get("our_price")):
+            gap = row["our_price"] - row["min_price"]
+            line += (f"\n    our price {row['our_price']:.2f} €, cheapest {row['min_price']:.2f} €"
+                     f" ({'+' if gap > 0 else ''}{gap:.2f} €), offers: {int(row['seller_count'])}")
+        lines.append(line)
+    return lines
 
-    body += f"\n\nPlease see the attached PDF report for detailed price analysis.\n"
-    body += f"\nReport generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-    body += "\nBest regards,\nPrice Tracker System"
 
-    # Create email message
-    msg = MIMEMultipart()
-    msg['Subject'] = f"Price Alert: Rank Changes Detected ({len(rank_changes)} products)"
-    msg['From'] = settings['smtp_user']
-    msg['To'] = settings['recipients']
-
-    # Attach body text
-    msg.attach(MIMEText(body, 'plain'))
-
-    # Attach PDF report
+def _attach_pdf(msg, pdf_filename):
     try:
         with open(pdf_filename, 'rb') as attachment:
             part = MIMEBase('application', 'octet-stream')
@@ -280,6 +214,25 @@ def send_email(rank_changes, pdf_filename):
     except Exception as e:
         print(f"WARNING: Could not attach PDF: {e}")
 
+
+def _send(subject, body, pdf_filename=None):
+    """Send one email; returns True only when it actually went out."""
+    settings = load_settings()
+    if not settings.get('recipients'):
+        print("Skipping email: no recipients in settings.txt")
+        return False
+
+    # Create email message
+    msg = MIMEMultipart()
+    msg['Subject'] = subject
+    msg['From'] = settings['smtp_user']
+    msg['To'] = settings['recipients']
+
+    # Attach body text (and the PDF report)
+    msg.attach(MIMEText(body, 'plain'))
+    if pdf_filename:
+        _attach_pdf(msg, pdf_filename)
+
     # Send email
     try:
         server = smtplib.SMTP(settings['smtp_server'], int(settings['smtp_port']))
@@ -288,57 +241,230 @@ def send_email(rank_changes, pdf_filename):
         server.send_message(msg)
         server.quit()
         print(f"✓ Email sent successfully to {settings['recipients']}")
+        return True
     except Exception as e:
         print(f"ERROR: Failed to send email: {e}")
+        return False
+
+
+def send_email(rank_changes, pdf_filename):
+    """
+    Send email notification about rank changes with PDF report attached.
+    Only sends if rank changes occurred and settings are available.
+    """
+
+    settings = load_settings()
+    if not settings:
+        print("Skipping email: settings.txt not found")
+        return
+
+    if not rank_changes:
+        print("No rank changes detected. No email will be sent.")
+        return
+
+    print(f"\nSending email notification for {len(rank_changes)} product(s)...")
+
+    # Build email body
+    body = "Hello,\n\n"
+    body += "The following products have experienced rank changes:\n\n"
+    body += "\n".join(change_lines(rank_changes)) + "\n"
+    body += f"\n\nPlease see the attached PDF report for detailed price analysis.\n"
+    body += f"\nReport generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+    body += "\nBest regards,\nPrice Tracker System"
+
+    _send(f"Price Alert: Rank Changes Detected ({len(rank_changes)} products)", body, pdf_filename)
+
+
+def send_summary_email(rank_changes, details=None):
+    """
+    Lazy mode, step 1: the rank changes as an inline summary, sent before
+    any PDF is rendered. The report follows in a second email.
+    Returns True when the email was sent.
+    """
+    settings = load_settings()
+    if not settings:
+        print("Skipping summary email: settings.txt not found")
+        return False
+    if not rank_changes:
+        print("No rank changes: no summary email")
+        return False
+
+    print(f"\nSending summary email for {len(rank_changes)} product(s)...")
+    body = "Hello,\n\n"
+    body += "The following products have experienced rank changes:\n\n"
+    body += "\n".join(change_lines(rank_changes, details)) + "\n"
+    body += "\n\nThe PDF report with the price history follows in a separate email.\n"
+    body += f"\nChecked: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+    body += "\nBest regards,\nPrice Tracker System"
+
+    return _send(f"Price Alert: Rank Changes Detected ({len(rank_changes)} products)", body)
+
+
+def send_report_email(pdf_filename, rank_changes, full=False):
+    """Lazy mode, step 2: the PDF (changed products, or all on full-report days)."""
+    settings = load_settings()
+    if not settings:
+        print("Skipping report email: settings.txt not found")
+        return
+
+    what = "all products" if full else f"{len(rank_changes)} product(s) with rank changes"
+    body = "Hello,\n\n"
+    body += f"Attached is the price report for {what}.\n"
+    if rank_changes:
+        body += "\nRank changes:\n\n" + "\n".join(change_lines(rank_changes)) + "\n"
+    body += f"\nReport generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+    body += "\nBest regards,\nPrice Tracker System"
+
+    subject = "Price Report: all products" if full else f"Price Report: Rank Changes ({len(rank_changes)} products)"
+    _send(subject, body, pdf_filename)
 
 
 #execution
 
-def main():
+def load_archive_metrics(start=None, step="[2/5]"):
+    """
+    Product x date metrics computed from the Parquet archive (see
+    etl/price_archive.py) instead of the database; only the four columns
+    the metrics need are read. `step` labels the progress line (None: a
+    sub-step of the current one, as in the lazy workflow).
+    """
+    from price_archive import load_archive, archive_dir
+    from price_metrics import product_date_metrics
+
+    label = f"\n{step} " if step else "  "
+    print(f"{label}Loading price history from archive {archive_dir()}...")
+    prices = load_archive(["Product", "Date", "Seller", "Price"], start=start)
+    if prices.empty:
+        return prices
+    print(f"✓ Loaded {len(prices)} price records")
+    return product_date_metrics(prices)
+
+
+def run_lazy(store, compare_to=None, from_archive=False, archive_start=None, full_report=False):
+    """
+    Lazy workflow: the rank check first (two dates of PRICE_DAILY_STATS),
+    then only the work it calls for:
+    - no rank changes: no PDF and no email (unless `full_report`)
+    - rank changes: a summary email right away, then a PDF of just the
+      changed products in a second email
+    - `full_report` (e.g. weekly): the PDF covers every product
+    Returns (rank_changes, pdf_filename or None).
+    """
+    import pandas as pd
+
+    started = time.perf_counter()
+    metrics = None
+    print("\n[1/3] Analyzing rank changes...")
+    if from_archive:
+        metrics = load_archive_metrics(archive_start, step=None)
+        if metrics.empty:
+            print("ERROR: The price archive is empty! (run etl/price_archive.py export)")
+            return [], None
+        metrics["Date"] = pd.to_datetime(metrics["Date"])
+        rank_changes = check_rank_changes(metrics=metrics, compare_to=compare_to)
+    else:
+        rank_changes = check_rank_changes(store=store, compare_to=compare_to)
+    print(f"[TIME] rank check: {time.perf_counter() - started:.2f}s")
+
+    if not rank_changes and not full_report:
+        print("No rank changes and no full report scheduled: skipping PDF and email.")
+        return rank_changes, None
+
+    # Only the changed products are read from the database from here on
+    # (all of them on full-report days)
+    changed = [change["product"] for change in rank_changes]
+    if metrics is None:
+        step = time.perf_counter()
+        metrics = store.load_daily_stats(None if full_report else changed)
+        metrics["Date"] = pd.to_datetime(metrics["Date"])
+        print(f"[TIME] load {metrics['Product'].nunique()} product(s): {time.perf_counter() - step:.2f}s")
+    elif not full_report:
+        metrics = metrics[metrics["Product"].isin(changed)]
+
+    if rank_changes:
+        print("\n[2/3] Sending summary email...")
+        subset = metrics[metrics["Product"].isin(changed)]
+        latest = subset.loc[subset.groupby("Product")["Date"].idxmax()] if len(subset) else subset
+        if send_summary_email(rank_changes, latest):
+            print(f"[TIME] summary email sent after {time.perf_counter() - started:.2f}s")
+    else:
+        print("\n[2/3] No rank changes: no summary email")
+
+    print("\n[3/3] Generating PDF visualization report...")
+    step = time.perf_counter()
+    pdf_filename = generate_pdf_report(None, metrics, partial=not full_report)
+    print(f"[TIME] PDF ({metrics['Product'].nunique()} product(s)): {time.perf_counter() - step:.2f}s")
+    send_report_email(pdf_filename, rank_changes, full=full_report)
+    print(f"[TIME] total: {time.perf_counter() - started:.2f}s")
+    return rank_changes, pdf_filename
+
+
+def main(compare_to=None, from_archive=False, archive_start=None, lazy=False, full_report=False):
     """
     Main workflow:
-    1. Connect to database and load price data
+    1. Connect to database and load daily price statistics
+       (or, with `from_archive`, compute them from the Parquet archive
+       without touching the database)
     2. Generate PDF visualization 
-    3. Check for rank changes 
+    3. Check for rank changes (against `compare_to`, see comparison_target)
     4. Send email notification if ranks changed 
+
+    lazy=True: rank check first, PDF only when needed (see run_lazy).
     """
+    import pandas as pd
 
     print("=" * 70)
     print("PRICE TRACKER - VISUALIZATION & EMAIL NOTIFICATION SYSTEM")
     print("=" * 70)
 
+    store = get_store()
+
     try:
         # Connect to database
         print("\n[1/5] Connecting to database...")
-        db = mysql.connector.connect(**db_config)
-        print("✓ Database connection established")
-
-        # Load data
-        print("\n[2/5] Loading price data from PRICE table...")
-        query = """
-        SELECT Product, Date, Seller, Price
-        FROM PRICE
-        ORDER BY Product, Date;
-        """
-        df = pd.read_sql(query, db)
-        db.close()
-
-        if df.empty:
-            print("ERROR: No data found in PRICE table!")
+        print(f"✓ Using price store {store.name}")
+
+        if lazy:
+            rank_changes, pdf_filename = run_lazy(store, compare_to, from_archive, archive_start, full_report)
+            print("\n" + "=" * 70)
+            print("PROCESS COMPLETED SUCCESSFULLY")
+            print("=" * 70)
+            print(f"\nGenerated files:")
+            print(f"  - PDF Report: {pdf_filename or 'none (not needed)'}")
+            print(f"  - Rank changes: {len(rank_changes)}")
             return
 
-        print(f"✓ Loaded {len(df)} price records")
-        print(f"✓ Products: {df['Product'].nunique()}")
-        print(f"✓ Sellers: {df['Seller'].nunique()}")
-        print(f"✓ Date range: {df['Date'].min()} to {df['Date'].max()}")
+        if from_archive:
+            metrics = load_archive_metrics(archive_start)
+            if metrics.empty:
+                print("ERROR: The price archive is empty! (run etl/price_archive.py export)")
+                return
+        else:
+            # Load data: the compact per product/date summary kept up to date by
+            # the ETLs (see etl/backfill_daily_stats.py), not the raw PRICE history
+            print("\n[2/5] Loading daily price statistics from PRICE_DAILY_STATS table...")
+            metrics = store.load_daily_stats()
+
+            if metrics.empty:
+                print("ERROR: No data found in PRICE_DAILY_STATS table! (run etl/backfill_daily_stats.py)")
+                return
+
+        print(f"✓ Loaded {len(metrics)} product/day summaries ({int(metrics['seller_count'].sum())} price records)")
+        print(f"✓ Products: {metrics['Product'].nunique()}")
+        print(f"✓ Date range: {metrics['Date'].min()} to {metrics['Date'].max()}")
+
+        metrics["Date"] = pd.to_datetime(metrics["Date"])
 
         # Generate PDF visualization
         print("\n[3/5] Generating PDF visualization report...")
-        pdf_filename = generate_pdf_report(df)
+        pdf_filename = generate_pdf_report(None, metrics)
 
         # Check for rank changes
         print("\n[4/5] Analyzing rank changes...")
-        rank_changes = check_rank_changes(df)
+        if from_archive:
+            rank_changes = check_rank_changes(metrics=metrics, compare_to=compare_to)
+        else:
+            rank_changes = check_rank_changes(store=store, compare_to=compare_to)
 
         # Send email if necessary
         print("\n[5/5] Processing email notification...")
@@ -354,7 +480,7 @@ def main():
         else:
             print(f"  - Email sent: No (no rank changes detected)")
 
-    except mysql.connector.Error as e:
+    except store.Error as e:
         print(f"\nDATABASE ERROR: {e}")
         print("Please check your database connection settings")
     except Exception as e:
@@ -363,7 +489,32 @@ def main():
         traceback.print_exc()
 
 
-if __name__ == "__main__":
+def cli(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--compare-days", type=int, default=None,
+                        help="compare ranks with N days ago (7 = week-over-week); default: previous collection date")
+    parser.add_argument("--compare-date", default=None, help="compare ranks with this date (YYYY-MM-DD)")
+    parser.add_argument("--from-archive", action="store_true",
+                        help="read the price history from the Parquet archive (etl/price_archive.py), not the database")
+    parser.add_argument("--since", default=None, help="with --from-archive: only read history from this date on")
+    parser.add_argument("--lazy", action="store_true",
+                        help="check rank changes first; summary email at once, PDF of the changed products only")
+    parser.add_argument("--full-report", action="store_true", help="with --lazy: PDF of all products")
+    parser.add_argument("--full-report-weekday", type=int, default=None,
+                        help="with --lazy: full report on this weekday (0 = Monday; settings.txt: full_report_weekday)")
+    args = parser.parse_args(argv)
+
+    weekday = args.full_report_weekday
+    if weekday is None and args.lazy:
+        weekday = int((load_settings() or {}).get("full_report_weekday", -1))
 
-    main()
+    main(compare_to=args.compare_date or args.compare_days, from_archive=args.from_archive,
+         archive_start=args.since, lazy=args.lazy,
+         full_report=args.full_report or datetime.now().weekday() == weekday)
+
+
+if __name__ == "__main__":
+    cli()
 